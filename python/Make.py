@@ -3,15 +3,14 @@
 # @author    Sergey Baigudin, sergey@baigudin.software
 # @copyright 2023-2025, Sergey Baigudin, Baigudin Software
 
+import os
 import sys
 import time
 import argparse
 
 from common.System import System
 from common.Message import Message
-from make.ProgramOnPosix import ProgramOnPosix
-from make.ProgramOnWin32 import ProgramOnWin32
-from make.ProgramOnFreeRTOS import ProgramOnFreeRTOS
+from make.Platforms import Platforms
 
 class Make:
     """
@@ -26,25 +25,21 @@ class Make:
         """
         Builds EOOS system.
         """
+        # Help, version and wrong arguments exit here, before any build module is imported
+        self.__parse_args()
+        path_to_log = self.__get_path_to_log()
+        Message.configure(self.__get_args().quiet, self.__get_args().output_format, path_to_log)
         time_start = time.time()
         res = True
         try:
             Message.out(f'Welcome to {self.__PROGRAM_NAME}', Message.OK, True)
-            self.__parse_args()
             self.__print_args()
-            program = None
-            if self.__get_args().eoos == f'POSIX':
-                program = ProgramOnPosix( self.__get_args() )
-            elif self.__get_args().eoos == f'WIN32':
-                program = ProgramOnWin32( self.__get_args() )
-            elif self.__get_args().eoos == f'FreeRTOS':
-                program = ProgramOnFreeRTOS( self.__get_args() )
+            if self.__get_args().history is not None:
+                self.__report_history()
             else:
-                raise Exception(f'EOOS project not supported')
-            if program is not None:
+                from make.Matrix import Matrix
+                program = Matrix( self.__get_args() )
                 program.execute()
-            else:
-                raise Exception(f'Program is not set')
         except Exception as e:
             Message.out(f'[EXCEPTION] {e}', Message.ERR)
             res = False
@@ -54,6 +49,9 @@ class Make:
             if res == False:
                 status = Message.ERR
                 not_word = ' NOT'
+            if path_to_log is not None:
+                # The quiet console shows only errors, so the log is pointed at if the build has failed
+                Message.out(f'[INFO] Full log has been written to "{path_to_log}"', status if res == False else Message.INF)
             time_execute = round(time.time() - time_start, 9)
             Message.out(f'{self.__PROGRAM_NAME} has{not_word} been completed in {str(time_execute)} seconds', status, is_block=True)
             return res
@@ -63,15 +61,36 @@ class Make:
         return self.__args
 
 
+    def __get_path_to_log(self):
+        if self.__get_args().no_log is True:
+            return None
+        if self.__get_args().log is not None:
+            return os.path.abspath(self.__get_args().log)
+        from make.Program import Program
+        return Program._get_path_to_output(Program._LOG_FILE_NAME)
+
+
+    def __report_history(self):
+        from make.Program import Program
+        from make.RunHistory import RunHistory
+        threshold = self.__get_args().history_threshold
+        if threshold is None:
+            threshold = Program._HISTORY_THRESHOLD
+        history = RunHistory( Program._get_path_to_output(Program._HISTORY_FILE_NAME) )
+        history.print_report(self.__get_args().history, threshold)
+
+
     def __parse_args(self):
         parser = argparse.ArgumentParser(prog=self.__PROGRAM_NAME \
             , description='Builds and installs the EOOS project to your host OS, or HW platform' \
             , epilog='(c) 2023-2025, Sergey Baigudin, Baigudin Software' \
         )
         parser.add_argument('-e', '--eoos' \
-            , choices=['POSIX', 'WIN32', 'FreeRTOS'] \
-            , help='select a target EOOS project' \
-            , required=True \
+            , metavar='{' + ','.join(Platforms.get_built_in_names()) + ',...}' \
+            , nargs='+' \
+            , help='select target EOOS projects, each project is built in parallel in its own build tree, ' \
+                f'other projects can be registered by "{Platforms.ENTRY_POINT_GROUP}" entry points, ' \
+                f'or {Platforms.ENVIRONMENT_VARIABLE}=NAME=module:Class' \
         )
         parser.add_argument('-c', '--clean' \
             , action='store_true' \
@@ -82,65 +101,311 @@ class Make:
             , default='ALL' \
             , help='compile either EOOS library target, or all targets' \
         )
+        parser.add_argument('--reconfigure' \
+            , action='store_true' \
+            , help='run CMake configure step even if its inputs are unchanged since the last run' \
+        )
         parser.add_argument('-r', '--run' \
             , metavar='GTEST_FILTER_PATTERN' \
             , nargs='*' \
             , help='filter unit tests' \
         )
+        parser.add_argument('--affected' \
+            , metavar='REF' \
+            , nargs='?' \
+            , const='HEAD' \
+            , help='run only unit tests affected by files changed since git revision REF, HEAD by default, ' \
+                'or since the last test run if the sources are not a git repository' \
+        )
+        parser.add_argument('--test-jobs' \
+            , metavar='N' \
+            , type=int \
+            , help='run unit tests in N parallel Google Test shards and merge their results' \
+        )
+        parser.add_argument('--fail-fast' \
+            , action='store_true' \
+            , help='stop all unit test workers as soon as the first test fails' \
+        )
+        parser.add_argument('--test-timeout' \
+            , metavar='SECONDS' \
+            , type=float \
+            , help='stop each unit test worker after SECONDS and report its unfinished tests as an error' \
+        )
+        parser.add_argument('--qemu-machine' \
+            , metavar='NAME' \
+            , help='QEMU machine running unit tests of an embedded target, EOOS_QEMU_MACHINE of the CMake cache ' \
+                'or lm3s6965evb by default' \
+        )
+        parser.add_argument('--qemu-cpu' \
+            , metavar='NAME' \
+            , help='QEMU CPU running unit tests of an embedded target, EOOS_QEMU_CPU of the CMake cache ' \
+                'or cortex-m3 by default' \
+        )
+        parser.add_argument('--no-test-cache' \
+            , action='store_true' \
+            , help='run unit tests even if their results are cached for an unchanged test executable' \
+        )
         parser.add_argument('--coverage' \
             , action='store_true' \
             , help='run unit tests and create code coverage report' \
         )
+        parser.add_argument('--bench' \
+            , metavar='REGEX' \
+            , nargs='*' \
+            , help='build and run Google Benchmark executable pinned to one CPU, optionally only benchmarks matching REGEX, ' \
+                'and fail if benchmarks regress against the baseline' \
+        )
+        parser.add_argument('--bench-repetitions' \
+            , metavar='N' \
+            , type=int \
+            , help='repeat each benchmark N times, 10 by default' \
+        )
+        parser.add_argument('--bench-threshold' \
+            , metavar='PERCENT' \
+            , type=float \
+            , help='fail benchmarks which median time grows significantly over the baseline by more than PERCENT, 5 by default' \
+        )
+        parser.add_argument('--bench-baseline' \
+            , action='store_true' \
+            , help='store results of the benchmarks as the new baseline' \
+        )
+        parser.add_argument('--pgo' \
+            , action='store_true' \
+            , help='build a profile-guided and link-time optimized variant trained by unit tests, or benchmarks with --bench, ' \
+                'and compare its size and speed with the release build' \
+        )
+        parser.add_argument('--sca' \
+            , choices=['clang-tidy', 'cppcheck'] \
+            , nargs='*' \
+            , help='run static analysis of the EOOS sources by the given analysers, all found ones by default, ' \
+                'and report the findings to `build/sca`' \
+        )
         parser.add_argument('--install' \
             , action='store_true' \
             , help='install on OS' \
         )
         parser.add_argument('--config' \
             , choices=['Release', 'Debug', 'RelWithDebInfo', 'MinSizeRel'] \
-            , default='Debug' \
-            , help='set project configuration' \
+            , nargs='+' \
+            , default=['Debug'] \
+            , help='set project configurations, each configuration is built in parallel in its own build tree' \
         )
         parser.add_argument('-j', '--jobs' \
-            , type=int \
-            , help='set number of parallel jobs to build' \
+            , type=self.__parse_jobs \
+            , help='set number of parallel jobs to build, which are divided between build combinations, ' \
+                'or "auto" to choose it from CPUs and memory, and to hold jobs back while memory is tight' \
+        )
+        parser.add_argument('--ccache', '--compiler-cache' \
+            , dest='compiler_cache' \
+            , choices=['auto', 'ccache', 'sccache'] \
+            , nargs='?' \
+            , const='auto' \
+            , help='use ccache or sccache as compiler launcher, the first found one by default' \
+        )
+        parser.add_argument('--compiler-cache-dir' \
+            , metavar='PATH' \
+            , help='set directory of the compiler cache' \
+        )
+        parser.add_argument('--compiler-cache-size' \
+            , metavar='SIZE' \
+            , help='set size limit of the compiler cache, for example 5G' \
+        )
+        parser.add_argument('--artifact-cache' \
+            , action='store_true' \
+            , help='restore build artifacts from a local cache when sources, target, config, toolchain and defines match' \
+        )
+        parser.add_argument('--artifact-cache-dir' \
+            , metavar='PATH' \
+            , help='set directory of the artifact cache' \
+        )
+        parser.add_argument('--artifact-cache-size' \
+            , metavar='SIZE' \
+            , help='set size limit of the artifact cache, for example 10G, the least recently used artifacts are evicted' \
+        )
+        parser.add_argument('--profile-compile' \
+            , action='store_true' \
+            , help='report the slowest translation units, directories and headers of the build' \
+        )
+        parser.add_argument('--size-threshold' \
+            , metavar='PERCENT' \
+            , type=float \
+            , help='fail FreeRTOS builds which FLASH or RAM footprint grows over the baseline by more than PERCENT, 5 by default' \
+        )
+        parser.add_argument('--size-baseline' \
+            , action='store_true' \
+            , help='store footprint of FreeRTOS builds as the new baseline' \
         )
         parser.add_argument('--verbose' \
             , action='store_true' \
             , help='verbose compiler output' \
         )
+        parser.add_argument('--quiet' \
+            , action='store_true' \
+            , help='show only failures and the final summary, the full output is still written to the log file' \
+        )
+        parser.add_argument('--output-format' \
+            , choices=Message.FORMATS \
+            , default=Message.TEXT \
+            , help='format of the console output, json writes JSON lines for continuous integration systems' \
+        )
+        parser.add_argument('--log' \
+            , metavar='PATH' \
+            , help='write all messages and the whole output of sub-processes to the rotating log file PATH, ' \
+                'build/.eoos-scripts/build.log by default' \
+        )
+        parser.add_argument('--no-log' \
+            , action='store_true' \
+            , help='do not write the log file' \
+        )
+        parser.add_argument('--watch' \
+            , action='store_true' \
+            , help='stay resident, and rebuild and run affected unit tests when files of the `codebase` directory change' \
+        )
+        parser.add_argument('--trace' \
+            , metavar='PATH' \
+            , help='write timings of the build phases and sub-processes to PATH in Chrome trace event format' \
+        )
         parser.add_argument('-d', '--define' \
             , metavar='DEFINITIONS' \
             , nargs='*' \
             , help='create or update a CMake cache entry in DEFINITIONS format <var>:<type>=<value>, or <var>=<value>' \
         )
+        parser.add_argument('--history' \
+            , metavar='N' \
+            , type=int \
+            , nargs='?' \
+            , const=50 \
+            , help='report trends, percentiles, the slowest runs and regressed phases of N recent runs of each ' \
+                'EOOS project and configuration, 50 by default, instead of building' \
+        )
+        parser.add_argument('--history-threshold' \
+            , metavar='PERCENT' \
+            , type=float \
+            , help='flag phases which take longer than the median of the recent runs by more than PERCENT, 25 by default' \
+        )
+        parser.add_argument('--no-history' \
+            , action='store_true' \
+            , help='do not record the run in the build history' \
+        )
         parser.add_argument('--version' \
             , action='version' \
             , version=f'%(prog)s {self.__PROGRAM_VERSION}' \
         )
         self.__args = parser.parse_args()
+        if self.__args.eoos is None and self.__args.history is None:
+            parser.error('the following arguments are required: -e/--eoos')
+        # Platforms are checked after parsing, so entry points are not looked up for built-in ones
+        for name in self.__args.eoos if self.__args.eoos is not None else []:
+            if Platforms.is_registered(name) is not True:
+                choices = ', '.join([f"'{n}'" for n in Platforms.get_names()])
+                parser.error(f"argument -e/--eoos: invalid choice: '{name}' (choose from {choices})")
+        self.__args.tree = None
+        self.__args.changed = None
+        self.__args.pgo_variant = None
+        self.__args.compiler_cache_server = True
+
+
+    @staticmethod
+    def __parse_jobs(value):
+        if value == 'auto':
+            return value
+        try:
+            jobs = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'invalid number of jobs: {value}')
+        if jobs < 1:
+            raise argparse.ArgumentTypeError(f'invalid number of jobs: {value}')
+        return jobs
 
 
     def __print_args(self):
         if self.__get_args().eoos is not None:
-            Message.out(f'[INFO] Argument EOOS: {self.__get_args().eoos}', Message.INF)
+            Message.out(f'[INFO] Argument EOOS: {" ".join(self.__get_args().eoos)}', Message.INF)
         if self.__get_args().clean is True:
             Message.out(f'[INFO] Argument CLEAN: {self.__get_args().clean}', Message.INF)
         if self.__get_args().build is not None:
             Message.out(f'[INFO] Argument BUILD: {self.__get_args().build}', Message.INF)
+        if self.__get_args().reconfigure is True:
+            Message.out(f'[INFO] Argument RECONFIGURE: {self.__get_args().reconfigure}', Message.INF)
         if self.__get_args().run is not None:
             Message.out(f'[INFO] Argument RUN: PASSED', Message.INF)
             for i, d in enumerate(self.__get_args().run):
                 Message.out(f'[INFO] Argument RUN {i}: {d}', Message.INF)
+        if self.__get_args().affected is not None:
+            Message.out(f'[INFO] Argument AFFECTED: {self.__get_args().affected}', Message.INF)
+        if self.__get_args().test_jobs is not None:
+            Message.out(f'[INFO] Argument TEST JOBS: {self.__get_args().test_jobs}', Message.INF)
+        if self.__get_args().fail_fast is True:
+            Message.out(f'[INFO] Argument FAIL FAST: {self.__get_args().fail_fast}', Message.INF)
+        if self.__get_args().test_timeout is not None:
+            Message.out(f'[INFO] Argument TEST TIMEOUT: {self.__get_args().test_timeout}', Message.INF)
+        if self.__get_args().qemu_machine is not None:
+            Message.out(f'[INFO] Argument QEMU MACHINE: {self.__get_args().qemu_machine}', Message.INF)
+        if self.__get_args().qemu_cpu is not None:
+            Message.out(f'[INFO] Argument QEMU CPU: {self.__get_args().qemu_cpu}', Message.INF)
+        if self.__get_args().no_test_cache is True:
+            Message.out(f'[INFO] Argument NO TEST CACHE: {self.__get_args().no_test_cache}', Message.INF)
         if self.__get_args().coverage is True:
             Message.out(f'[INFO] Argument COVERAGE: {self.__get_args().coverage}', Message.INF)
+        if self.__get_args().bench is not None:
+            Message.out(f'[INFO] Argument BENCH: PASSED', Message.INF)
+            for i, d in enumerate(self.__get_args().bench):
+                Message.out(f'[INFO] Argument BENCH {i}: {d}', Message.INF)
+        if self.__get_args().bench_repetitions is not None:
+            Message.out(f'[INFO] Argument BENCH REPETITIONS: {self.__get_args().bench_repetitions}', Message.INF)
+        if self.__get_args().bench_threshold is not None:
+            Message.out(f'[INFO] Argument BENCH THRESHOLD: {self.__get_args().bench_threshold}', Message.INF)
+        if self.__get_args().bench_baseline is True:
+            Message.out(f'[INFO] Argument BENCH BASELINE: {self.__get_args().bench_baseline}', Message.INF)
+        if self.__get_args().pgo is True:
+            Message.out(f'[INFO] Argument PGO: {self.__get_args().pgo}', Message.INF)
+        if self.__get_args().sca is not None:
+            analysers = ' '.join(self.__get_args().sca) if len(self.__get_args().sca) > 0 else 'ALL'
+            Message.out(f'[INFO] Argument SCA: {analysers}', Message.INF)
         if self.__get_args().install is True:
             Message.out(f'[INFO] Argument INSTALL: {self.__get_args().install}', Message.INF)
         if self.__get_args().config is not None:
-            Message.out(f'[INFO] Argument CONFIG: {self.__get_args().config}', Message.INF)
+            Message.out(f'[INFO] Argument CONFIG: {" ".join(self.__get_args().config)}', Message.INF)
         if self.__get_args().jobs is not None:
             Message.out(f'[INFO] Argument JOBS: {self.__get_args().jobs}', Message.INF)
+        if self.__get_args().compiler_cache is not None:
+            Message.out(f'[INFO] Argument COMPILER CACHE: {self.__get_args().compiler_cache}', Message.INF)
+        if self.__get_args().compiler_cache_dir is not None:
+            Message.out(f'[INFO] Argument COMPILER CACHE DIR: {self.__get_args().compiler_cache_dir}', Message.INF)
+        if self.__get_args().compiler_cache_size is not None:
+            Message.out(f'[INFO] Argument COMPILER CACHE SIZE: {self.__get_args().compiler_cache_size}', Message.INF)
+        if self.__get_args().artifact_cache is True:
+            Message.out(f'[INFO] Argument ARTIFACT CACHE: {self.__get_args().artifact_cache}', Message.INF)
+        if self.__get_args().artifact_cache_dir is not None:
+            Message.out(f'[INFO] Argument ARTIFACT CACHE DIR: {self.__get_args().artifact_cache_dir}', Message.INF)
+        if self.__get_args().artifact_cache_size is not None:
+            Message.out(f'[INFO] Argument ARTIFACT CACHE SIZE: {self.__get_args().artifact_cache_size}', Message.INF)
+        if self.__get_args().profile_compile is True:
+            Message.out(f'[INFO] Argument PROFILE COMPILE: {self.__get_args().profile_compile}', Message.INF)
+        if self.__get_args().size_threshold is not None:
+            Message.out(f'[INFO] Argument SIZE THRESHOLD: {self.__get_args().size_threshold}', Message.INF)
+        if self.__get_args().size_baseline is True:
+            Message.out(f'[INFO] Argument SIZE BASELINE: {self.__get_args().size_baseline}', Message.INF)
         if self.__get_args().verbose is True:
             Message.out(f'[INFO] Argument VERBOSE: {self.__get_args().verbose}', Message.INF)
+        if self.__get_args().quiet is True:
+            Message.out(f'[INFO] Argument QUIET: {self.__get_args().quiet}', Message.INF)
+        if self.__get_args().output_format != Message.TEXT:
+            Message.out(f'[INFO] Argument OUTPUT FORMAT: {self.__get_args().output_format}', Message.INF)
+        if self.__get_args().log is not None:
+            Message.out(f'[INFO] Argument LOG: {self.__get_args().log}', Message.INF)
+        if self.__get_args().no_log is True:
+            Message.out(f'[INFO] Argument NO LOG: {self.__get_args().no_log}', Message.INF)
+        if self.__get_args().watch is True:
+            Message.out(f'[INFO] Argument WATCH: {self.__get_args().watch}', Message.INF)
+        if self.__get_args().trace is not None:
+            Message.out(f'[INFO] Argument TRACE: {self.__get_args().trace}', Message.INF)
+        if self.__get_args().history is not None:
+            Message.out(f'[INFO] Argument HISTORY: {self.__get_args().history}', Message.INF)
+        if self.__get_args().history_threshold is not None:
+            Message.out(f'[INFO] Argument HISTORY THRESHOLD: {self.__get_args().history_threshold}', Message.INF)
+        if self.__get_args().no_history is True:
+            Message.out(f'[INFO] Argument NO HISTORY: {self.__get_args().no_history}', Message.INF)
         if self.__get_args().define is not None:
             Message.out(f'[INFO] Argument DEFINE: PASSED', Message.INF)
             for i, d in enumerate(self.__get_args().define):
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# @file      FileWatcher.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+from common.System import System
+
+class FileWatcher:
+    """
+    Watcher of file changes in a directory tree.
+
+    On Linux changes are received from inotify, otherwise the tree is polled
+    for modified files. A burst of changes, for example saving several files
+    at once, is collected until the tree is quiet for the debounce time.
+    Hidden files and editor backup files are ignored.
+    """
+
+    def __init__(self, path, debounce=0.3, period=1.0):
+        """
+        Args:
+            path (str): root directory of the tree.
+            debounce (float): time in seconds the tree has to be quiet after a change.
+            period (float): polling period in seconds.
+        """
+        self.__path = os.path.abspath(path)
+        self.__debounce = debounce
+        self.__period = period
+        self.__fd = None
+        self.__watches = {}
+        self.__snapshot = None
+        self.__libc = None
+        self.__is_overflowed = False
+
+
+    def start(self):
+        """
+        Starts watching the tree.
+        """
+        if System.is_linux():
+            try:
+                self.__start_inotify()
+                return
+            except OSError:
+                self.stop()
+        self.__snapshot = self.__get_snapshot()
+
+
+    def stop(self):
+        """
+        Stops watching the tree.
+        """
+        if self.__fd is not None:
+            os.close(self.__fd)
+        self.__fd = None
+        self.__watches = {}
+        self.__snapshot = None
+
+
+    def is_native(self):
+        """
+        Tests if changes are received from the operating system instead of polling.
+        """
+        return self.__fd is not None
+
+
+    def wait(self):
+        """
+        Waits for changes in the tree.
+
+        Returns:
+            set: absolute paths of changed files, or None if changes have been lost and any file may have changed.
+        """
+        self.__is_overflowed = False
+        changed = set()
+        while len(changed) == 0 and self.__is_overflowed is not True:
+            changed = self.__read(None)
+        while True:
+            more = self.__read(self.__debounce)
+            if len(more) == 0:
+                break
+            changed |= more
+        if self.__is_overflowed is True:
+            return None
+        return changed
+
+
+    def __read(self, timeout):
+        if self.__fd is not None:
+            changed = self.__read_inotify(timeout)
+        else:
+            time.sleep(self.__period if timeout is None else max(timeout, self.__period))
+            snapshot = self.__get_snapshot()
+            changed = set([p for p in snapshot.keys() | self.__snapshot.keys() if snapshot.get(p) != self.__snapshot.get(p)])
+            self.__snapshot = snapshot
+        # Changes of ignored files only neither end waiting nor extend the debounce time
+        return set([p for p in changed if self.__is_ignored(p) is not True])
+
+
+    def __start_inotify(self):
+        self.__libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.__fd = fd
+        self.__add_watches(self.__path)
+
+
+    def __add_watches(self, path):
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if d.startswith('.') is not True]
+            wd = self.__libc.inotify_add_watch(self.__fd, os.fsencode(root), self.__INOTIFY_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for "{root}"')
+            self.__watches[wd] = root
+
+
+    def __read_inotify(self, timeout):
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+        try:
+            data = os.read(self.__fd, self.__READ_SIZE)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + self.__EVENT_SIZE <= len(data):
+            wd, mask, cookie, length = struct.unpack_from(self.__EVENT_FORMAT, data, offset)
+            offset += self.__EVENT_SIZE
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & self.__IN_Q_OVERFLOW:
+                # Events have been lost, so the whole tree is considered changed
+                self.__is_overflowed = True
+                continue
+            if mask & self.__IN_IGNORED:
+                self.__watches.pop(wd, None)
+                continue
+            root = self.__watches.get(wd)
+            if root is None:
+                continue
+            path = os.path.join(root, name) if len(name) > 0 else root
+            if mask & self.__IN_ISDIR and mask & (self.__IN_CREATE | self.__IN_MOVED_TO) and os.path.isdir(path):
+                self.__add_watches(path)
+            changed.add(path)
+        return changed
+
+
+    def __get_snapshot(self):
+        snapshot = {}
+        for root, dirs, files in os.walk(self.__path):
+            dirs[:] = [d for d in dirs if d.startswith('.') is not True]
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    status = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (status.st_mtime_ns, status.st_size)
+        return snapshot
+
+
+    @staticmethod
+    def __is_ignored(path):
+        name = os.path.basename(path)
+        return name.startswith('.') or name.endswith('~')
+
+
+    __IN_MODIFY = 0x00000002
+    __IN_ATTRIB = 0x00000004
+    __IN_CLOSE_WRITE = 0x00000008
+    __IN_MOVED_FROM = 0x00000040
+    __IN_MOVED_TO = 0x00000080
+    __IN_CREATE = 0x00000100
+    __IN_DELETE = 0x00000200
+    __IN_Q_OVERFLOW = 0x00004000
+    __IN_IGNORED = 0x00008000
+    __IN_ISDIR = 0x40000000
+    __INOTIFY_MASK = __IN_MODIFY | __IN_ATTRIB | __IN_CLOSE_WRITE | __IN_MOVED_FROM | __IN_MOVED_TO | __IN_CREATE | __IN_DELETE
+    __EVENT_FORMAT = 'iIII'
+    __EVENT_SIZE = struct.calcsize('iIII')
+    __READ_SIZE = 64 * 1024
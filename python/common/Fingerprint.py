@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# @file      Fingerprint.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import time
+import fnmatch
+import hashlib
+
+class FileDigests:
+    """
+    Digests of file contents kept by file sizes and modification times.
+
+    Files which sizes and modification times are unchanged since their digests
+    were calculated are not read again. Files modified a moment ago are not
+    kept, as they can be modified again within the resolution of the time.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the file of the digests.
+        """
+        self.__path = path
+        self.__digests = {}
+        self.__is_changed = False
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as file:
+                    self.__digests = json.load(file)
+            except (OSError, ValueError):
+                self.__digests = {}
+
+
+    def get(self, path):
+        """
+        Returns digest of content of a file.
+        """
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        entry = self.__digests.get(path)
+        if entry is not None and entry[0] == info.st_size and entry[1] == info.st_mtime_ns:
+            return entry[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.__CHUNK_SIZE), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        if time.time() - info.st_mtime > self.__RACY_TIME:
+            self.__digests[path] = [info.st_size, info.st_mtime_ns, digest]
+            self.__is_changed = True
+        return digest
+
+
+    def save(self):
+        """
+        Saves the digests to the file if they have been changed.
+        """
+        if self.__is_changed is not True:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.__path)), exist_ok=True)
+        temp = f'{self.__path}.{os.getpid()}.tmp'
+        with open(temp, 'w') as file:
+            json.dump(self.__digests, file)
+        os.replace(temp, self.__path)
+        self.__is_changed = False
+
+
+    __CHUNK_SIZE = 1024 * 1024
+    __RACY_TIME = 2.0
+
+
+class Fingerprint:
+    """
+    Fingerprint of strings, files and directory trees.
+    """
+
+    def __init__(self, digests=None):
+        """
+        Args:
+            digests (FileDigests): digests of files to be added instead of their contents, or None.
+        """
+        self.__hash = hashlib.sha256()
+        self.__digests = digests
+
+
+    def add_string(self, string):
+        """
+        Adds a string to the fingerprint.
+        """
+        self.__hash.update(string.encode('utf-8'))
+        self.__hash.update(b'\0')
+
+
+    def add_file(self, path):
+        """
+        Adds content of a file to the fingerprint.
+        """
+        if os.path.isfile(path) is not True:
+            self.add_string('<none>')
+            return
+        if self.__digests is not None:
+            self.add_string( self.__digests.get(path) )
+            return
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(self.__CHUNK_SIZE), b''):
+                self.__hash.update(chunk)
+        self.__hash.update(b'\0')
+
+
+    def add_tree(self, path, patterns, excludes=None):
+        """
+        Adds files of a directory tree which names match the given patterns.
+
+        Args:
+            path (str): root directory of the tree.
+            patterns (list): file name patterns to be added.
+            excludes (list): absolute paths of directories to be skipped.
+        """
+        if excludes is None:
+            excludes = []
+        excludes = [os.path.abspath(e) for e in excludes]
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted([d for d in dirs \
+                if d.startswith('.') is not True and os.path.abspath(os.path.join(root, d)) not in excludes])
+            for name in sorted(files):
+                if any([fnmatch.fnmatch(name, p) for p in patterns]):
+                    file = os.path.join(root, name)
+                    self.add_string(os.path.relpath(file, path))
+                    self.add_file(file)
+
+
+    def get(self):
+        """
+        Returns the fingerprint as a hexadecimal string.
+        """
+        return self.__hash.hexdigest()
+
+
+    __CHUNK_SIZE = 1024 * 1024
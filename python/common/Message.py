@@ -3,46 +3,327 @@
 # @author    Sergey Baigudin, sergey@baigudin.software
 # @copyright 2023, Sergey Baigudin, Baigudin Software
 
+import os
 import sys
+import json
+import time
+import logging
+import threading
+import contextlib
+import logging.handlers
+
 from common.System import System
 
 class Message:
+    """
+    Output of messages of the builder and output lines of its sub-processes.
+
+    Messages are records of a logger which are passed to sinks. The console
+    sink writes colored text or JSON lines, and in the quiet mode only errors,
+    warnings and blocks. The log file sink keeps all messages and the whole
+    output of the sub-processes with their sources in a rotating file.
+    """
 
     OK = 1
     ERR = 2
     INF = 3
     NOR = 4
+    WRN = 5
+
+    OUTPUT = logging.INFO - 5
+
+    TEXT = 'text'
+    JSON = 'json'
+    FORMATS = [TEXT, JSON]
 
     @staticmethod
-    def out(string, status=None, is_block=None):
-        color_bgn = Message.__COLOR_END
-        color_end = Message.__COLOR_END
-
-        if status == Message.OK:
-            color_bgn = Message.__COLOR_OK
-        elif  status == Message.ERR:
-            color_bgn = Message.__COLOR_ERR
-        elif status == Message.INF:
-            color_bgn = Message.__COLOR_INF
-        elif status == Message.NOR:
-            color_bgn = Message.__COLOR_NOR
+    def configure(is_quiet=False, output_format=TEXT, path_to_log=None, log_queue=None):
+        """
+        Sets sinks of messages up, replacing the current ones.
+
+        Args:
+            is_quiet (bool): write only errors, warnings and blocks to the console.
+            output_format (str): format of the console output, TEXT or JSON.
+            path_to_log (str): path to the rotating log file, or None for no log file.
+            log_queue (multiprocessing.Queue): queue to pass messages to the log file of another process, or None.
+        """
+        logger = logging.getLogger(Message.__LOGGER_NAME)
+        for handler in list(logger.handlers):
+            # The log file sink is a target of a memory buffer, which is not closed with the buffer
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
+            logger.removeHandler(handler)
+        Message.__file = None
+        logging.addLevelName(Message.OUTPUT, 'OUTPUT')
+        logger.setLevel(Message.OUTPUT)
+        logger.propagate = False
+        if output_format == Message.JSON:
+            console = ConsoleSink(JsonFormatter(), is_stderr_split=False)
         else:
-            color_bgn = Message.__COLOR_END
+            console = ConsoleSink( TextFormatter(System.is_win32() is not True and 'NO_COLOR' not in os.environ) )
+        if is_quiet is True:
+            console.addFilter(lambda record: record.levelno >= logging.WARNING or record.is_block is True)
+        logger.addHandler(console)
+        if path_to_log is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path_to_log)), exist_ok=True)
+            Message.__file = logging.handlers.RotatingFileHandler(path_to_log, maxBytes=Message.__LOG_SIZE, \
+                backupCount=Message.__LOG_BACKUPS, encoding='utf-8')
+            Message.__file.setFormatter( TextFormatter(False, True, Message.__LOG_FORMAT) )
+            logger.addHandler( logging.handlers.MemoryHandler(Message.__LOG_CAPACITY, logging.ERROR, Message.__file) )
+        elif log_queue is not None:
+            logger.addHandler( logging.handlers.MemoryHandler(Message.__LOG_CAPACITY, logging.ERROR, \
+                logging.handlers.QueueHandler(log_queue)) )
+        if Message.__configuration is None and hasattr(os, 'register_at_fork'):
+            # Buffered messages would be written twice by a forked process
+            os.register_at_fork(before=Message.flush)
+        Message.__configuration = (is_quiet, output_format, path_to_log, log_queue)
 
-        if System.is_win32():
-            color_bgn = ''
-            color_end = ''            
 
-        if is_block is not True:
-            print(color_bgn + string + color_end, flush=True)
-        else:
-            print(color_bgn + '-------------------------------------------------------------------------------' + color_end, flush=True)
-            print(color_bgn + ' ' + string + color_end, flush=True)
-            print(color_bgn + '-------------------------------------------------------------------------------' + color_end, flush=True)
-            
-
-    __COLOR_OK  = '\033[32m'
-    __COLOR_ERR = '\033[31m'
-    __COLOR_INF = '\033[93m'    
-    __COLOR_NOR = '\033[0m'
+    @staticmethod
+    def get_configuration(log_queue=None):
+        """
+        Returns arguments of the configure method the sinks have been set up with, to set them up in other processes.
+
+        Args:
+            log_queue (multiprocessing.Queue): queue to pass messages to the log file of this process
+                instead of opening the file, or None.
+        """
+        Message.__get_logger()
+        is_quiet, output_format, path_to_log, _ = Message.__configuration
+        if log_queue is not None and path_to_log is not None:
+            # Rotations of one file by several processes would overwrite each other
+            return (is_quiet, output_format, None, log_queue)
+        return Message.__configuration
+
+
+    @staticmethod
+    @contextlib.contextmanager
+    def listen(log_queue):
+        """
+        Writes messages other processes pass to the queue to the log file while a code block is executed.
+
+        Args:
+            log_queue (multiprocessing.Queue): queue of the messages.
+        """
+        Message.__get_logger()
+        if Message.__file is None:
+            yield
+            return
+        listener = logging.handlers.QueueListener(log_queue, Message.__file)
+        listener.start()
+        try:
+            yield
+        finally:
+            listener.stop()
+
+
+    @staticmethod
+    def out(string, status=None, is_block=None):
+        level = Message.__LEVELS.get(status, logging.INFO)
+        Message.__get_logger().log(level, string, extra={'status': status, 'is_block': is_block is True, \
+            'is_stderr': False, 'source': None})
+
+
+    @staticmethod
+    def output(line, is_stderr=False, source=None):
+        """
+        Outputs a line of a sub-process.
+
+        Args:
+            line (str): output line.
+            is_stderr (bool): the line is from stderr of the sub-process.
+            source (str): name of the sub-process.
+        """
+        Message.__get_logger().log(Message.OUTPUT, line.rstrip('\r\n'), extra={'status': None, 'is_block': False, \
+            'is_stderr': is_stderr, 'source': source})
+
+
+    @staticmethod
+    def flush():
+        """
+        Writes all buffered messages out.
+        """
+        for handler in logging.getLogger(Message.__LOGGER_NAME).handlers:
+            handler.flush()
+
+
+    @staticmethod
+    def __get_logger():
+        if Message.__configuration is None:
+            Message.configure()
+        return logging.getLogger(Message.__LOGGER_NAME)
+
+
+    __configuration = None
+    __file = None
+    __LOGGER_NAME = 'eoos'
+    __LOG_FORMAT = '%(asctime)s %(process)d %(levelname)s %(message)s'
+    __LOG_SIZE = 16 * 1024 * 1024
+    __LOG_BACKUPS = 4
+    __LOG_CAPACITY = 1024
+    __LEVELS = {ERR: logging.ERROR, WRN: logging.WARNING}
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Formatter of messages to colored text lines.
+
+    Colors are chosen once, when the formatter is created. If a format is
+    given, lines are formatted by it as lines of a log file, and blocks are
+    not framed by separators.
+    """
+
+    def __init__(self, is_colored=True, is_source_shown=False, fmt=None):
+        """
+        Args:
+            is_colored (bool): color messages by their statuses.
+            is_source_shown (bool): prefix output lines of sub-processes with names of the sub-processes.
+            fmt (str): format of lines with the message field, or None.
+        """
+        super().__init__(fmt)
+        self.__colors = {s: (c if is_colored is True else '') for s, c in self.__COLORS.items()}
+        self.__end = self.__COLOR_END if is_colored is True else ''
+        self.__is_source_shown = is_source_shown
+        self.__is_formatted = fmt is not None
+
+
+    def format(self, record):
+        text = self.__format_text(record)
+        if self.__is_formatted is not True:
+            return text
+        record.message = text
+        record.asctime = self.formatTime(record, self.datefmt)
+        return self.formatMessage(record)
+
+
+    def __format_text(self, record):
+        text = record.getMessage()
+        if record.levelno == Message.OUTPUT:
+            if self.__is_source_shown is True and record.source is not None:
+                return f'[{record.source}] {text}'
+            return text
+        begin = self.__colors.get(record.status, self.__end)
+        if record.is_block is not True or self.__is_formatted is True:
+            return begin + text + self.__end
+        separator = begin + self.__SEPARATOR + self.__end
+        return '\n'.join([separator, begin + ' ' + text + self.__end, separator])
+
+
+    __SEPARATOR = '-------------------------------------------------------------------------------'
     __COLOR_END = '\033[0m'
+    __COLORS = {
+        Message.OK: '\033[32m',
+        Message.ERR: '\033[31m',
+        Message.INF: '\033[93m',
+        Message.NOR: '\033[0m',
+        Message.WRN: '\033[35m',
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatter of messages to JSON lines for continuous integration systems.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': round(record.created, 6),
+            'level': record.levelname.lower(),
+            'status': self.__STATUSES.get(record.status),
+            'block': record.is_block if record.is_block is True else None,
+            'source': record.source,
+            'stream': ('stderr' if record.is_stderr is True else 'stdout') if record.levelno == Message.OUTPUT else None,
+            'message': record.getMessage(),
+        }
+        return json.dumps({k: v for k, v in entry.items() if v is not None})
+
+
+    __STATUSES = {Message.OK: 'ok', Message.ERR: 'error', Message.INF: 'info', Message.NOR: 'normal', Message.WRN: 'warning'}
+
+
+class ConsoleSink(logging.Handler):
+    """
+    Console sink which buffers formatted messages and writes them in batches.
+
+    Errors and blocks are written at once, and other messages are written by
+    a background thread a short interval after them, so a flood of output
+    lines costs a few writes instead of a flushed write per line. The streams
+    are looked up at writing, so redirections of sys.stdout and sys.stderr are
+    followed.
+    """
+
+    def __init__(self, formatter, is_stderr_split=True, interval=0.1):
+        """
+        Args:
+            formatter (logging.Formatter): formatter of messages.
+            is_stderr_split (bool): write output lines of sub-processes from their stderr to sys.stderr.
+            interval (float): maximum time in seconds messages are held in the buffer.
+        """
+        super().__init__()
+        self.setFormatter(formatter)
+        self.__is_stderr_split = is_stderr_split
+        self.__interval = interval
+        self.__buffer = []
+        self.__size = 0
+        self.__pending = None
+        self.__pid = None
+
+
+    def emit(self, record):
+        try:
+            text = self.format(record) + '\n'
+            self.__buffer.append( (self.__is_stderr_split is True and record.is_stderr is True, text) )
+            self.__size += len(text)
+            if record.levelno >= logging.ERROR or record.is_block is True or self.__size >= self.__BUFFER_LIMIT:
+                self.__write()
+            else:
+                self.__schedule()
+        except Exception:
+            self.handleError(record)
+
+
+    def flush(self):
+        self.acquire()
+        try:
+            self.__write()
+        finally:
+            self.release()
+
+
+    def __schedule(self):
+        # Threads do not survive forking, so a forked process starts its own one
+        if self.__pid != os.getpid():
+            self.__pid = os.getpid()
+            self.__pending = threading.Event()
+            threading.Thread(target=self.__run, args=(self.__pending,), daemon=True).start()
+        self.__pending.set()
+
+
+    def __run(self, pending):
+        while True:
+            pending.wait()
+            time.sleep(self.__interval)
+            pending.clear()
+            self.flush()
+
+
+    def __write(self):
+        if len(self.__buffer) == 0:
+            return
+        chunks = []
+        for is_stderr, text in self.__buffer:
+            if len(chunks) > 0 and chunks[-1][0] == is_stderr:
+                chunks[-1][1].append(text)
+            else:
+                chunks.append( (is_stderr, [text]) )
+        self.__buffer = []
+        self.__size = 0
+        for is_stderr, texts in chunks:
+            stream = sys.stderr if is_stderr is True else sys.stdout
+            stream.write(''.join(texts))
+            stream.flush()
+
+
+    __BUFFER_LIMIT = 64 * 1024
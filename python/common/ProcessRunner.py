@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# @file      ProcessRunner.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import time
+import signal
+import asyncio
+import threading
+import subprocess
+
+from common.Tracer import Tracer
+from common.Message import Message
+
+class Process:
+    """
+    Sub-process to be executed by a process runner.
+
+    After the execution the object holds the return code, timing, CPU time of
+    the sub-process and its descendants if the host gives it, and the captured
+    output of the sub-process.
+    """
+
+    def __init__(self, args, cwd, env=None, timeout=None, on_line=None, name=None, capture=False, output=True, \
+        idle_timeout=None, **kwargs):
+        """
+        Args:
+            args (list): command and its arguments.
+            cwd (str): working directory of the sub-process.
+            env (dict): environment of the sub-process, or None to inherit the current one.
+            timeout (float): time limit in seconds, or None.
+            on_line (callable): function called as on_line(process, line, is_stderr) for each output line.
+            name (str): name of the sub-process for traces and messages.
+            capture (bool): store stdout lines in the output attribute.
+            output (bool): print output lines of the sub-process.
+            idle_timeout (float): time limit in seconds of silence after the first output line, or None.
+            kwargs: other arguments passed to the sub-process creation, for example pass_fds.
+        """
+        self.args = list(args)
+        self.cwd = cwd
+        self.env = env
+        self.timeout = timeout
+        self.on_line = on_line
+        self.name = name if name is not None else ' '.join([str(a) for a in self.args])
+        self.capture = capture
+        self.output = output
+        self.idle_timeout = idle_timeout
+        self.kwargs = kwargs
+        self.returncode = None
+        self.timed_out = False
+        self.cancelled = False
+        self.stopped = False
+        self.start = None
+        self.duration = None
+        self.children = None
+        self.lines = []
+
+
+class ChildProcess:
+    """
+    Child process waited by os.wait4 in a thread of its own.
+
+    Sub-processes of asyncio are reaped by the event loop, which drops their
+    resource usage, so CPU time of the child and its descendants is taken
+    from os.wait4 here. The object provides the part of the interface of
+    asyncio sub-processes used by the runner.
+    """
+
+    @staticmethod
+    def is_supported():
+        """
+        Checks if the host can wait for child processes with their resource usage.
+        """
+        return hasattr(os, 'wait4')
+
+
+    @staticmethod
+    async def create(args, cwd, env, limit, **kwargs):
+        """
+        Starts a child process with its stdout and stderr read by stream readers of the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        popen = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        streams = []
+        for pipe in [popen.stdout, popen.stderr]:
+            stream = asyncio.StreamReader(limit=limit, loop=loop)
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stream, loop=loop), pipe)
+            streams.append(stream)
+        return ChildProcess(popen, loop, streams[0], streams[1])
+
+
+    def __init__(self, popen, loop, stdout, stderr):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+        self.cpu = None
+        self.__popen = popen
+        self.__exited = loop.create_future()
+        threading.Thread(target=self.__wait, args=(loop,), daemon=True).start()
+
+
+    async def wait(self):
+        # The waiting is shared by all callers, so a cancelled caller does not cancel it for others
+        return await asyncio.shield(self.__exited)
+
+
+    def terminate(self):
+        self.__send_signal(signal.SIGTERM)
+
+
+    def kill(self):
+        self.__send_signal(signal.SIGKILL)
+
+
+    def __send_signal(self, number):
+        # Popen.send_signal would poll, that is reap, the child out of the waiting thread
+        if self.returncode is not None:
+            return
+        os.kill(self.__popen.pid, number)
+
+
+    def __wait(self, loop):
+        _, status, usage = os.wait4(self.__popen.pid, 0)
+        self.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        self.cpu = usage.ru_utime + usage.ru_stime
+        # Popen must not wait for the reaped child itself
+        self.__popen.returncode = self.returncode
+        try:
+            loop.call_soon_threadsafe(self.__set_exited)
+        except RuntimeError:
+            # The loop has been closed
+            pass
+
+
+    def __set_exited(self):
+        if self.__exited.done() is not True:
+            self.__exited.set_result(self.returncode)
+
+
+class ProcessRunner:
+    """
+    Asynchronous runner of sub-processes.
+
+    Sub-processes are started with an explicit working directory, so the
+    working directory of the builder is never changed. Their stdout and stderr
+    are read line by line into a bounded buffer, which holds the sub-processes
+    back if the output cannot be consumed fast enough. Several sub-processes
+    can be executed at the same time, each with its own timeout, and all of
+    them can be cancelled from a line callback or another thread.
+    """
+
+    TIMEOUT = -1000
+    CANCELLED = -1001
+    STOPPED = -1002
+
+    def __init__(self, tracer=None, buffer_size=1024):
+        """
+        Args:
+            tracer (Tracer): tracer of the sub-processes, or None.
+            buffer_size (int): maximum number of buffered output lines of each sub-process.
+        """
+        self.__tracer = tracer
+        self.__buffer_size = buffer_size
+        self.__runs = []
+        self.__children = {}
+        self.__is_cancelled = False
+        self.__lock = threading.Lock()
+
+
+    def run(self, process):
+        """
+        Executes one sub-process.
+
+        Returns:
+            int: return code, TIMEOUT or CANCELLED.
+        """
+        return self.run_many([process])[0]
+
+
+    def run_many(self, processes):
+        """
+        Executes sub-processes at the same time.
+
+        Returns:
+            list: return codes, TIMEOUT or CANCELLED of the sub-processes.
+        """
+        with self.__lock:
+            self.__is_cancelled = False
+        return asyncio.run( self.__run_all(processes) )
+
+
+    def cancel(self):
+        """
+        Cancels all executing sub-processes.
+
+        The function can be called from a line callback or any other thread.
+        """
+        with self.__lock:
+            self.__is_cancelled = True
+            runs = list(self.__runs)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        for loop, tasks in runs:
+            for task in tasks:
+                if loop is running_loop:
+                    task.cancel()
+                else:
+                    loop.call_soon_threadsafe(task.cancel)
+
+
+    def stop(self, process):
+        """
+        Terminates one executing sub-process which has done its work, other sub-processes keep running.
+
+        The function can be called from a line callback or any other thread.
+        """
+        with self.__lock:
+            entry = self.__children.get(process)
+        if entry is None:
+            return
+        process.stopped = True
+        loop, child = entry
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if loop is running_loop:
+            self.__send_terminate(child)
+        else:
+            loop.call_soon_threadsafe(self.__send_terminate, child)
+
+
+    async def __run_all(self, processes):
+        run = (asyncio.get_running_loop(), [asyncio.ensure_future(self.__run(p)) for p in processes])
+        tasks = run[1]
+        with self.__lock:
+            self.__runs.append(run)
+            is_cancelled = self.__is_cancelled
+        if is_cancelled:
+            for task in tasks:
+                task.cancel()
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            with self.__lock:
+                self.__runs.remove(run)
+        for process, task in zip(processes, tasks):
+            if task.cancelled():
+                process.cancelled = True
+                process.returncode = ProcessRunner.CANCELLED
+            elif task.exception() is not None:
+                raise task.exception()
+        return [p.returncode for p in processes]
+
+
+    async def __run(self, process):
+        process.start = time.time()
+        child = None
+        try:
+            if ChildProcess.is_supported():
+                child = await ChildProcess.create(process.args, process.cwd, process.env, self.__LINE_LIMIT, **process.kwargs)
+            else:
+                child = await asyncio.create_subprocess_exec(*process.args, cwd=process.cwd, env=process.env, \
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, limit=self.__LINE_LIMIT, **process.kwargs)
+            queue = asyncio.Queue(maxsize=self.__buffer_size)
+            readers = [
+                asyncio.ensure_future(self.__read(child.stdout, False, queue)),
+                asyncio.ensure_future(self.__read(child.stderr, True, queue)),
+            ]
+            consumer = asyncio.ensure_future(self.__consume(process, queue, len(readers)))
+            with self.__lock:
+                self.__children[process] = (asyncio.get_running_loop(), child)
+            try:
+                await asyncio.wait_for(asyncio.gather(child.wait(), consumer, *readers), process.timeout)
+                process.returncode = child.returncode if process.stopped is not True else ProcessRunner.STOPPED
+            except asyncio.TimeoutError:
+                process.timed_out = True
+                process.returncode = ProcessRunner.TIMEOUT
+                await self.__terminate(child)
+            finally:
+                with self.__lock:
+                    self.__children.pop(process, None)
+                for task in readers + [consumer]:
+                    task.cancel()
+        except asyncio.CancelledError:
+            if child is not None:
+                await self.__terminate(child)
+            raise
+        finally:
+            process.duration = time.time() - process.start
+            process.children = getattr(child, 'cpu', None)
+            if self.__tracer is not None:
+                self.__tracer.record(process.name, Tracer.SUBPROCESS, process.start, process.duration, \
+                    children=process.children)
+        return process.returncode
+
+
+    async def __read(self, stream, is_stderr, queue):
+        is_continued = False
+        while True:
+            try:
+                line = await stream.readuntil(b'\n')
+                if is_continued is True and len(line.rstrip(b'\r\n')) == 0:
+                    # The line end of a line passed in chunks
+                    is_continued = False
+                    continue
+                is_continued = False
+            except asyncio.IncompleteReadError as e:
+                # The last line has no line end
+                line = e.partial
+            except asyncio.LimitOverrunError as e:
+                # The line is longer than the limit, so it is left in the stream and passed in chunks
+                line = await stream.read(max(1, e.consumed))
+                is_continued = True
+            if len(line) == 0:
+                break
+            await queue.put( (line.decode('utf-8', errors='replace'), is_stderr) )
+        await queue.put(None)
+
+
+    async def __consume(self, process, queue, readers):
+        has_lines = False
+        while readers > 0:
+            if process.idle_timeout is not None and has_lines is True and process.stopped is not True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), process.idle_timeout)
+                except asyncio.TimeoutError:
+                    # Output is still consumed until the sub-process exits
+                    self.stop(process)
+                    continue
+            else:
+                item = await queue.get()
+            if item is None:
+                readers -= 1
+                continue
+            line, is_stderr = item
+            has_lines = True
+            if process.output is True:
+                Message.output(line, is_stderr, process.name)
+            if process.capture is True and is_stderr is not True:
+                process.lines.append(line.rstrip('\r\n'))
+            if process.on_line is not None:
+                process.on_line(process, line.rstrip('\r\n'), is_stderr)
+
+
+    @staticmethod
+    def __send_terminate(child):
+        if child.returncode is not None:
+            return
+        try:
+            child.terminate()
+        except ProcessLookupError:
+            pass
+
+
+    async def __terminate(self, child):
+        if child.returncode is not None:
+            return
+        try:
+            child.terminate()
+            await asyncio.wait_for(asyncio.shield(child.wait()), self.__TERMINATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            child.kill()
+            await child.wait()
+        except ProcessLookupError:
+            pass
+
+
+    __LINE_LIMIT = 1024 * 1024
+    __TERMINATE_TIMEOUT = 5.0
@@ -3,6 +3,11 @@
 # @author    Sergey Baigudin, sergey@baigudin.software
 # @copyright 2023, Sergey Baigudin, Baigudin Software
 
+import os
+import ctypes
+import subprocess
+import multiprocessing
+
 from sys import platform
 
 class System:
@@ -15,3 +20,99 @@ class System:
     def is_win32():
         return platform == 'win32'
 
+    @staticmethod
+    def get_cpu_count():
+        """
+        Returns number of CPUs available for the process.
+        """
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @staticmethod
+    def get_memory():
+        """
+        Returns tuple of total and available system memory in bytes, or None if unknown.
+        """
+        if System.is_linux():
+            info = {}
+            try:
+                with open('/proc/meminfo', 'r') as file:
+                    for line in file:
+                        fields = line.split()
+                        if len(fields) >= 2:
+                            info[fields[0].rstrip(':')] = int(fields[1]) * 1024
+            except (OSError, ValueError):
+                return None
+            if 'MemTotal' not in info or 'MemAvailable' not in info:
+                return None
+            return (info['MemTotal'], info['MemAvailable'])
+        if System.is_win32():
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ('dwLength', ctypes.c_ulong),
+                    ('dwMemoryLoad', ctypes.c_ulong),
+                    ('ullTotalPhys', ctypes.c_ulonglong),
+                    ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong),
+                    ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong),
+                    ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+                ]
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)) == 0:
+                return None
+            return (status.ullTotalPhys, status.ullAvailPhys)
+        return None
+
+    @staticmethod
+    def get_pool_context():
+        """
+        Returns multiprocessing context for process pools created while other threads are running.
+
+        Forked workers would inherit locks held by other threads, so workers are started by
+        a fork server, or spawned where it is not available.
+        """
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('forkserver')
+        return multiprocessing.get_context('spawn')
+
+    @staticmethod
+    def get_memory_pressure():
+        """
+        Returns percentage of time some tasks stalled on memory in the last 10 seconds, or None if unknown.
+        """
+        if System.is_linux() is not True:
+            return None
+        try:
+            with open('/proc/pressure/memory', 'r') as file:
+                for line in file:
+                    fields = line.split()
+                    if len(fields) > 1 and fields[0] == 'some':
+                        return float(fields[1].split('=')[1])
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    @staticmethod
+    def get_commit(path):
+        """
+        Returns short hash of the git commit checked out in a directory, or None if unknown.
+
+        The hash has the "-dirty" suffix if tracked files have uncommitted changes.
+        """
+        try:
+            ret = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=path, \
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+            if ret.returncode != 0:
+                return None
+            commit = ret.stdout.strip()
+            ret = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=path, \
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        except OSError:
+            return None
+        if ret.returncode == 0 and len(ret.stdout.strip()) > 0:
+            commit += '-dirty'
+        return commit
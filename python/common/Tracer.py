@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# @file      Tracer.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import time
+import threading
+
+from contextlib import contextmanager
+from common.Message import Message
+
+class Tracer:
+    """
+    Tracer of execution phases and sub-processes.
+
+    Each span records its wall time, CPU time of the thread executing it and,
+    if the host provides it, CPU time of the sub-processes it has waited for.
+    Stages are executed by concurrent threads, so times of the whole process
+    are not used. The spans are exported in the Chrome trace event format.
+    """
+
+    PHASE = 'phase'
+    SUBPROCESS = 'subprocess'
+    NESTED = 'nested'
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): name of the traced process shown in the trace.
+        """
+        self.__name = name
+        self.__spans = []
+        self.__threads = {}
+        self.__lock = threading.Lock()
+
+
+    @contextmanager
+    def span(self, name, category):
+        """
+        Traces execution of a code block.
+
+        CPU time of child processes of the span is the sum of the sub-process
+        spans recorded by the same thread while the block is executed.
+
+        Args:
+            name (str): name of the span.
+            category (str): PHASE, SUBPROCESS or NESTED.
+        """
+        wall_start = time.time()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.time() - wall_start
+            cpu = time.thread_time() - cpu_start
+            self.record(name, category, wall_start, wall, cpu, self.__get_children_time(wall_start, wall))
+
+
+    def record(self, name, category, start, wall, cpu=0.0, children=None):
+        """
+        Records a span measured by a caller.
+
+        Args:
+            name (str): name of the span.
+            category (str): PHASE, SUBPROCESS or NESTED.
+            start (float): start time in seconds since the epoch.
+            wall (float): wall time in seconds.
+            cpu (float): CPU time of the process in seconds.
+            children (float): CPU time of child processes in seconds, or None.
+        """
+        with self.__lock:
+            tid = self.__threads.setdefault(threading.get_ident(), len(self.__threads))
+            self.__spans.append({
+                'name': name,
+                'category': category,
+                'start': start,
+                'wall': wall,
+                'cpu': cpu,
+                'children': children,
+                'tid': tid,
+            })
+
+
+    def add(self, tracer, prefix):
+        """
+        Records spans of a nested tracer.
+
+        Phases of the nested tracer are recorded as NESTED spans, so they are
+        not counted as phases of this one, and each of its threads gets its
+        own thread of this tracer.
+
+        Args:
+            tracer (Tracer): nested tracer.
+            prefix (str): prefix of names of the spans.
+        """
+        spans = tracer.get_spans()
+        with self.__lock:
+            for span in spans:
+                span['name'] = f'{prefix} {span["name"]}'
+                if span['category'] == Tracer.PHASE:
+                    span['category'] = Tracer.NESTED
+                span['tid'] = self.__threads.setdefault((id(tracer), span['tid']), len(self.__threads))
+                self.__spans.append(span)
+
+
+    def get_spans(self, category=None):
+        """
+        Returns recorded spans of the given category, or all spans.
+        """
+        with self.__lock:
+            return [dict(s) for s in self.__spans if category is None or s['category'] == category]
+
+
+    def get_events(self):
+        """
+        Returns recorded spans as Chrome trace events.
+        """
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': self.__name}}]
+        for span in self.get_spans():
+            args = {'cpu_s': round(span['cpu'], 6)}
+            if span['children'] is not None:
+                args['children_cpu_s'] = round(span['children'], 6)
+            events.append({
+                'name': span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'ts': int(span['start'] * 1000000),
+                'dur': int(span['wall'] * 1000000),
+                'pid': pid,
+                'tid': span['tid'],
+                'args': args,
+            })
+        return events
+
+
+    def print_summary(self):
+        """
+        Prints a table of phases with their sub-processes.
+
+        The self time of a phase is its wall time excluding its sub-processes,
+        that is the time spent in the builder itself.
+        """
+        spans = sorted(self.get_spans(), key=lambda s: s['start'])
+        phases = [s for s in spans if s['category'] == Tracer.PHASE]
+        if len(phases) == 0:
+            return
+        Message.out(f'[TIME] {"Phase":<40} {"Wall":>10} {"Self":>10} {"CPU":>10} {"Children":>10}', Message.INF)
+        for phase in phases:
+            end = phase['start'] + phase['wall']
+            subprocesses = [s for s in spans if s['category'] == Tracer.SUBPROCESS \
+                and s['tid'] == phase['tid'] and s['start'] >= phase['start'] and s['start'] < end]
+            own = phase['wall'] - Tracer.__get_covered_time(subprocesses)
+            Message.out(f'[TIME] {Tracer.__format_row(phase["name"], phase, own)}', Message.INF)
+            for s in subprocesses:
+                Message.out(f'[TIME]   {Tracer.__format_row(s["name"], s, None, 38)}', Message.NOR)
+
+
+    @staticmethod
+    def save(path, events):
+        """
+        Saves Chrome trace events to a JSON file.
+        """
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+    @staticmethod
+    def __get_covered_time(spans):
+        covered = 0.0
+        end = None
+        for span in sorted(spans, key=lambda s: s['start']):
+            span_end = span['start'] + span['wall']
+            if end is None or span['start'] >= end:
+                covered += span['wall']
+                end = span_end
+            elif span_end > end:
+                covered += span_end - end
+                end = span_end
+        return covered
+
+
+    @staticmethod
+    def __format_row(name, span, own, width=40):
+        if len(name) > width:
+            name = name[:width - 3] + '...'
+        own = f'{own:.3f}' if own is not None else ''
+        children = f'{span["children"]:.3f}' if span['children'] is not None else '-'
+        return f'{name:<{width}} {span["wall"]:>10.3f} {own:>10} {span["cpu"]:>10.3f} {children:>10}'
+
+
+    def __get_children_time(self, start, wall):
+        with self.__lock:
+            tid = self.__threads.get(threading.get_ident())
+            times = [s['children'] for s in self.__spans if s['category'] == Tracer.SUBPROCESS and s['tid'] == tid \
+                and s['start'] >= start and s['start'] + s['wall'] <= start + wall]
+        if len(times) == 0 or None in times:
+            return None
+        return sum(times)
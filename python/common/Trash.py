@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# @file      Trash.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import sys
+import time
+import shutil
+import subprocess
+
+from common.System import System
+
+class Trash:
+    """
+    Trash directory which directory trees are moved to and deleted in background.
+
+    A tree is renamed into the trash atomically, so its path is free at once,
+    and the trash is deleted by a detached process which does not hold the
+    builder back and outlives it. Trees left in the trash by interrupted runs
+    are deleted by the next reaping. The trash has to be on the same file
+    system as the moved trees, otherwise they are deleted in place.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the trash directory.
+        """
+        self.__path = os.path.abspath(path)
+
+
+    def move(self, path):
+        """
+        Moves a directory tree or a file to the trash.
+
+        Returns:
+            bool: True if the tree has been moved, False if it has been deleted in place.
+        """
+        os.makedirs(self.__path, exist_ok=True)
+        name = f'{os.path.basename(os.path.normpath(path))}-{os.getpid()}-{time.time_ns()}'
+        try:
+            os.rename(path, os.path.join(self.__path, name))
+        except OSError:
+            # The trash is on another file system, or files of the tree are locked
+            if os.path.isdir(path) and os.path.islink(path) is not True:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            return False
+        return True
+
+
+    def reap(self):
+        """
+        Starts a detached process deleting all trees of the trash.
+
+        Returns:
+            bool: True if the process has been started, False if the trash is empty.
+        """
+        if os.path.isdir(self.__path) is not True or len(os.listdir(self.__path)) == 0:
+            return False
+        kwargs = {}
+        if System.is_win32():
+            kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+        subprocess.Popen([sys.executable, '-c', self.__REAPER, self.__path], stdin=subprocess.DEVNULL, \
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True, **kwargs)
+        return True
+
+
+    # Other builders may reap the same trash at the same time, so missing files are ignored
+    __REAPER = '\n'.join([
+        'import os, sys, shutil',
+        'for name in os.listdir(sys.argv[1]) if os.path.isdir(sys.argv[1]) else []:',
+        '    path = os.path.join(sys.argv[1], name)',
+        '    if os.path.isdir(path) and not os.path.islink(path):',
+        '        shutil.rmtree(path, ignore_errors=True)',
+        '        continue',
+        '    try:',
+        '        os.remove(path)',
+        '    except OSError:',
+        '        pass',
+        'try:',
+        '    os.rmdir(sys.argv[1])',
+        'except OSError:',
+        '    pass',
+    ])
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# @file      AffectedTests.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import re
+import json
+import shlex
+import subprocess
+
+from common.Message import Message
+
+class AffectedTests:
+    """
+    Selection of unit test suites affected by changed files.
+
+    Test translation units are found in the compile commands database of a
+    build tree as sources which define Google Test tests. A test unit is
+    affected if a changed file is in its compiler dependency file. A changed
+    source of a non-test unit stands for the headers with the same name it
+    includes, so tests of the headers are affected by its implementation.
+    If a change cannot be mapped, all tests are affected.
+    """
+
+    def __init__(self, path_to_build_dir, path_to_source_dir):
+        """
+        Args:
+            path_to_build_dir (str): build tree with compile_commands.json.
+            path_to_source_dir (str): root of the source tree.
+        """
+        self.__path_to_build_dir = path_to_build_dir
+        self.__path_to_source_dir = path_to_source_dir
+
+
+    def get_suites(self, ref, since=None, changed=None):
+        """
+        Returns names of test suites affected by changed files.
+
+        Args:
+            ref (str): git revision the working tree is compared with.
+            since (float): time of the last test run used if the sources are not a git repository, or None.
+            changed (list): absolute paths of changed files used instead of git and modification times, or None.
+
+        Returns:
+            set: names of affected test suites, or None if all tests are affected.
+        """
+        units = self.load_units(self.__path_to_build_dir)
+        if units is None:
+            Message.out(f'[AFFECTED] No compile commands found, all tests are affected', Message.INF)
+            return None
+        if changed is not None:
+            changed = set([os.path.normpath(c) for c in changed])
+        else:
+            changed = self.__get_changed_files(ref, since, units)
+        if changed is None:
+            Message.out(f'[AFFECTED] Changed files are unknown, all tests are affected', Message.INF)
+            return None
+        Message.out(f'[AFFECTED] {len(changed)} changed files', Message.INF)
+        tests = {}
+        for unit in units:
+            suites = self.__get_test_suites(unit['file'])
+            if len(suites) > 0:
+                tests[unit['file']] = (unit, suites)
+        targets = set()
+        for path in changed:
+            if os.path.basename(path) == 'CMakeLists.txt' or path.endswith('.cmake'):
+                Message.out(f'[AFFECTED] "{os.path.relpath(path, self.__path_to_source_dir)}" changes the build, ' \
+                    'all tests are affected', Message.INF)
+                return None
+            if path in tests or self.__is_source(path) is not True:
+                targets.add(path)
+                continue
+            unit = next((u for u in units if u['file'] == path), None)
+            headers = self.__get_own_headers(unit) if unit is not None else []
+            if len(headers) == 0:
+                Message.out(f'[AFFECTED] "{os.path.relpath(path, self.__path_to_source_dir)}" cannot be mapped to tests, ' \
+                    'all tests are affected', Message.INF)
+                return None
+            targets.update(headers)
+        affected = set()
+        for file, (unit, suites) in tests.items():
+            dependencies = self.get_dependencies(unit)
+            if dependencies is None or file in targets or len(targets & dependencies) > 0:
+                affected.update(suites)
+        return affected
+
+
+    @staticmethod
+    def load_units(path_to_build_dir):
+        """
+        Returns translation units of the compile commands database of a build tree, or None.
+
+        A unit is a dictionary with the working directory, absolute path to the source file,
+        compiler arguments and the output file, which is None if the database does not have it.
+        """
+        path = os.path.join(path_to_build_dir, AffectedTests.__COMPILE_COMMANDS_FILE)
+        if os.path.isfile(path) is not True:
+            return None
+        with open(path, 'r') as file:
+            entries = json.load(file)
+        units = []
+        for entry in entries:
+            directory = entry['directory']
+            if 'arguments' in entry:
+                arguments = list(entry['arguments'])
+            else:
+                arguments = shlex.split(entry['command'])
+            units.append({
+                'directory': directory,
+                'file': os.path.normpath(os.path.join(directory, entry['file'])),
+                'arguments': arguments,
+                'output': entry.get('output'),
+            })
+        return units
+
+
+    @staticmethod
+    def get_dependencies(unit):
+        """
+        Returns absolute paths of files a translation unit depends on from its compiler dependency file, or None.
+        """
+        path = AffectedTests.__get_dependency_file(unit)
+        if path is None or os.path.isfile(path) is not True:
+            return None
+        with open(path, 'r') as file:
+            content = file.read()
+        dependencies = set()
+        # Make rules escape spaces in paths, and split long rules with backslash new lines
+        content = content.replace('\\\n', ' ').replace('\\ ', '\0')
+        for line in content.splitlines():
+            parts = re.split(r':(?:\s+|$)', line, maxsplit=1)
+            if line.startswith('#') or len(parts) != 2:
+                continue
+            for name in parts[1].split():
+                name = name.replace('\0', ' ')
+                dependencies.add( os.path.normpath(os.path.join(unit['directory'], name)) )
+        return dependencies
+
+
+    def __get_changed_files(self, ref, since, units):
+        diff = self.__run_git(['diff', '--name-only', ref, '--'])
+        others = self.__run_git(['ls-files', '--others', '--exclude-standard'])
+        root = self.__run_git(['rev-parse', '--show-toplevel'])
+        if diff is not None and others is not None and root is not None:
+            names = [os.path.join(root.strip(), n) for n in diff.splitlines() if len(n) > 0]
+            names += [os.path.join(self.__path_to_source_dir, n) for n in others.splitlines() if len(n) > 0]
+            return set([os.path.normpath(n) for n in names])
+        if since is None:
+            return None
+        changed = set()
+        for unit in units:
+            files = self.get_dependencies(unit)
+            for file in (files if files is not None else set()) | set([unit['file']]):
+                if os.path.isfile(file) and os.path.getmtime(file) > since:
+                    changed.add(file)
+        return changed
+
+
+    def __run_git(self, args):
+        try:
+            ret = subprocess.run(['git'] + args, cwd=self.__path_to_source_dir, \
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+        except OSError:
+            return None
+        if ret.returncode != 0:
+            return None
+        return ret.stdout
+
+
+    @staticmethod
+    def __get_dependency_file(unit):
+        arguments = unit['arguments']
+        for i, arg in enumerate(arguments[:-1]):
+            if arg == '-MF':
+                return os.path.join(unit['directory'], arguments[i + 1])
+        output = unit['output']
+        if output is None:
+            for i, arg in enumerate(arguments[:-1]):
+                if arg == '-o':
+                    output = arguments[i + 1]
+        if output is None:
+            return None
+        return os.path.join(unit['directory'], f'{output}.d')
+
+
+    def __get_own_headers(self, unit):
+        dependencies = self.get_dependencies(unit)
+        if dependencies is None:
+            return []
+        stem = os.path.splitext(os.path.basename(unit['file']))[0]
+        return [d for d in dependencies \
+            if os.path.splitext(os.path.basename(d))[0] == stem and self.__is_source(d) is not True]
+
+
+    def __get_test_suites(self, path):
+        if os.path.isfile(path) is not True:
+            return set()
+        with open(path, 'r', errors='replace') as file:
+            return set(self.__TEST_MACRO.findall(file.read()))
+
+
+    def __is_source(self, path):
+        return os.path.splitext(path)[1] in self.__SOURCE_EXTENSIONS
+
+
+    __COMPILE_COMMANDS_FILE = 'compile_commands.json'
+    __SOURCE_EXTENSIONS = ['.c', '.cc', '.cpp', '.cxx', '.s', '.S', '.asm']
+    __TEST_MACRO = re.compile(r'^\s*(?:TEST|TEST_F|TEST_P|TYPED_TEST|TYPED_TEST_P)\s*\(\s*(\w+)\s*,', re.MULTILINE)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# @file      ArtifactCache.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import time
+import stat
+import shutil
+
+from common.System import System
+from common.Message import Message
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class ArtifactCache:
+    """
+    Local content-addressed cache of build artifacts.
+
+    Each entry holds artifact files of a build tree under a key calculated
+    from everything the build depends on. Files are restored by a reflink if
+    the file system supports it, by a hard link, or by a copy. Cached files
+    are read-only, so a restored hard link cannot be changed in place. The
+    least recently used entries are evicted when the cache exceeds its size.
+    """
+
+    def __init__(self, path_to_cache_dir, size_limit):
+        """
+        Args:
+            path_to_cache_dir (str): cache directory.
+            size_limit (int): maximum size of the cache in bytes.
+        """
+        self.__path_to_cache_dir = os.path.abspath(path_to_cache_dir)
+        self.__size_limit = size_limit
+
+
+    @staticmethod
+    def get_default_dir():
+        """
+        Returns default cache directory of the user.
+        """
+        if System.is_win32() and 'LOCALAPPDATA' in os.environ:
+            return os.path.join(os.environ['LOCALAPPDATA'], 'eoos', 'artifacts')
+        base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        return os.path.join(base, 'eoos', 'artifacts')
+
+
+    @staticmethod
+    def parse_size(value):
+        """
+        Returns size in bytes of a string like 512M, 10G or 1048576.
+        """
+        value = value.strip().upper().rstrip('B')
+        factor = 1
+        for suffix, multiplier in [('K', 1 << 10), ('M', 1 << 20), ('G', 1 << 30), ('T', 1 << 40)]:
+            if value.endswith(suffix):
+                value = value[:-1]
+                factor = multiplier
+                break
+        return int(float(value) * factor)
+
+
+    def restore(self, key, path_to_build_dir):
+        """
+        Restores artifacts of an entry into a build tree.
+
+        Returns:
+            bool: True if the entry exists and has been restored.
+        """
+        path = self.__get_entry_path(key)
+        manifest = self.__load_manifest(path)
+        if manifest is None:
+            return False
+        for name in manifest['files']:
+            source = os.path.join(path, self.__FILES_DIR, name)
+            target = os.path.join(path_to_build_dir, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.lexists(target):
+                os.remove(target)
+            self.__link(source, target)
+        self.__touch(path)
+        return True
+
+
+    def store(self, key, path_to_build_dir, names):
+        """
+        Stores artifact files of a build tree as a new entry.
+
+        Args:
+            key (str): key of the entry.
+            path_to_build_dir (str): build tree.
+            names (list): paths of the artifact files relative to the build tree.
+        """
+        path = self.__get_entry_path(key)
+        if os.path.isdir(path):
+            self.__touch(path)
+            return
+        temp = f'{path}.{os.getpid()}.tmp'
+        if os.path.isdir(temp):
+            shutil.rmtree(temp, onerror=self.__on_remove_error)
+        size = 0
+        for name in names:
+            source = os.path.join(path_to_build_dir, name)
+            target = os.path.join(temp, self.__FILES_DIR, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(source, target)
+            os.chmod(target, os.stat(target).st_mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+            size += os.path.getsize(target)
+        with open(os.path.join(temp, self.__MANIFEST_FILE), 'w') as file:
+            json.dump({'files': list(names), 'size': size, 'created': time.time()}, file, indent=1)
+        try:
+            os.rename(temp, path)
+        except OSError:
+            # Another builder has stored the same entry
+            shutil.rmtree(temp, onerror=self.__on_remove_error)
+        self.__touch(path)
+        self.__evict(path)
+
+
+    def __evict(self, keep):
+        entries = []
+        total = 0
+        for root, dirs, files in os.walk(self.__path_to_cache_dir):
+            if self.__MANIFEST_FILE not in files or root.endswith('.tmp') or root == keep:
+                continue
+            dirs[:] = []
+            manifest = self.__load_manifest(root)
+            if manifest is None:
+                continue
+            used = os.path.getmtime(os.path.join(root, self.__MANIFEST_FILE))
+            entries.append( (used, root, manifest['size']) )
+            total += manifest['size']
+        manifest = self.__load_manifest(keep)
+        if manifest is not None:
+            total += manifest['size']
+        for used, path, size in sorted(entries):
+            if total <= self.__size_limit:
+                break
+            Message.out(f'[CACHE] Evicting artifacts "{os.path.basename(path)}"', Message.INF)
+            shutil.rmtree(path, onerror=self.__on_remove_error)
+            total -= size
+
+
+    def __get_entry_path(self, key):
+        return os.path.join(self.__path_to_cache_dir, key[:2], key)
+
+
+    def __load_manifest(self, path):
+        try:
+            with open(os.path.join(path, self.__MANIFEST_FILE), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+
+    def __touch(self, path):
+        try:
+            os.utime(os.path.join(path, self.__MANIFEST_FILE), None)
+        except OSError:
+            pass
+
+
+    def __link(self, source, target):
+        if fcntl is not None and System.is_linux():
+            try:
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), self.__FICLONE, src.fileno())
+                shutil.copystat(source, target)
+                return
+            except OSError:
+                os.remove(target)
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+        shutil.copy2(source, target)
+
+
+    @staticmethod
+    def __on_remove_error(function, path, info):
+        os.chmod(path, stat.S_IWUSR | stat.S_IRUSR | stat.S_IXUSR)
+        function(path)
+
+
+    __FILES_DIR = 'files'
+    __MANIFEST_FILE = 'manifest.json'
+    __FICLONE = 0x40049409
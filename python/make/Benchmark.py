@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# @file      Benchmark.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import math
+import time
+import shutil
+
+from common.Message import Message
+from common.System import System
+from common.ProcessRunner import Process, ProcessRunner
+
+class Benchmark:
+    """
+    Runner of Google Benchmark executable with comparison against a baseline.
+
+    The executable is pinned to one CPU and each benchmark is repeated, so
+    every benchmark has a sample of times. Samples are stored per commit, and
+    compared with samples of the baseline by the one-sided Mann-Whitney U
+    test. A benchmark regresses if its median time grows over a threshold and
+    the growth is statistically significant.
+    """
+
+    def __init__(self, executable, path_to_run_dir, path_to_output_dir, path_to_source_dir, tracer=None):
+        """
+        Args:
+            executable (str): path to the benchmark executable.
+            path_to_run_dir (str): working directory of the benchmark process.
+            path_to_output_dir (str): directory of the results of each commit and the baseline.
+            path_to_source_dir (str): git repository of the benchmarked sources.
+            tracer (Tracer): tracer of the benchmark process, or None.
+        """
+        self.__executable = executable
+        self.__path_to_run_dir = path_to_run_dir
+        self.__path_to_output_dir = path_to_output_dir
+        self.__path_to_source_dir = path_to_source_dir
+        self.__runner = ProcessRunner(tracer)
+
+
+    def execute(self, patterns=None, repetitions=10, threshold=None, is_baseline=False):
+        """
+        Runs the benchmarks and compares them with the baseline.
+
+        Args:
+            patterns (list): Google Benchmark filter regular expressions, or None for all benchmarks.
+            repetitions (int): number of repetitions of each benchmark.
+            threshold (float): allowed growth of median time in percent, or None to not fail.
+            is_baseline (bool): store the results as the new baseline.
+
+        Returns:
+            dict: the results.
+        """
+        os.makedirs(self.__path_to_output_dir, exist_ok=True)
+        path = os.path.join(self.__path_to_output_dir, self.__OUTPUT_FILE_NAME)
+        if os.path.exists(path):
+            os.remove(path)
+        command = [self.__executable, \
+            f'--benchmark_repetitions={repetitions}', \
+            '--benchmark_enable_random_interleaving=true', \
+            f'--benchmark_out={path}', \
+            '--benchmark_out_format=json', \
+        ]
+        if patterns is not None and len(patterns) > 0:
+            command.append(f'--benchmark_filter={"|".join(patterns)}')
+        kwargs = {}
+        cpu = self.__get_cpu()
+        if cpu is not None:
+            Message.out(f'[BENCH] Benchmarks are pinned to CPU {cpu}', Message.INF)
+            kwargs['preexec_fn'] = lambda: os.sched_setaffinity(0, {cpu})
+        process = Process(command, self.__path_to_run_dir, name=os.path.basename(self.__executable), **kwargs)
+        ret = self.__runner.run(process)
+        if ret != 0 or os.path.isfile(path) is not True:
+            raise Exception(f'Benchmarks aborted with return code [{ret}]')
+        commit = System.get_commit(self.__path_to_source_dir)
+        results = {
+            'commit': commit if commit is not None else self.__UNKNOWN_COMMIT,
+            'time': time.time(),
+            'benchmarks': self.__load(path),
+        }
+        with open(os.path.join(self.__path_to_output_dir, f'{results["commit"]}.json'), 'w') as file:
+            json.dump(results, file, indent=1)
+        self.__compare(results, threshold, is_baseline)
+        return results
+
+
+    @staticmethod
+    def mann_whitney(x, y):
+        """
+        Returns p-value of the one-sided Mann-Whitney U test of values of x being greater than values of y.
+
+        The normal approximation with tie and continuity corrections is used.
+        """
+        n1, n2 = len(x), len(y)
+        if n1 == 0 or n2 == 0:
+            return 1.0
+        values = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+        ranks = [0.0] * len(values)
+        ties = 0.0
+        i = 0
+        while i < len(values):
+            j = i
+            while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+                j += 1
+            for k in range(i, j + 1):
+                ranks[k] = (i + j) / 2.0 + 1.0
+            count = j - i + 1
+            ties += count ** 3 - count
+            i = j + 1
+        n = n1 + n2
+        u = sum([r for r, (v, group) in zip(ranks, values) if group == 0]) - n1 * (n1 + 1) / 2.0
+        variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+        if variance <= 0.0:
+            return 1.0
+        z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+        return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+    def __compare(self, results, threshold, is_baseline):
+        path = os.path.join(self.__path_to_output_dir, self.__BASELINE_FILE_NAME)
+        if is_baseline is True or os.path.isfile(path) is not True:
+            shutil.copyfile(os.path.join(self.__path_to_output_dir, f'{results["commit"]}.json'), path)
+            for name, samples in results['benchmarks'].items():
+                Message.out(f'[BENCH] {name}: median {self.__format(self.__median(samples))}', Message.NOR)
+            Message.out(f'[BENCH] Results of commit {results["commit"]} have been stored as the baseline', Message.INF)
+            return
+        with open(path, 'r') as file:
+            baseline = json.load(file)
+        regressed = []
+        for name, samples in results['benchmarks'].items():
+            base = baseline['benchmarks'].get(name)
+            if base is None or len(base) == 0:
+                Message.out(f'[BENCH] {name}: median {self.__format(self.__median(samples))}, no baseline', Message.NOR)
+                continue
+            median, base_median = self.__median(samples), self.__median(base)
+            change = 100.0 * (median - base_median) / base_median if base_median > 0 else 0.0
+            p = self.mann_whitney(samples, base)
+            status = Message.NOR
+            if threshold is not None and change > threshold and p < self.__ALPHA:
+                status = Message.ERR
+                regressed.append(name)
+            Message.out(f'[BENCH] {name}: median {self.__format(median)} ({change:+.2f}%, p={p:.3f}) ' \
+                f'against {self.__format(base_median)} of commit {baseline["commit"]}', status)
+        if len(regressed) > 0:
+            raise Exception(f'{len(regressed)} benchmarks regressed by more than {threshold}% against the baseline')
+        Message.out(f'[BENCH] No benchmarks regressed against commit {baseline["commit"]}', Message.OK)
+
+
+    def __load(self, path):
+        with open(path, 'r') as file:
+            output = json.load(file)
+        benchmarks = {}
+        for benchmark in output.get('benchmarks', []):
+            # Aggregates as mean and median are calculated from the samples of the repetitions
+            if benchmark.get('run_type', 'iteration') != 'iteration':
+                continue
+            name = benchmark.get('run_name', benchmark['name'])
+            scale = self.__TIME_UNITS.get(benchmark.get('time_unit', 'ns'), 1.0)
+            benchmarks.setdefault(name, []).append(benchmark['cpu_time'] * scale)
+        return benchmarks
+
+
+    @staticmethod
+    def __get_cpu():
+        if hasattr(os, 'sched_getaffinity') is not True:
+            return None
+        cpus = sorted(os.sched_getaffinity(0))
+        # The first CPU usually serves most of the interrupts
+        return cpus[-1] if len(cpus) > 0 else None
+
+
+    @staticmethod
+    def __median(samples):
+        values = sorted(samples)
+        middle = len(values) // 2
+        if len(values) % 2 == 1:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2.0
+
+
+    @staticmethod
+    def __format(nanoseconds):
+        for unit, scale in [('s', 1e9), ('ms', 1e6), ('us', 1e3)]:
+            if nanoseconds >= scale:
+                return f'{nanoseconds / scale:.3f} {unit}'
+        return f'{nanoseconds:.1f} ns'
+
+
+    __ALPHA = 0.05
+    __UNKNOWN_COMMIT = 'unknown'
+    __OUTPUT_FILE_NAME = 'output.json'
+    __BASELINE_FILE_NAME = 'baseline.json'
+    __TIME_UNITS = {'ns': 1.0, 'us': 1e3, 'ms': 1e6, 's': 1e9}
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# @file      CompileProfile.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import sys
+import json
+import time
+
+from common.Message import Message
+from common.System import System
+from make.CompileTimer import CompileTimer
+
+class CompileProfile:
+    """
+    Compile time profile of translation units.
+
+    Durations of compile and link commands are taken from the Ninja log if
+    Ninja is the generator, or recorded by the CompileTimer launcher for other
+    generators. If the compiler supports -ftime-trace, time spent on parsing of
+    headers is collected from its output. Each profile is stored in the profile
+    directory with the commit it is built from, and compared to the previous one.
+    """
+
+    def __init__(self, path_to_build_dir, path_to_source_dir, path_to_profile_dir):
+        """
+        Args:
+            path_to_build_dir (str): build tree of the project.
+            path_to_source_dir (str): source tree of the project.
+            path_to_profile_dir (str): directory to store profiles, which survives cleaning of the build tree.
+        """
+        self.__path_to_build_dir = path_to_build_dir
+        self.__path_to_source_dir = path_to_source_dir
+        self.__path_to_profile_dir = path_to_profile_dir
+        self.__path_to_log = os.path.join(path_to_build_dir, self.__LOG_FILE_NAME)
+        self.__ninja_log_size = 0
+
+
+    def get_launcher(self):
+        """
+        Returns launcher command prepended to compiler and linker commands, or None for Ninja.
+        """
+        if self.__is_ninja():
+            return None
+        return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'CompileTimer.py'), self.__path_to_log]
+
+
+    def start(self):
+        """
+        Prepares recording of a build.
+        """
+        if os.path.isfile(self.__path_to_log):
+            os.remove(self.__path_to_log)
+        path_to_ninja_log = os.path.join(self.__path_to_build_dir, '.ninja_log')
+        self.__ninja_log_size = os.path.getsize(path_to_ninja_log) if os.path.isfile(path_to_ninja_log) else 0
+
+
+    def get_env(self):
+        """
+        Returns variables to be added to the environment of build sub-processes.
+        """
+        if self.__is_time_trace_supported():
+            return {CompileTimer.TIME_TRACE_ENV: '1'}
+        return {CompileTimer.TIME_TRACE_ENV: '0'}
+
+
+    def stop(self):
+        """
+        Reports and stores the profile of the build.
+        """
+        entries = self.__read_ninja_log() if self.__is_ninja() else self.__read_timer_log()
+        if len(entries) == 0:
+            Message.out(f'[PROFILE] No translation units have been compiled', Message.INF)
+            return
+        commit = System.get_commit(self.__path_to_source_dir)
+        profile = {
+            'commit': commit if commit is not None else self.__UNKNOWN_COMMIT,
+            'time': time.time(),
+            'entries': entries,
+            'directories': self.__get_directories(entries),
+            'headers': self.__get_headers(entries),
+        }
+        self.__print(profile)
+        previous = self.__load_previous()
+        if previous is not None:
+            self.__print_comparison(profile, previous)
+        self.__save(profile)
+
+
+    def __print(self, profile):
+        entries = profile['entries']
+        compile_time = sum([e['duration'] for e in entries if e['kind'] == 'compile'])
+        link_time = sum([e['duration'] for e in entries if e['kind'] == 'link'])
+        Message.out(f'[PROFILE] {len(entries)} commands, compile {compile_time:.3f} s, link {link_time:.3f} s', Message.INF)
+        Message.out(f'[PROFILE] Slowest translation units:', Message.INF)
+        for e in sorted(entries, key=lambda e: e['duration'], reverse=True)[:self.__TOP]:
+            Message.out(f'[PROFILE] {e["duration"]:>10.3f} {e["kind"]:<8} {self.__get_name(e)}', Message.NOR)
+        Message.out(f'[PROFILE] Slowest directories:', Message.INF)
+        for name, duration in sorted(profile['directories'].items(), key=lambda i: i[1], reverse=True)[:self.__TOP]:
+            Message.out(f'[PROFILE] {duration:>10.3f} {name}', Message.NOR)
+        if len(profile['headers']) > 0:
+            Message.out(f'[PROFILE] Slowest headers, inclusive parse time:', Message.INF)
+            for name, duration in sorted(profile['headers'].items(), key=lambda i: i[1], reverse=True)[:self.__TOP]:
+                Message.out(f'[PROFILE] {duration:>10.3f} {name}', Message.NOR)
+
+
+    def __print_comparison(self, profile, previous):
+        durations = {self.__get_name(e): e['duration'] for e in previous['entries']}
+        total = sum([e['duration'] for e in profile['entries']])
+        total_previous = sum([d for n, d in durations.items() if n in [self.__get_name(e) for e in profile['entries']]])
+        Message.out(f'[PROFILE] Compared to commit {previous["commit"]}: {total:.3f} s against {total_previous:.3f} s of the same units', Message.INF)
+        deltas = []
+        for e in profile['entries']:
+            name = self.__get_name(e)
+            if name in durations:
+                deltas.append( (e['duration'] - durations[name], name) )
+        for delta, name in sorted(deltas, reverse=True)[:self.__TOP]:
+            if delta > 0:
+                Message.out(f'[PROFILE] {delta:>+10.3f} {name}', Message.NOR)
+
+
+    def __get_name(self, entry):
+        path = entry['source'] if entry['source'] is not None else entry['output']
+        if path is None:
+            return '<unknown>'
+        return self.__get_relative(path)
+
+
+    def __get_relative(self, path):
+        path = os.path.abspath(path)
+        if path.startswith(self.__path_to_source_dir + os.sep):
+            return os.path.relpath(path, self.__path_to_source_dir).replace(os.sep, '/')
+        return path
+
+
+    def __get_directories(self, entries):
+        directories = {}
+        for e in entries:
+            if e['kind'] != 'compile':
+                continue
+            name = os.path.dirname(self.__get_name(e))
+            directories[name] = directories.get(name, 0.0) + e['duration']
+        return directories
+
+
+    def __get_headers(self, entries):
+        headers = {}
+        for e in entries:
+            if e.get('trace') is None or os.path.isfile(e['trace']) is not True:
+                continue
+            try:
+                with open(e['trace'], 'r') as file:
+                    events = json.load(file).get('traceEvents', [])
+            except (OSError, ValueError):
+                continue
+            for event in events:
+                if event.get('name') != 'Source' or 'dur' not in event:
+                    continue
+                name = self.__get_relative( event.get('args', {}).get('detail', '<unknown>') )
+                headers[name] = headers.get(name, 0.0) + event['dur'] / 1000000.0
+        return headers
+
+
+    def __read_timer_log(self):
+        entries = []
+        if os.path.isfile(self.__path_to_log) is not True:
+            return entries
+        with open(self.__path_to_log, 'r') as file:
+            for line in file:
+                try:
+                    entries.append( json.loads(line) )
+                except ValueError:
+                    continue
+        return entries
+
+
+    def __read_ninja_log(self):
+        entries = []
+        path = os.path.join(self.__path_to_build_dir, '.ninja_log')
+        if os.path.isfile(path) is not True:
+            return entries
+        with open(path, 'r') as file:
+            file.seek(self.__ninja_log_size)
+            for line in file:
+                fields = line.rstrip('\n').split('\t')
+                if line.startswith('#') or len(fields) < 4:
+                    continue
+                output = os.path.join(self.__path_to_build_dir, fields[3])
+                kind = 'compile' if os.path.splitext(output)[1] in ['.o', '.obj'] else 'link'
+                source = None
+                if kind == 'compile':
+                    source = self.__get_source_of_object(fields[3])
+                entries.append({
+                    'kind': kind,
+                    'output': output,
+                    'source': source,
+                    'trace': os.path.splitext(output)[0] + '.json',
+                    'start': int(fields[0]) / 1000.0,
+                    'duration': (int(fields[1]) - int(fields[0])) / 1000.0,
+                    'code': 0,
+                })
+        return entries
+
+
+    def __get_source_of_object(self, output):
+        # CMake names objects as <dir>/CMakeFiles/<target>.dir/<source path>.o
+        parts = output.replace('\\', '/').split('/')
+        for i, part in enumerate(parts):
+            if part.endswith('.dir') and i > 0 and parts[i - 1] == 'CMakeFiles':
+                source = '/'.join(parts[:i - 1] + parts[i + 1:])
+                return os.path.join(self.__path_to_source_dir, os.path.splitext(source)[0])
+        return None
+
+
+    def __is_ninja(self):
+        generator = os.environ.get('CMAKE_GENERATOR', '')
+        path = os.path.join(self.__path_to_build_dir, 'CMakeCache.txt')
+        if os.path.isfile(path):
+            with open(path, 'r') as file:
+                for line in file:
+                    if line.startswith('CMAKE_GENERATOR:'):
+                        generator = line.split('=', 1)[1].strip()
+                        break
+        return generator.startswith('Ninja')
+
+
+    def __is_time_trace_supported(self):
+        path = os.path.join(self.__path_to_build_dir, 'CMakeCache.txt')
+        if os.path.isfile(path) is not True:
+            return False
+        with open(path, 'r') as file:
+            for line in file:
+                if line.startswith('CMAKE_CXX_COMPILER_ID:') or line.startswith('CMAKE_CXX_COMPILER:'):
+                    if 'clang' in line.lower():
+                        return True
+        return False
+
+
+    def __load_previous(self):
+        path = os.path.join(self.__path_to_profile_dir, self.__LATEST_FILE_NAME)
+        if os.path.isfile(path) is not True:
+            return None
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+
+    def __save(self, profile):
+        os.makedirs(self.__path_to_profile_dir, exist_ok=True)
+        name = f'{profile["commit"]}-{time.strftime("%Y%m%d-%H%M%S", time.localtime(profile["time"]))}.json'
+        for path in [os.path.join(self.__path_to_profile_dir, name), os.path.join(self.__path_to_profile_dir, self.__LATEST_FILE_NAME)]:
+            with open(path, 'w') as file:
+                json.dump(profile, file, indent=1)
+        Message.out(f'[PROFILE] Profile has been saved to "{os.path.join(self.__path_to_profile_dir, name)}"', Message.INF)
+
+
+    __LOG_FILE_NAME = 'EoosCompileTimer.log'
+    __LATEST_FILE_NAME = 'latest.json'
+    __TOP = 10
+    __UNKNOWN_COMMIT = 'unknown'
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# @file      CompileTimer.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+class CompileTimer:
+    """
+    Compiler and linker launcher which records durations of its commands.
+
+    The launcher is executed by the build system as
+    `python CompileTimer.py <log file> <compiler> <arguments>` and appends
+    one JSON line per command to the log file.
+    """
+
+    TIME_TRACE_ENV = 'EOOS_COMPILE_TIMER_TIME_TRACE'
+
+    def execute(self, argv):
+        """
+        Executes a command and records its duration.
+
+        Returns:
+            int: return code of the command.
+        """
+        if len(argv) < 2:
+            sys.stderr.write('Usage: CompileTimer.py <log file> <command> [arguments]\n')
+            return 1
+        path_to_log = argv[0]
+        command = list(argv[1:])
+        kind = 'compile' if '-c' in command else 'link'
+        output = self.__get_output(command)
+        trace = None
+        if kind == 'compile' and os.environ.get(self.TIME_TRACE_ENV) == '1' and output is not None:
+            command.append('-ftime-trace')
+            trace = os.path.splitext(output)[0] + '.json'
+        start = time.time()
+        ret = subprocess.call(command)
+        duration = time.time() - start
+        record = {
+            'kind': kind,
+            'output': output,
+            'source': self.__get_source(command),
+            'trace': trace,
+            'start': start,
+            'duration': duration,
+            'code': ret,
+        }
+        # Appending of one short line is atomic for parallel jobs
+        with open(path_to_log, 'a') as file:
+            file.write(json.dumps(record) + '\n')
+        return ret
+
+
+    def __get_output(self, command):
+        for i, arg in enumerate(command):
+            if arg == '-o' and i + 1 < len(command):
+                return os.path.abspath(command[i + 1])
+            if arg.startswith('-o') and len(arg) > 2:
+                return os.path.abspath(arg[2:])
+        return None
+
+
+    def __get_source(self, command):
+        for arg in command:
+            if arg.startswith('-') is not True and os.path.splitext(arg)[1] in self.__SOURCE_EXTENSIONS:
+                return os.path.abspath(arg)
+        return None
+
+
+    __SOURCE_EXTENSIONS = ['.c', '.cc', '.cpp', '.cxx', '.s', '.S', '.asm']
+
+
+def main():
+    return CompileTimer().execute(sys.argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# @file      CompilerCache.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import shutil
+import subprocess
+
+from common.Message import Message
+
+class CompilerCache:
+    """
+    Compiler cache used as CMake compiler launcher.
+
+    Supports ccache and sccache. The cache settings are passed in the
+    environment of the build sub-processes only. ccache writes statistics
+    of the build to its own stats log, so builds sharing the cache do not
+    count each other's hits. sccache has no statistics of one client, so
+    its statistics are the difference of the cumulative cache statistics
+    before and after the build, which include concurrent builds. sccache
+    reads the settings when its server starts, so the server is restarted
+    with them, once for all builds sharing it.
+    """
+
+    AUTO = 'auto'
+    CCACHE = 'ccache'
+    SCCACHE = 'sccache'
+
+    def __init__(self, name, path_to_dir=None, size=None, path_to_stats_log=None, is_server_managed=True):
+        """
+        Args:
+            name (str): AUTO, CCACHE or SCCACHE.
+            path_to_dir (str): cache directory, or None for the default one of the tool.
+            size (str): cache size limit, for example 5G, or None for the default one.
+            path_to_stats_log (str): ccache statistics log of the build, or None.
+            is_server_managed (bool): restart the sccache server at the start and stop it at the stop of a build,
+                otherwise the server is started and stopped by the owner of builds sharing it.
+        """
+        self.__name = None
+        self.__path = None
+        names = [CompilerCache.CCACHE, CompilerCache.SCCACHE] if name == CompilerCache.AUTO else [name]
+        for n in names:
+            path = shutil.which(n)
+            if path is not None:
+                self.__name = n
+                self.__path = path
+                break
+        if self.__path is None:
+            raise Exception(f'Compiler cache {" or ".join(names)} is not found')
+        self.__path_to_dir = os.path.abspath(path_to_dir) if path_to_dir is not None else None
+        self.__size = size
+        self.__path_to_stats_log = os.path.abspath(path_to_stats_log) if path_to_stats_log is not None else None
+        self.__statistics = None
+        self.__last = None
+        self.__is_server_managed = is_server_managed
+        self.__is_server_started = False
+
+
+    def get_name(self):
+        """
+        Returns name of the compiler cache tool.
+        """
+        return self.__name
+
+
+    def get_launcher(self):
+        """
+        Returns path to the compiler cache executable.
+        """
+        return self.__path
+
+
+    def get_env(self):
+        """
+        Returns variables to be added to the environment of build sub-processes.
+        """
+        env = {}
+        if self.__name == CompilerCache.CCACHE:
+            if self.__path_to_dir is not None:
+                env['CCACHE_DIR'] = self.__path_to_dir
+            if self.__path_to_stats_log is not None:
+                env['CCACHE_STATSLOG'] = self.__path_to_stats_log
+        else:
+            if self.__path_to_dir is not None:
+                env['SCCACHE_DIR'] = self.__path_to_dir
+            if self.__size is not None:
+                env['SCCACHE_CACHE_SIZE'] = self.__size
+        return env
+
+
+    def get_statistics(self):
+        """
+        Returns tuple of hits and misses of the last build, or None.
+        """
+        return self.__last
+
+
+    def start(self):
+        """
+        Applies the cache settings and records statistics before a build.
+        """
+        env = self.__get_tool_env()
+        if self.__name == CompilerCache.CCACHE:
+            if self.__size is not None:
+                subprocess.run([self.__path, '--max-size', self.__size], env=env, stdout=subprocess.DEVNULL)
+            if self.__path_to_stats_log is not None and os.path.isfile(self.__path_to_stats_log):
+                os.remove(self.__path_to_stats_log)
+        elif self.__is_server_managed is True:
+            self.start_server()
+        self.__statistics = self.__get_statistics()
+
+
+    def stop(self):
+        """
+        Prints hits and misses of the cache since the start, and stops the server started with the cache settings.
+        """
+        if self.__statistics is None:
+            return
+        hits_start, misses_start = self.__statistics
+        hits_stop, misses_stop = self.__get_statistics()
+        self.__statistics = None
+        scope = 'cache-wide, including concurrent builds'
+        statistics = self.__get_stats_log_statistics()
+        if statistics is not None:
+            hits, misses = statistics
+            scope = 'this build'
+        else:
+            hits = hits_stop - hits_start
+            misses = misses_stop - misses_start
+        if self.__is_server_managed is True:
+            self.stop_server()
+        self.__last = (hits, misses)
+        rate = 0.0
+        if hits + misses > 0:
+            rate = round(100.0 * hits / (hits + misses), 1)
+        Message.out(f'[BUILD] Compiler cache {self.__name}: {hits} hits, {misses} misses, {rate}% hit rate ({scope})', Message.INF)
+
+
+    def start_server(self):
+        """
+        Restarts the sccache server with the cache settings, if they are given.
+        """
+        if self.__name != CompilerCache.SCCACHE or (self.__path_to_dir is None and self.__size is None):
+            return
+        # The server reads the cache settings on start only
+        env = self.__get_tool_env()
+        subprocess.run([self.__path, '--stop-server'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        subprocess.run([self.__path, '--start-server'], env=env, stdout=subprocess.DEVNULL)
+        self.__is_server_started = True
+
+
+    def stop_server(self):
+        """
+        Stops the sccache server started with the cache settings.
+        """
+        if self.__is_server_started is not True:
+            return
+        self.__is_server_started = False
+        subprocess.run([self.__path, '--stop-server'], env=self.__get_tool_env(), stdout=subprocess.DEVNULL, \
+            stderr=subprocess.DEVNULL)
+
+
+    def __get_stats_log_statistics(self):
+        # Each compilation appends a comment line with the source file and lines of the updated counters
+        if self.__path_to_stats_log is None or os.path.isfile(self.__path_to_stats_log) is not True:
+            return None
+        hits = 0
+        misses = 0
+        with open(self.__path_to_stats_log, 'r', errors='replace') as file:
+            for line in file:
+                counter = line.strip()
+                if counter in self.__HIT_COUNTERS:
+                    hits += 1
+                elif counter == self.__MISS_COUNTER:
+                    misses += 1
+        return (hits, misses)
+
+
+    def __get_tool_env(self):
+        env = dict(os.environ)
+        env.update( self.get_env() )
+        return env
+
+
+    def __get_statistics(self):
+        try:
+            if self.__name == CompilerCache.CCACHE:
+                return self.__get_ccache_statistics()
+            else:
+                return self.__get_sccache_statistics()
+        except (OSError, ValueError, KeyError):
+            return (0, 0)
+
+
+    def __get_ccache_statistics(self):
+        ret = subprocess.run([self.__path, '--print-stats'], env=self.__get_tool_env(), stdout=subprocess.PIPE, \
+            stderr=subprocess.DEVNULL, universal_newlines=True)
+        if ret.returncode == 0:
+            stats = {}
+            for line in ret.stdout.splitlines():
+                fields = line.split('\t')
+                if len(fields) == 2:
+                    stats[fields[0]] = int(fields[1])
+            hits = stats.get('direct_cache_hit', 0) + stats.get('preprocessed_cache_hit', 0)
+            return (hits, stats.get('cache_miss', 0))
+        # Old ccache versions print human readable statistics only
+        ret = subprocess.run([self.__path, '--show-stats'], env=self.__get_tool_env(), stdout=subprocess.PIPE, universal_newlines=True)
+        hits = 0
+        misses = 0
+        for line in ret.stdout.splitlines():
+            fields = line.rsplit(None, 1)
+            if len(fields) != 2 or fields[1].isdigit() is not True:
+                continue
+            if fields[0].startswith('cache hit'):
+                hits += int(fields[1])
+            elif fields[0].startswith('cache miss'):
+                misses += int(fields[1])
+        return (hits, misses)
+
+
+    def __get_sccache_statistics(self):
+        ret = subprocess.run([self.__path, '--show-stats', '--stats-format=json'], env=self.__get_tool_env(), \
+            stdout=subprocess.PIPE, universal_newlines=True)
+        stats = json.loads(ret.stdout)['stats']
+        hits = sum(stats['cache_hits']['counts'].values())
+        misses = sum(stats['cache_misses']['counts'].values())
+        return (hits, misses)
+
+
+    __HIT_COUNTERS = ['direct_cache_hit', 'preprocessed_cache_hit']
+    __MISS_COUNTER = 'cache_miss'
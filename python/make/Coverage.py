@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# @file      Coverage.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import html
+import json
+import time
+import hashlib
+import shutil
+import subprocess
+import xml.etree.ElementTree as ElementTree
+
+from concurrent.futures import ProcessPoolExecutor
+from common.Message import Message
+from common.System import System
+
+class Coverage:
+    """
+    Code coverage report of a GCC instrumented build.
+
+    Counter files of the build tree, or of the test workers which wrote them
+    under their own GCOV_PREFIX directories, are processed by gcov in a
+    process pool. Results of each counter file are cached by modification
+    times and content hashes of the counter and notes files, so unchanged
+    counters are not processed again. Counters of all workers are summed and
+    the report is written as HTML, JSON, Cobertura XML and lcov trace file.
+    """
+
+    def __init__(self, path_to_build_dir, path_to_source_dir, path_to_output_dir, sources, jobs=None):
+        """
+        Args:
+            path_to_build_dir (str): build tree with notes files of the instrumented objects.
+            path_to_source_dir (str): root of the source tree.
+            path_to_output_dir (str): directory of the report.
+            sources (list): directories relative to the source tree which files are reported.
+            jobs (int): number of gcov processes executed at the same time, or None for all CPUs.
+        """
+        self.__path_to_build_dir = path_to_build_dir
+        self.__path_to_source_dir = path_to_source_dir
+        self.__path_to_output_dir = path_to_output_dir
+        self.__sources = [os.path.normpath(s) for s in sources]
+        self.__jobs = jobs
+
+
+    def create(self, path_to_counters_dir=None):
+        """
+        Creates the coverage report.
+
+        Args:
+            path_to_counters_dir (str): directory with GCOV_PREFIX directories of test workers, or None.
+
+        Returns:
+            dict: summary of lines, functions and branches.
+        """
+        units = self.__find_units(path_to_counters_dir)
+        if len(units) == 0:
+            raise Exception(f'No coverage counters found, unit tests have to be run')
+        os.makedirs(self.__path_to_output_dir, exist_ok=True)
+        cache = self.__load_cache()
+        results = {}
+        keys = {}
+        pending = []
+        for gcda, gcno in units:
+            keys[gcda] = self.__get_stat_key(gcda, gcno)
+            entry = cache.get(gcda)
+            if entry is not None and entry['stat'] == keys[gcda]:
+                results[gcda] = entry['files']
+                continue
+            digest = self.__get_digest(gcda, gcno)
+            if entry is not None and entry['digest'] == digest:
+                entry['stat'] = keys[gcda]
+                results[gcda] = entry['files']
+                continue
+            pending.append( (gcda, digest) )
+        Message.out(f'[COVERAGE] {len(units)} counter files, {len(units) - len(pending)} results are cached', Message.INF)
+        if len(pending) > 0:
+            jobs = self.__jobs if self.__jobs is not None else os.cpu_count()
+            chunks = [pending[i::max(1, jobs)] for i in range(max(1, jobs))]
+            args = [([gcda for gcda, digest in chunk], self.__path_to_source_dir, self.__path_to_build_dir) \
+                for chunk in chunks if len(chunk) > 0]
+            # Reports are created in a stage thread while other stages are executed
+            with ProcessPoolExecutor(max_workers=len(args), mp_context=System.get_pool_context()) as pool:
+                for chunk_results in pool.map(Coverage._run_gcov, args):
+                    results.update(chunk_results)
+            for gcda, digest in pending:
+                cache[gcda] = {'stat': keys[gcda], 'digest': digest, 'files': results[gcda]}
+        self.__save_cache( {gcda: cache[gcda] for gcda in keys} )
+        files = self.__merge(results)
+        summary = self.__get_summary(files.values())
+        self.__save_json(files, summary)
+        self.__save_lcov(files)
+        self.__save_cobertura(files, summary)
+        self.__save_html(files, summary)
+        for name in ['lines', 'functions', 'branches']:
+            Message.out(f'[COVERAGE] {name.capitalize()}: {summary[name][0]} of {summary[name][1]} ' \
+                f'({self.__get_percent(summary[name])}%)', Message.OK)
+        Message.out(f'[COVERAGE] Report has been written to "{self.__path_to_output_dir}"', Message.INF)
+        return summary
+
+
+    @staticmethod
+    def _run_gcov(args):
+        """
+        Runs gcov for counter files in a worker process.
+
+        Args:
+            args (tuple): paths to counter files, source tree and build tree.
+
+        Returns:
+            dict: results of files in the source tree for each counter file.
+        """
+        gcdas, path_to_source_dir, path_to_build_dir = args
+        results = {}
+        for gcda in gcdas:
+            ret = subprocess.run(['gcov', '--json-format', '--stdout', '--branch-probabilities', gcda], \
+                cwd=os.path.dirname(gcda), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+            if ret.returncode != 0:
+                raise Exception(f'gcov aborted with return code [{ret.returncode}] for "{gcda}"')
+            files = {}
+            for line in ret.stdout.splitlines():
+                if len(line.strip()) == 0:
+                    continue
+                data = json.loads(line)
+                for file in data['files']:
+                    path = os.path.normpath(os.path.join(data['current_working_directory'], file['file']))
+                    if path.startswith(path_to_source_dir + os.sep) is not True \
+                        or path.startswith(path_to_build_dir + os.sep):
+                        continue
+                    result = files.setdefault(path, {'lines': {}, 'branches': {}, 'functions': {}})
+                    for item in file['lines']:
+                        number = str(item['line_number'])
+                        result['lines'][number] = result['lines'].get(number, 0) + item['count']
+                        if len(item['branches']) > 0:
+                            result['branches'][number] = Coverage.__add_counts(result['branches'].get(number, []), \
+                                [b['count'] for b in item['branches']])
+                    for item in file['functions']:
+                        name = item['demangled_name']
+                        count = result['functions'].get(name, [item['start_line'], 0])[1]
+                        result['functions'][name] = [item['start_line'], count + item['execution_count']]
+            results[gcda] = files
+        return results
+
+
+    def __find_units(self, path_to_counters_dir):
+        units = []
+        if path_to_counters_dir is not None and os.path.isdir(path_to_counters_dir):
+            for worker in sorted(os.listdir(path_to_counters_dir)):
+                path_to_worker = os.path.join(path_to_counters_dir, worker)
+                for gcda in self.__find_files(path_to_worker, '.gcda'):
+                    # GCOV_PREFIX directory repeats the absolute path of the counter file in the build tree
+                    original = os.path.join(os.sep, os.path.relpath(gcda, path_to_worker))
+                    gcno = original[:-len('.gcda')] + '.gcno'
+                    if os.path.isfile(gcno) is not True:
+                        continue
+                    beside = gcda[:-len('.gcda')] + '.gcno'
+                    if os.path.isfile(beside) is not True or os.path.getmtime(beside) < os.path.getmtime(gcno):
+                        shutil.copy2(gcno, beside)
+                    units.append( (gcda, beside) )
+        if len(units) > 0:
+            return units
+        for gcda in self.__find_files(self.__path_to_build_dir, '.gcda'):
+            gcno = gcda[:-len('.gcda')] + '.gcno'
+            if os.path.isfile(gcno):
+                units.append( (gcda, gcno) )
+        return units
+
+
+    @staticmethod
+    def __find_files(path, extension):
+        paths = []
+        for root, dirs, files in os.walk(path):
+            # Hidden directories are not parts of the tree, like the outputs of the builder
+            dirs[:] = [d for d in dirs if d.startswith('.') is not True]
+            for name in files:
+                if name.endswith(extension):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+
+    def __merge(self, results):
+        files = {}
+        for result in results.values():
+            for path, data in result.items():
+                name = os.path.relpath(path, self.__path_to_source_dir)
+                if any([name.startswith(s + os.sep) for s in self.__sources]) is not True:
+                    continue
+                file = files.setdefault(name, {'lines': {}, 'branches': {}, 'functions': {}})
+                for number, count in data['lines'].items():
+                    file['lines'][number] = file['lines'].get(number, 0) + count
+                for number, counts in data['branches'].items():
+                    file['branches'][number] = Coverage.__add_counts(file['branches'].get(number, []), counts)
+                for function, (line, count) in data['functions'].items():
+                    file['functions'][function] = [line, file['functions'].get(function, [line, 0])[1] + count]
+        for file in files.values():
+            file['summary'] = self.__get_summary([file], False)
+        return dict(sorted(files.items()))
+
+
+    @staticmethod
+    def __add_counts(counts, other):
+        if len(counts) < len(other):
+            counts = counts + [0] * (len(other) - len(counts))
+        return [c + (other[i] if i < len(other) else 0) for i, c in enumerate(counts)]
+
+
+    @staticmethod
+    def __get_summary(files, is_total=True):
+        summary = {'lines': [0, 0], 'functions': [0, 0], 'branches': [0, 0]}
+        for file in files:
+            if is_total is True:
+                for name in summary:
+                    summary[name] = [summary[name][0] + file['summary'][name][0], summary[name][1] + file['summary'][name][1]]
+                continue
+            summary['lines'] = [len([c for c in file['lines'].values() if c > 0]), len(file['lines'])]
+            summary['functions'] = [len([f for f in file['functions'].values() if f[1] > 0]), len(file['functions'])]
+            branches = [c for counts in file['branches'].values() for c in counts]
+            summary['branches'] = [len([c for c in branches if c > 0]), len(branches)]
+        return summary
+
+
+    @staticmethod
+    def __get_percent(pair):
+        if pair[1] == 0:
+            return 100.0
+        return round(100.0 * pair[0] / pair[1], 1)
+
+
+    @staticmethod
+    def __get_rate(pair):
+        if pair[1] == 0:
+            return '1.0000'
+        return f'{pair[0] / pair[1]:.4f}'
+
+
+    def __save_json(self, files, summary):
+        with open(os.path.join(self.__path_to_output_dir, self.JSON_FILE_NAME), 'w') as file:
+            json.dump({'summary': summary, 'files': files}, file, indent=1)
+
+
+    def __save_lcov(self, files):
+        with open(os.path.join(self.__path_to_output_dir, self.LCOV_FILE_NAME), 'w') as file:
+            file.write('TN:\n')
+            for name, data in files.items():
+                file.write(f'SF:{os.path.join(self.__path_to_source_dir, name)}\n')
+                for function, (line, count) in data['functions'].items():
+                    file.write(f'FN:{line},{function}\n')
+                for function, (line, count) in data['functions'].items():
+                    file.write(f'FNDA:{count},{function}\n')
+                file.write(f'FNF:{data["summary"]["functions"][1]}\nFNH:{data["summary"]["functions"][0]}\n')
+                for number, counts in sorted(data['branches'].items(), key=lambda i: int(i[0])):
+                    for index, count in enumerate(counts):
+                        file.write(f'BRDA:{number},0,{index},{count}\n')
+                file.write(f'BRF:{data["summary"]["branches"][1]}\nBRH:{data["summary"]["branches"][0]}\n')
+                for number, count in sorted(data['lines'].items(), key=lambda i: int(i[0])):
+                    file.write(f'DA:{number},{count}\n')
+                file.write(f'LF:{data["summary"]["lines"][1]}\nLH:{data["summary"]["lines"][0]}\n')
+                file.write('end_of_record\n')
+
+
+    def __save_cobertura(self, files, summary):
+        root = ElementTree.Element('coverage', {
+            'line-rate': self.__get_rate(summary['lines']),
+            'branch-rate': self.__get_rate(summary['branches']),
+            'lines-covered': str(summary['lines'][0]),
+            'lines-valid': str(summary['lines'][1]),
+            'branches-covered': str(summary['branches'][0]),
+            'branches-valid': str(summary['branches'][1]),
+            'complexity': '0',
+            'version': '0',
+            'timestamp': str(int(time.time())),
+        })
+        sources = ElementTree.SubElement(root, 'sources')
+        ElementTree.SubElement(sources, 'source').text = self.__path_to_source_dir
+        packages = ElementTree.SubElement(root, 'packages')
+        directories = {}
+        for name, data in files.items():
+            directories.setdefault(os.path.dirname(name), []).append( (name, data) )
+        for directory, items in directories.items():
+            package_summary = self.__get_summary([data for name, data in items])
+            package = ElementTree.SubElement(packages, 'package', {
+                'name': directory.replace(os.sep, '.'),
+                'line-rate': self.__get_rate(package_summary['lines']),
+                'branch-rate': self.__get_rate(package_summary['branches']),
+                'complexity': '0',
+            })
+            classes = ElementTree.SubElement(package, 'classes')
+            for name, data in items:
+                element = ElementTree.SubElement(classes, 'class', {
+                    'name': os.path.basename(name),
+                    'filename': name.replace(os.sep, '/'),
+                    'line-rate': self.__get_rate(data['summary']['lines']),
+                    'branch-rate': self.__get_rate(data['summary']['branches']),
+                    'complexity': '0',
+                })
+                ElementTree.SubElement(element, 'methods')
+                lines = ElementTree.SubElement(element, 'lines')
+                for number, count in sorted(data['lines'].items(), key=lambda i: int(i[0])):
+                    attributes = {'number': number, 'hits': str(count), 'branch': 'false'}
+                    counts = data['branches'].get(number)
+                    if counts is not None:
+                        taken = len([c for c in counts if c > 0])
+                        attributes['branch'] = 'true'
+                        attributes['condition-coverage'] = f'{self.__get_percent([taken, len(counts)]):.0f}% ({taken}/{len(counts)})'
+                    ElementTree.SubElement(lines, 'line', attributes)
+        ElementTree.ElementTree(root).write(os.path.join(self.__path_to_output_dir, self.COBERTURA_FILE_NAME), \
+            encoding='UTF-8', xml_declaration=True)
+
+
+    def __save_html(self, files, summary):
+        path_to_files = os.path.join(self.__path_to_output_dir, 'files')
+        os.makedirs(path_to_files, exist_ok=True)
+        rows = []
+        for name, data in files.items():
+            page = name.replace(os.sep, '_') + '.html'
+            rows.append(f'<tr><td><a href="files/{html.escape(page)}">{html.escape(name)}</a></td>' \
+                + self.__get_html_cells(data['summary']) + '</tr>')
+            self.__save_html_file(os.path.join(path_to_files, page), name, data)
+        with open(os.path.join(self.__path_to_output_dir, 'index.html'), 'w') as file:
+            file.write(self.__HTML_HEAD.format(title='EOOS code coverage'))
+            file.write('<table><tr><th>File</th><th>Lines</th><th>Functions</th><th>Branches</th></tr>\n')
+            file.write('<tr><td><b>Total</b></td>' + self.__get_html_cells(summary) + '</tr>\n')
+            file.write('\n'.join(rows))
+            file.write('</table></body></html>\n')
+
+
+    def __save_html_file(self, path, name, data):
+        try:
+            with open(os.path.join(self.__path_to_source_dir, name), 'r', errors='replace') as file:
+                source = file.read().splitlines()
+        except OSError:
+            source = []
+        with open(path, 'w') as file:
+            file.write(self.__HTML_HEAD.format(title=html.escape(name)))
+            file.write('<p><a href="../index.html">Index</a></p><table>\n')
+            file.write('<tr><th>Lines</th><th>Functions</th><th>Branches</th></tr>')
+            file.write('<tr>' + self.__get_html_cells(data['summary']) + '</tr></table><pre>\n')
+            for index, text in enumerate(source):
+                number = str(index + 1)
+                count = data['lines'].get(number)
+                style = '' if count is None else ('hit' if count > 0 else 'miss')
+                hits = '' if count is None else str(count)
+                file.write(f'<span class="{style}">{number:>6} {hits:>8} | {html.escape(text)}</span>\n')
+            file.write('</pre></body></html>\n')
+
+
+    def __get_html_cells(self, summary):
+        cells = ''
+        for name in ['lines', 'functions', 'branches']:
+            percent = self.__get_percent(summary[name])
+            style = 'hit' if percent >= 90.0 else ('part' if percent >= 75.0 else 'miss')
+            cells += f'<td class="{style}">{percent}% ({summary[name][0]}/{summary[name][1]})</td>'
+        return cells
+
+
+    def __load_cache(self):
+        path = os.path.join(self.__path_to_output_dir, self.__CACHE_FILE_NAME)
+        if os.path.isfile(path) is not True:
+            return {}
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+
+    def __save_cache(self, cache):
+        with open(os.path.join(self.__path_to_output_dir, self.__CACHE_FILE_NAME), 'w') as file:
+            json.dump(cache, file)
+
+
+    @staticmethod
+    def __get_stat_key(gcda, gcno):
+        key = []
+        for path in [gcda, gcno]:
+            status = os.stat(path)
+            key.extend([status.st_mtime_ns, status.st_size])
+        return key
+
+
+    @staticmethod
+    def __get_digest(gcda, gcno):
+        digest = hashlib.sha256()
+        for path in [gcda, gcno]:
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+
+    JSON_FILE_NAME = 'coverage.json'
+    LCOV_FILE_NAME = 'coverage.lcov'
+    COBERTURA_FILE_NAME = 'cobertura.xml'
+
+    __CACHE_FILE_NAME = 'coverage.cache.json'
+    __HTML_HEAD = '<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title><style>' \
+        'body{{font-family:monospace}} td,th{{padding:2px 8px;text-align:left}} ' \
+        '.hit{{background:#c8f0c8}} .part{{background:#f0f0a0}} .miss{{background:#f0c8c8}}' \
+        '</style></head><body><h2>{title}</h2>\n'
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# @file      ElfFile.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import mmap
+import struct
+
+class ElfFile:
+    """
+    Reader of sections and symbols of an ELF file.
+
+    The file is memory-mapped and only its headers, section name table and
+    symbol table are read. Both 32 and 64-bit files of either byte order
+    are supported.
+    """
+
+    SHF_WRITE = 0x1
+    SHF_ALLOC = 0x2
+    SHF_EXECINSTR = 0x4
+    SHT_NOBITS = 8
+    STT_OBJECT = 1
+    STT_FUNC = 2
+    STT_FILE = 4
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the ELF file.
+        """
+        self.__path = path
+        self.__sections = []
+        self.__symbols = []
+        with open(path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self.__parse(data)
+
+
+    @staticmethod
+    def is_elf(path):
+        """
+        Tests if a file is an ELF file.
+        """
+        with open(path, 'rb') as file:
+            return file.read(4) == ElfFile.__MAGIC
+
+
+    def get_sections(self):
+        """
+        Returns sections as dictionaries with name, type, flags, address and size.
+        """
+        return list(self.__sections)
+
+
+    def get_symbols(self):
+        """
+        Returns symbols as dictionaries with name, type, binding, section index, value and size.
+
+        Symbols are in order of the symbol table, so local symbols of an object
+        file follow the file symbol of the object.
+        """
+        return list(self.__symbols)
+
+
+    def __parse(self, data):
+        if data[:4] != self.__MAGIC:
+            raise Exception(f'File "{self.__path}" is not an ELF file')
+        is_64 = data[4] == 2
+        order = '<' if data[5] == 1 else '>'
+        if is_64:
+            header = struct.unpack_from(f'{order}HHIQQQIHHHHHH', data, 16)
+            section_format = f'{order}IIQQQQIIQQ'
+        else:
+            header = struct.unpack_from(f'{order}HHIIIIIHHHHHH', data, 16)
+            section_format = f'{order}IIIIIIIIII'
+        shoff, shentsize, shnum, shstrndx = header[5], header[10], header[11], header[12]
+        headers = []
+        for index in range(shnum):
+            name, kind, flags, address, offset, size, link, info, align, entsize = \
+                struct.unpack_from(section_format, data, shoff + index * shentsize)
+            headers.append({'name_offset': name, 'type': kind, 'flags': flags, 'address': address, \
+                'offset': offset, 'size': size, 'link': link})
+        if shstrndx < len(headers):
+            names = headers[shstrndx]
+            for header in headers:
+                header['name'] = self.__get_string(data, names['offset'] + header['name_offset'])
+        for header in headers:
+            self.__sections.append({'name': header.get('name', ''), 'type': header['type'], \
+                'flags': header['flags'], 'address': header['address'], 'size': header['size']})
+        for header in headers:
+            if header['type'] == self.__SHT_SYMTAB:
+                self.__parse_symbols(data, order, is_64, header, headers[header['link']])
+
+
+    def __parse_symbols(self, data, order, is_64, symtab, strtab):
+        entsize = 24 if is_64 else 16
+        for index in range(1, symtab['size'] // entsize):
+            offset = symtab['offset'] + index * entsize
+            if is_64:
+                name, info, other, shndx, value, size = struct.unpack_from(f'{order}IBBHQQ', data, offset)
+            else:
+                name, value, size, info, other, shndx = struct.unpack_from(f'{order}IIIBBH', data, offset)
+            self.__symbols.append({
+                'name': self.__get_string(data, strtab['offset'] + name),
+                'type': info & 0xf,
+                'binding': info >> 4,
+                'section': shndx,
+                'value': value,
+                'size': size,
+            })
+
+
+    @staticmethod
+    def __get_string(data, offset):
+        end = data.find(b'\0', offset)
+        return data[offset:end].decode('utf-8', errors='replace')
+
+
+    __MAGIC = b'\x7fELF'
+    __SHT_SYMTAB = 2
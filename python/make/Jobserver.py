@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# @file      Jobserver.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import select
+import threading
+
+from common.System import System
+from common.Message import Message
+
+class Jobserver:
+    """
+    GNU Make jobserver throttled by system memory.
+
+    The builder owns the jobserver pipe and Make is started as its client.
+    A monitor thread watches available memory and memory pressure. When
+    memory gets tight it takes free job tokens out of the pipe, so Make
+    cannot start new compile and link jobs, and it puts them back as soon
+    as memory is available again. One job is always allowed, as Make keeps
+    an implicit token for itself.
+    """
+
+    def __init__(self, jobs, memory_per_job):
+        """
+        Args:
+            jobs (int): maximum number of parallel jobs.
+            memory_per_job (int): memory in bytes one compile or link job is expected to take.
+        """
+        self.__jobs = max(1, jobs)
+        self.__memory_per_job = memory_per_job
+        self.__read_fd = None
+        self.__write_fd = None
+        self.__held = 0
+        self.__thread = None
+        self.__stop = threading.Event()
+
+
+    @staticmethod
+    def is_supported():
+        """
+        Tests if the host supports the jobserver.
+        """
+        return System.is_linux()
+
+
+    @staticmethod
+    def get_auto_jobs(memory_per_job):
+        """
+        Returns number of jobs fitting CPUs and available memory of the host.
+        """
+        jobs = System.get_cpu_count()
+        memory = System.get_memory()
+        if memory is not None:
+            jobs = min(jobs, memory[1] // memory_per_job)
+        return max(1, int(jobs))
+
+
+    def start(self):
+        """
+        Creates the jobserver pipe and starts the memory monitor.
+        """
+        self.__read_fd, self.__write_fd = os.pipe()
+        os.write(self.__write_fd, b'+' * (self.__jobs - 1))
+        self.__held = 0
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__monitor, daemon=True)
+        self.__thread.start()
+
+
+    def stop(self):
+        """
+        Stops the memory monitor and closes the jobserver pipe.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            # Wake the monitor up if it waits for a token
+            os.write(self.__write_fd, b'+')
+            self.__thread.join(self.__MONITOR_PERIOD * 4)
+            self.__thread = None
+        for fd in [self.__read_fd, self.__write_fd]:
+            if fd is not None:
+                os.close(fd)
+        self.__read_fd = None
+        self.__write_fd = None
+
+
+    def get_env(self, env=None):
+        """
+        Returns environment for Make to use the jobserver.
+
+        Args:
+            env (dict): environment to be extended, or None for the current one.
+        """
+        env = dict(env if env is not None else os.environ)
+        auth = f'{self.__read_fd},{self.__write_fd}'
+        flags = env.get('MAKEFLAGS', '')
+        env['MAKEFLAGS'] = f'{flags} -j --jobserver-fds={auth} --jobserver-auth={auth}'.strip()
+        return env
+
+
+    def get_fds(self):
+        """
+        Returns file descriptors to be passed to Make.
+        """
+        return (self.__read_fd, self.__write_fd)
+
+
+    def __monitor(self):
+        while self.__stop.wait(self.__MONITOR_PERIOD) is not True:
+            memory = System.get_memory()
+            if memory is None:
+                continue
+            pressure = System.get_memory_pressure()
+            is_tight = memory[1] < self.__memory_per_job \
+                or (pressure is not None and pressure > self.__PRESSURE_LIMIT)
+            is_free = memory[1] > self.__memory_per_job * 2 \
+                and (pressure is None or pressure < self.__PRESSURE_LIMIT / 2)
+            if is_tight and self.__held < self.__jobs - 1:
+                # Take a token as soon as a running job returns it
+                readable, _, _ = select.select([self.__read_fd], [], [], self.__MONITOR_PERIOD)
+                if len(readable) > 0 and self.__stop.is_set() is not True:
+                    os.read(self.__read_fd, 1)
+                    self.__held += 1
+                    Message.out(f'[JOBS] Memory is tight, {self.__jobs - self.__held} jobs allowed', Message.INF)
+            elif is_free and self.__held > 0:
+                os.write(self.__write_fd, b'+')
+                self.__held -= 1
+                Message.out(f'[JOBS] Memory is available, {self.__jobs - self.__held} jobs allowed', Message.INF)
+
+
+    __MONITOR_PERIOD = 0.5
+    __PRESSURE_LIMIT = 20.0
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# @file      Matrix.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from common.IProgram import IProgram
+from common.FileWatcher import FileWatcher
+from common.Message import Message
+from common.System import System
+from common.Tracer import Tracer
+from make.Program import Program
+from make.Jobserver import Jobserver
+from make.CompilerCache import CompilerCache
+from make.Platforms import Platforms
+
+class Matrix(IProgram):
+    """
+    Build matrix of EOOS targets and configurations.
+
+    Each combination of the given EOOS projects and configurations is built
+    in its own build tree. Several combinations are executed in a process pool
+    at the same time and the available cores are divided between them.
+    """
+
+    def __init__(self, args):
+        self.__args = args
+        self.__path_to_trace = os.path.abspath(args.trace) if args.trace is not None else None
+        self.__combinations = []
+        for eoos in args.eoos:
+            for config in args.config:
+                if (eoos, config) not in self.__combinations:
+                    self.__combinations.append((eoos, config))
+
+
+    def execute(self):
+        if self.__args.watch is True:
+            self.__execute_watch()
+            return
+        if len(self.__combinations) == 1:
+            eoos, config = self.__combinations[0]
+            jobs = self.__args.jobs
+            if jobs == 'auto':
+                jobs = self.__get_auto_jobs()
+            program = Matrix._create_program( self.__create_args(eoos, config, None, jobs) )
+            try:
+                program.execute()
+            finally:
+                self.__save_trace( program.get_tracer().get_events() )
+            return
+        results = self.__execute_in_pool()
+        self.__save_trace( [e for r in results for e in r[5]] )
+        self.__print_summary(results)
+        failed = [r for r in results if r[2] is not True]
+        if len(failed) > 0:
+            raise Exception(f'{len(failed)} of {len(results)} build combinations have failed')
+
+
+    @staticmethod
+    def _create_program(args):
+        """
+        Creates a program for the EOOS project given in the arguments.
+        """
+        return Platforms.create(args.eoos, args)
+
+
+    @staticmethod
+    def _execute_combination(args):
+        """
+        Executes one combination of the matrix in a worker process.
+
+        Returns:
+            tuple: EOOS project, configuration, result, execution time, error and trace events.
+        """
+        time_start = time.time()
+        res = True
+        error = None
+        events = []
+        # Lines of the log file are marked with the process, so its combination is told
+        Message.out(f'[INFO] Combination {args.eoos} {args.config} is executed by process {os.getpid()}', Message.INF)
+        try:
+            program = Matrix._create_program(args)
+            try:
+                program.execute()
+            finally:
+                events = program.get_tracer().get_events()
+        except Exception as e:
+            Message.out(f'[EXCEPTION] {args.tree}: {e}', Message.ERR)
+            res = False
+            error = str(e)
+        finally:
+            # Worker processes exit without flushing the messages
+            Message.flush()
+        time_execute = round(time.time() - time_start, 9)
+        return (args.eoos, args.config, res, time_execute, error, events)
+
+
+    def __execute_watch(self):
+        if len(self.__combinations) != 1:
+            raise Exception(f'Watch mode builds only one EOOS project in one configuration')
+        eoos, config = self.__combinations[0]
+        jobs = self.__args.jobs
+        if jobs == 'auto':
+            jobs = self.__get_auto_jobs()
+        args = self.__create_args(eoos, config, None, jobs)
+        if args.run is None:
+            # Each cycle is an incremental build followed by the affected unit tests
+            Message.out(f'[WATCH] Unit tests are not filtered, all of them are selected', Message.INF)
+            args.run = []
+        watcher = FileWatcher( os.path.abspath(f'{Program._PATH_TO_SOURCE_DIR}/codebase') )
+        watcher.start()
+        method = 'inotify' if watcher.is_native() else 'polling'
+        Message.out(f'[WATCH] Watching "codebase" directory by {method}, press Ctrl+C to stop', Message.INF)
+        try:
+            # Changes are kept until a cycle passes, so tests affected by changes of failed cycles are run again
+            pending = set()
+            is_all_pending = True
+            cycle = 1
+            while True:
+                if self.__execute_watch_cycle(args, cycle) is True:
+                    pending.clear()
+                    is_all_pending = False
+                changed = watcher.wait()
+                args = argparse.Namespace( **vars(args) )
+                args.clean = False
+                args.reconfigure = False
+                if changed is None:
+                    Message.out(f'[WATCH] Changes have been lost', Message.INF)
+                    is_all_pending = True
+                else:
+                    Message.out(f'[WATCH] {len(changed)} files have been changed', Message.INF)
+                    pending.update(changed)
+                if is_all_pending is True:
+                    # Any file may have changed, or the tests have not passed yet, so the tests are selected as given in the arguments
+                    Message.out(f'[WATCH] Rebuilding and running all selected tests...', Message.INF)
+                    args.affected = self.__args.affected
+                    args.changed = None
+                else:
+                    # Next cycles are incremental and run only tests affected by the changes
+                    Message.out(f'[WATCH] Rebuilding and running tests affected by {len(pending)} files...', Message.INF)
+                    args.affected = self.__args.affected if self.__args.affected is not None else 'HEAD'
+                    args.changed = sorted(pending)
+                cycle += 1
+        except KeyboardInterrupt:
+            Message.out(f'[WATCH] Watching has been stopped', Message.INF)
+        finally:
+            watcher.stop()
+
+
+    def __execute_watch_cycle(self, args, cycle):
+        time_start = time.time()
+        res = True
+        output = io.StringIO()
+        Message.flush()
+        # Output of the cycle is shown at once, so the previous results stay on screen while it is executed
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                program = Matrix._create_program(args)
+                try:
+                    program.execute()
+                finally:
+                    self.__save_trace( program.get_tracer().get_events() )
+            except Exception as e:
+                Message.out(f'[EXCEPTION] {e}', Message.ERR)
+                res = False
+            finally:
+                Message.flush()
+        if sys.stdout.isatty():
+            sys.stdout.write(self.__CLEAR_SCREEN)
+        sys.stdout.write(output.getvalue())
+        status = Message.OK if res is True else Message.ERR
+        not_word = '' if res is True else ' NOT'
+        time_execute = round(time.time() - time_start, 3)
+        Message.out(f'[WATCH] Cycle {cycle} has{not_word} been completed in {time_execute} seconds, waiting for changes...', status)
+        return res
+
+
+    def __execute_in_pool(self):
+        jobs = self.__divide_jobs()
+        Message.out(f'[BUILD] Executing {len(self.__combinations)} build combinations in parallel...', Message.INF)
+        compiler_cache = None
+        if self.__args.compiler_cache is not None:
+            # Combinations share the compiler cache server, so it is not restarted while other ones compile
+            compiler_cache = CompilerCache(self.__args.compiler_cache, self.__args.compiler_cache_dir, \
+                self.__args.compiler_cache_size)
+            compiler_cache.start_server()
+        # Messages of the workers are written to the log file by this process only
+        log_queue = multiprocessing.Queue()
+        try:
+            with Message.listen(log_queue), ProcessPoolExecutor(max_workers=len(self.__combinations), \
+                initializer=Message.configure, initargs=Message.get_configuration(log_queue)) as pool:
+                futures = []
+                for i, (eoos, config) in enumerate(self.__combinations):
+                    args = self.__create_args(eoos, config, f'{eoos}-{config}', jobs[i])
+                    args.compiler_cache_server = False
+                    Message.out(f'[INFO] Combination {eoos} {config}: build tree "build/{args.tree}", jobs {args.jobs}', Message.INF)
+                    futures.append( pool.submit(Matrix._execute_combination, args) )
+                return [f.result() for f in futures]
+        finally:
+            if compiler_cache is not None:
+                compiler_cache.stop_server()
+
+
+    def __divide_jobs(self):
+        total = self.__args.jobs
+        if total is None:
+            total = System.get_cpu_count()
+        elif total == 'auto':
+            total = self.__get_auto_jobs()
+        number = len(self.__combinations)
+        jobs = []
+        for i in range(number):
+            share = total // number
+            if i < total % number:
+                share += 1
+            jobs.append(max(1, share))
+        return jobs
+
+
+    def __create_args(self, eoos, config, tree, jobs):
+        args = argparse.Namespace( **vars(self.__args) )
+        args.eoos = eoos
+        args.config = config
+        args.tree = tree
+        args.jobs = jobs
+        args.jobs_auto = self.__args.jobs == 'auto'
+        return args
+
+
+    def __get_auto_jobs(self):
+        memory_per_job = Program._MEMORY_PER_JOB
+        if self.__args.coverage is True:
+            memory_per_job *= 2
+        jobs = Jobserver.get_auto_jobs(memory_per_job)
+        Message.out(f'[INFO] Automatic number of jobs: {jobs}', Message.INF)
+        return jobs
+
+
+    def __save_trace(self, events):
+        if self.__path_to_trace is None:
+            return
+        Tracer.save(self.__path_to_trace, events)
+        Message.out(f'[INFO] Trace events have been written to "{self.__path_to_trace}"', Message.INF)
+
+
+    def __print_summary(self, results):
+        Message.out(f'Build matrix summary', Message.INF, True)
+        for eoos, config, res, time_execute, error, events in results:
+            if res is True:
+                Message.out(f'[PASSED] {eoos} {config} in {time_execute} seconds', Message.OK)
+            else:
+                Message.out(f'[FAILED] {eoos} {config} in {time_execute} seconds: {error}', Message.ERR)
+
+
+    __CLEAR_SCREEN = '\033[2J\033[H'
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# @file      Platforms.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import importlib
+
+class Platforms:
+    """
+    Registry of EOOS platform programs.
+
+    A platform is registered by its name and a reference to its program class
+    in the "module:Class" format, and the module is imported only when the
+    program of the platform is created. Besides the built-in platforms, other
+    ones are registered by "eoos.platforms" entry points of installed Python
+    packages, and by the EOOS_PLATFORMS environment variable in the
+    "NAME=module:Class,NAME=module:Class" format. Scanning metadata of the
+    installed packages is slow, so entry points are looked up only for names
+    which are neither built in nor given in the environment variable.
+    """
+
+    ENTRY_POINT_GROUP = 'eoos.platforms'
+    ENVIRONMENT_VARIABLE = 'EOOS_PLATFORMS'
+
+    @staticmethod
+    def get_names():
+        """
+        Returns names of all registered platforms.
+        """
+        names = list(Platforms.__get_references().keys())
+        return names + [n for n in Platforms.__get_entry_points().keys() if n not in names]
+
+
+    @staticmethod
+    def get_built_in_names():
+        """
+        Returns names of the built-in platforms.
+        """
+        return list(Platforms.__BUILT_IN.keys())
+
+
+    @staticmethod
+    def is_registered(name):
+        """
+        Tests if a platform is registered.
+        """
+        return Platforms.__get_reference(name) is not None
+
+
+    @staticmethod
+    def create(name, args):
+        """
+        Creates the program of a platform.
+
+        Args:
+            name (str): name of the platform.
+            args (Namespace): program arguments.
+
+        Returns:
+            Program: program of the platform.
+        """
+        reference = Platforms.__get_reference(name)
+        if reference is None:
+            raise Exception(f'EOOS project not supported')
+        module, _, attribute = reference.partition(':')
+        try:
+            program = getattr(importlib.import_module(module), attribute)
+        except (ImportError, AttributeError) as e:
+            raise Exception(f'EOOS project "{name}" cannot be loaded from "{reference}": {e}')
+        return program(args)
+
+
+    @staticmethod
+    def __get_reference(name):
+        reference = Platforms.__get_references().get(name)
+        if reference is None:
+            reference = Platforms.__get_entry_points().get(name)
+        return reference
+
+
+    @staticmethod
+    def __get_references():
+        if Platforms.__references is not None:
+            return Platforms.__references
+        references = dict(Platforms.__BUILT_IN)
+        for item in os.environ.get(Platforms.ENVIRONMENT_VARIABLE, '').split(','):
+            name, _, reference = item.partition('=')
+            if len(name.strip()) == 0 or ':' not in reference:
+                continue
+            references[name.strip()] = reference.strip()
+        Platforms.__references = references
+        return references
+
+
+    @staticmethod
+    def __get_entry_points():
+        if Platforms.__entry_points is not None:
+            return Platforms.__entry_points
+        Platforms.__entry_points = {}
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return Platforms.__entry_points
+        points = entry_points()
+        if hasattr(points, 'select'):
+            points = points.select(group=Platforms.ENTRY_POINT_GROUP)
+        else:
+            points = points.get(Platforms.ENTRY_POINT_GROUP, [])
+        Platforms.__entry_points = {p.name: p.value for p in points}
+        return Platforms.__entry_points
+
+
+    __references = None
+    __entry_points = None
+    __BUILT_IN = {
+        'POSIX': 'make.ProgramOnPosix:ProgramOnPosix',
+        'WIN32': 'make.ProgramOnWin32:ProgramOnWin32',
+        'FreeRTOS': 'make.ProgramOnFreeRTOS:ProgramOnFreeRTOS',
+    }
@@ -4,12 +4,38 @@
 # @copyright 2023-2025, Sergey Baigudin, Baigudin Software
 
 import os
+import sys
+import time
+import fnmatch
 import shutil
-import subprocess
+import sqlite3
+import argparse
+import platform
 
 from abc import ABC, abstractmethod
 from common.IProgram import IProgram
 from common.Message import Message
+from common.System import System
+from common.Fingerprint import Fingerprint, FileDigests
+from common.Tracer import Tracer
+from common.Trash import Trash
+from common.ProcessRunner import Process, ProcessRunner
+from make.AffectedTests import AffectedTests
+from make.ArtifactCache import ArtifactCache
+from make.Benchmark import Benchmark
+from make.CompilerCache import CompilerCache
+from make.Coverage import Coverage
+from make.CompileProfile import CompileProfile
+from make.ElfFile import ElfFile
+from make.Jobserver import Jobserver
+from make.RunHistory import RunHistory
+from make.StageGraph import StageGraph
+from make.StaticAnalysis import StaticAnalysis
+from make.TestCache import TestCache
+from make.TestHistory import TestHistory
+from make.TestReport import TestReport
+from make.TestRunner import TestRunner
+from make.TestTimings import TestTimings
 
 class Program(IProgram):
     """
@@ -18,16 +44,75 @@ class Program(IProgram):
 
     def __init__(self, args):
         self.__args = args
+        self.__path_to_source_dir = os.path.abspath(self._PATH_TO_SOURCE_DIR)
+        self.__path_to_build_dir = os.path.abspath(self._PATH_TO_BUILD_DIR)
+        if args.tree is not None:
+            self.__path_to_build_dir = os.path.join(self.__path_to_build_dir, args.tree)
+        self.__tree = args.tree if args.tree is not None else self.__DEFAULT_TREE
+        self.__statistics = {}
+        self.__environment = None
+        if args.pgo_variant is not None:
+            self.__path_to_build_dir = os.path.join(self._get_path_to_tree_output(self._PGO_DIR_NAME), args.pgo_variant)
+            self.__tree = f'{self.__tree}-{self._PGO_DIR_NAME}-{args.pgo_variant}'
+            self.__environment = self.__get_pgo_environment(args.pgo_variant)
+        self.__tracer = Tracer(f'{args.eoos} {args.config}')
+        self.__runner = ProcessRunner(self.__tracer)
+        self.__compiler_cache = None
+        if args.compiler_cache is not None:
+            self.__compiler_cache = CompilerCache(args.compiler_cache, args.compiler_cache_dir, args.compiler_cache_size, \
+                f'{self.__path_to_build_dir}/{self._COMPILER_CACHE_STATS_FILE}', args.compiler_cache_server)
+            # Settings of the cache are passed to the build sub-processes only, not to the builder and other programs
+            self.__environment = dict(self.__environment if self.__environment is not None else os.environ)
+            self.__environment.update( self.__compiler_cache.get_env() )
+        self.__compile_profile = None
+        if args.profile_compile is True:
+            self.__compile_profile = CompileProfile(self.__path_to_build_dir, self.__path_to_source_dir, \
+                self._get_path_to_tree_output(self._PROFILE_DIR_NAME))
+        self.__artifact_cache = None
+        if args.artifact_cache is True:
+            path = args.artifact_cache_dir if args.artifact_cache_dir is not None else ArtifactCache.get_default_dir()
+            size = args.artifact_cache_size if args.artifact_cache_size is not None else self._ARTIFACT_CACHE_SIZE
+            self.__artifact_cache = ArtifactCache(path, ArtifactCache.parse_size(size))
 
 
     def execute(self):
-        self.__check_run_path()
-        self.__do_clean()
-        self.__do_create()
-        self._do_build()
-        self._do_install()
-        self._do_run()
-        self._do_coverage()
+        start = time.time()
+        is_passed = False
+        try:
+            times = self._create_stage_graph().execute(self.__tracer)
+            StageGraph.print_overlaps(times)
+            is_passed = True
+        finally:
+            self.__tracer.print_summary()
+            self.__record_run(start, is_passed)
+
+
+    def get_tracer(self):
+        """
+        Returns tracer of the program phases and sub-processes.
+        """
+        return self.__tracer
+
+
+    def _create_stage_graph(self):
+        """
+        Creates dependency graph of the program stages.
+
+        Platform programs can add, replace or remove stages, and change their dependencies.
+        """
+        graph = StageGraph()
+        graph.add('check', self.__check_run_path)
+        graph.add('clean', self.__do_clean, ['check'])
+        graph.add('create', self.__do_create, ['clean'])
+        graph.add('build', self.__do_build, ['create'])
+        graph.add('install', self._do_install, ['build'])
+        graph.add('run', self._do_run, ['build'])
+        graph.add('sca', self.__do_sca, ['build'])
+        graph.add('coverage', self._do_coverage, ['run'])
+        # Optimized variants and benchmarks are measured alone, not together with other stages
+        graph.add('pgo', self.__do_pgo, ['install', 'coverage'])
+        graph.add('bench', self.__do_bench, ['pgo'])
+        return graph
 
 
     @abstractmethod
@@ -71,36 +156,144 @@ class Program(IProgram):
 
 
     @abstractmethod
-    def _get_run_ut_executable_path_back(self):
+    def _get_run_executable(self):
         """
-        Returns path back from EOOS UT executable file.
+        Returns UT executablr file name.
         """
         pass
 
 
-    @abstractmethod
-    def _get_run_executable(self):
+    def _get_bench_executable(self):
         """
-        Returns UT executablr file name.
+        Returns path to Google Benchmark executable file relative to the build directory, or None.
         """
-        pass
+        return None
+
+
+    def _is_pgo_supported(self):
+        """
+        Tests if the toolchain of the program supports GCC profile-guided and link-time optimization.
+        """
+        return False
+
+
+    def _get_toolchain_file(self):
+        """
+        Returns absolute path to CMake toolchain file of the program, or None.
+        """
+        return None
 
 
-    def _run_subprocess_from_build_dir(self, args, path_to=None, path_back=None):
+    def _run_subprocess(self, args, cwd=None, env=None, timeout=None, **kwargs):
         """
-        Runs a sub-process with given args changing current working directory.
+        Runs a sub-process with given args in the given working directory, or the build directory.
         """
-        if path_to is None:
-            path_to = self._PATH_TO_BUILD_DIR
-        if path_back is None:
-            path_back = self._PATH_TO_SCRIPT_DIR
-        os.chdir(path_to)
-        ret = subprocess.run(args).returncode
-        os.chdir(path_back)
+        if cwd is None:
+            cwd = self._get_path_to_build_dir()
+        if env is None:
+            env = self.__environment
+        process = Process(args, cwd, env, timeout, name=' '.join([os.path.basename(args[0])] + args[1:]), **kwargs)
+        ret = self.__runner.run(process)
+        if process.timed_out is True:
+            raise Exception(f'Execution aborted on timeout of {timeout} seconds')
         if ret != 0:
             raise Exception(f'Execution aborted with return code [{ret}]')
 
 
+    def _run_make(self, args):
+        """
+        Runs Make with the number of jobs given in the program arguments.
+
+        If the number of jobs is chosen automatically, Make is started as a client
+        of a jobserver which holds new jobs back while system memory is tight.
+        """
+        jobs = self._get_args().jobs
+        if self._get_args().jobs_auto is True and Jobserver.is_supported():
+            jobserver = Jobserver(jobs, self._get_memory_per_job())
+            jobserver.start()
+            try:
+                self._run_subprocess(args, env=jobserver.get_env(self.__environment), pass_fds=jobserver.get_fds())
+            finally:
+                jobserver.stop()
+            return
+        if jobs is not None:
+            args = args + ['-j', str(jobs)]
+        self._run_subprocess(args)
+
+
+    def _get_memory_per_job(self):
+        """
+        Returns memory in bytes one compile or link job is expected to take.
+        """
+        if self._get_args().coverage is True:
+            return self._MEMORY_PER_JOB * 2
+        return self._MEMORY_PER_JOB
+
+
+    def _run_configure(self, args):
+        """
+        Runs CMake configure step unless its inputs are unchanged since the last run.
+        """
+        fingerprint = self.__get_configure_fingerprint(args)
+        path = f'{self._get_path_to_build_dir()}/{self._CONFIGURE_FINGERPRINT_FILE}'
+        if self._get_args().reconfigure is not True \
+            and os.path.isfile(f'{self._get_path_to_build_dir()}/CMakeCache.txt') \
+            and os.path.isfile(path):
+            with open(path, 'r') as file:
+                if file.read() == fingerprint:
+                    Message.out(f'[BUILD] CMake project is up to date, configure step is skipped', Message.INF)
+                    return
+        if os.path.isfile(path):
+            os.remove(path)
+        self._run_subprocess(args)
+        with open(path, 'w') as file:
+            file.write(fingerprint)
+
+
+    def _get_compiler_launcher_args(self):
+        """
+        Returns CMake configure arguments which set or unset compiler and linker launchers.
+        """
+        launchers = []
+        linker_launchers = []
+        if self.__compile_profile is not None and self.__compile_profile.get_launcher() is not None:
+            launchers.extend( self.__compile_profile.get_launcher() )
+            linker_launchers.extend( self.__compile_profile.get_launcher() )
+        if self.__compiler_cache is not None:
+            launchers.append( self.__compiler_cache.get_launcher() )
+        args = []
+        for name, launcher in [('COMPILER', launchers), ('LINKER', linker_launchers)]:
+            for lang in ['C', 'CXX']:
+                if len(launcher) == 0:
+                    args.append(f'-UCMAKE_{lang}_{name}_LAUNCHER')
+                else:
+                    args.append(f'-DCMAKE_{lang}_{name}_LAUNCHER={";".join(launcher)}')
+        return args
+
+
+    def _start_build(self):
+        """
+        Starts collecting compiler cache statistics and compile profile of a build.
+        """
+        if self.__compiler_cache is not None:
+            self.__compiler_cache.start()
+        if self.__compile_profile is not None:
+            self.__compile_profile.start()
+            # The compiler is known once the build tree is configured, so the settings are added at the build
+            self.__environment = dict(self.__environment if self.__environment is not None else os.environ)
+            self.__environment.update( self.__compile_profile.get_env() )
+
+
+    def _stop_build(self):
+        """
+        Reports compiler cache statistics and compile profile of a build.
+        """
+        if self.__compiler_cache is not None:
+            self.__compiler_cache.stop()
+        if self.__compile_profile is not None:
+            self.__compile_profile.stop()
+
+
     def _get_args(self):
         """
         Returns program arguments.
@@ -108,38 +301,532 @@ class Program(IProgram):
         return self.__args
 
 
-    def _do_run_ut(self):
-        if self._get_args().run is None:
+    def _get_path_to_build_dir(self):
+        """
+        Returns absolute path to the build tree of the program.
+        """
+        return self.__path_to_build_dir
+
+
+    @staticmethod
+    def _get_path_to_output(name):
+        """
+        Returns absolute path to a file or directory of outputs of the builder.
+
+        All outputs are kept in one directory of the build directory, which is
+        not deleted by cleaning.
+        """
+        return os.path.join(os.path.abspath(Program._PATH_TO_BUILD_DIR), Program._OUTPUT_DIR_NAME, name)
+
+
+    def _get_path_to_tree_output(self, name):
+        """
+        Returns absolute path to a directory of outputs of the build tree of the program.
+        """
+        return os.path.join(self._get_path_to_output(name), self.__tree)
+
+
+    def _get_path_to_source_dir(self):
+        """
+        Returns absolute path to the EOOS repository root.
+        """
+        return self.__path_to_source_dir
+
+
+    def _do_run_ut(self, is_counting=False):
+        """
+        Runs EOOS unit tests.
+
+        Args:
+            is_counting (bool): the program creates coverage from counters of the tests,
+                so the tests are run for coverage even if they are not requested.
+        """
+        is_counting = is_counting is True and self._get_args().coverage is True
+        if self._get_args().run is None and is_counting is not True:
             return
         Message.out(f'[BUILD] Running unit tests...', Message.INF)
-        args = [self._get_run_executable(), '--gtest_shuffle']
-        if len(self._get_args().run) > 0:
-            arg = '--gtest_filter='
-            if self._get_args().run is not None:
-                for i, r in enumerate(self._get_args().run):
-                    arg += r
-                    if i != len(self._get_args().run) - 1:
-                        arg += ':'
-            args.append(arg)
-        path_to = f'{self._PATH_TO_BUILD_DIR}/{ self._get_run_ut_executable_path_to()}'
-        path_back = f'{self._get_run_ut_executable_path_back()}/{self._PATH_TO_SCRIPT_DIR}'
-        self._run_subprocess_from_build_dir(args, path_to, path_back)
+        path_to = f'{self._get_path_to_build_dir()}/{self._get_run_ut_executable_path_to()}'
+        path_to_results = f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_RESULTS_DIR}'
+        path_to_counters = None
+        if is_counting is True:
+            path_to_counters = f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_COUNTERS_DIR}'
+            if os.path.isdir(path_to_counters):
+                shutil.rmtree(path_to_counters)
+        executable = os.path.join(path_to, self._get_run_executable())
+        runner = self._create_test_runner(executable, path_to, path_to_results, path_to_counters)
+        gtest_filter = self._get_run_ut_filter()
+        if self._get_args().affected is not None:
+            gtest_filter = self.__get_affected_filter(runner, gtest_filter)
+            if gtest_filter == '':
+                Message.out(f'[BUILD] No unit tests are affected by the changes', Message.OK)
+                return
+        libraries = [os.path.join(self._get_path_to_build_dir(), n) \
+            for n in self.__find_files(self._get_path_to_build_dir(), self.__SHARED_LIBRARY_PATTERNS)]
+        cache = TestCache(f'{path_to_results}/{TestCache.FILE_NAME}', executable, libraries)
+        tests = cache.get_tests(gtest_filter)
+        if tests is None:
+            tests = runner.list_tests(gtest_filter)
+        report = TestReport()
+        # Coverage counters are written only by executed tests
+        if self._get_args().no_test_cache is not True and self._get_args().coverage is not True:
+            report = cache.get_report(tests)
+        replayed = set([f'{t["suite"]}.{t["name"]}' for t in report.get_tests()])
+        tests_to_run = [t for t in tests if t not in replayed]
+        if len(replayed) > 0:
+            Message.out(f'[CACHE] Unit test executable and its libraries are unchanged, {len(replayed)} results are replayed, ' \
+                f'{len(tests_to_run)} tests are executed', Message.INF)
+        if len(tests_to_run) > 0:
+            if len(replayed) == 0:
+                executed = self.__run_ut_tests(runner, gtest_filter, tests)
+            else:
+                executed = self.__run_ut_tests(runner, runner.compact_filter(':'.join(tests_to_run)), tests_to_run)
+            cache.update(gtest_filter, tests, executed)
+            cache.save()
+            report.merge(executed)
+        report.save_xml(f'{path_to_results}/{TestRunner.REPORT_FILE_NAME}')
+        TestRunner.print_report(report)
+        self.__statistics['tests_passed'] = report.get_count(TestReport.PASSED)
+        self.__statistics['tests_failed'] = report.get_count(TestReport.FAILED)
+        self.__statistics['tests_skipped'] = report.get_count(TestReport.SKIPPED)
+        self.__statistics['tests_replayed'] = len(replayed)
+        if report.is_passed() is not True:
+            raise Exception(f'Unit tests have failed')
+
+
+    def _create_test_runner(self, executable, path_to_run_dir, path_to_output_dir, path_to_counters_dir):
+        """
+        Creates runner of the unit test executable.
 
+        Args:
+            executable (str): path to the unit test executable.
+            path_to_run_dir (str): working directory of the unit tests.
+            path_to_output_dir (str): directory for results of the unit tests.
+            path_to_counters_dir (str): directory for coverage counters, or None.
 
-    def __do_clean(self):
-        if self._get_args().clean is not True:
+        Returns:
+            TestRunner: runner of the unit tests.
+        """
+        return TestRunner(executable, path_to_run_dir, path_to_output_dir, self.__tracer, self._get_args().fail_fast, \
+            path_to_counters_dir, self._get_args().test_timeout)
+
+
+    def _do_coverage_report(self):
+        """
+        Creates code coverage report from counters of the unit tests.
+        """
+        Message.out(f'[BUILD] Generating code coverage report...', Message.INF)
+        jobs = self._get_args().jobs if self._get_args().jobs is not None else System.get_cpu_count()
+        coverage = Coverage(self._get_path_to_build_dir(), self._get_path_to_source_dir(), \
+            f'{self._get_path_to_build_dir()}/{self._PATH_TO_COVERAGE_DIR}', self._COVERAGE_SOURCES, jobs)
+        coverage.create(f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_COUNTERS_DIR}')
+
+
+    def _get_run_ut_filter(self):
+        """
+        Returns Google Test filter joined from the run argument patterns, or None.
+        """
+        if self._get_args().run is None or len(self._get_args().run) == 0:
+            return None
+        return ':'.join(self._get_args().run)
+
+
+    def __get_affected_filter(self, runner, gtest_filter):
+        path = f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_RESULTS_DIR}/{TestRunner.REPORT_FILE_NAME}'
+        since = os.path.getmtime(path) if os.path.isfile(path) else None
+        affected = AffectedTests(self._get_path_to_build_dir(), self._get_path_to_source_dir())
+        suites = affected.get_suites(self._get_args().affected, since, self._get_args().changed)
+        if suites is None:
+            return gtest_filter
+        tests = runner.list_tests(gtest_filter)
+        # Names of parameterized suites have an instantiation prefix or a type suffix
+        selected = [t for t in tests if len(set(t.split('.')[0].split('/')) & suites) > 0]
+        Message.out(f'[AFFECTED] {len(selected)} of {len(tests)} tests are affected', Message.INF)
+        if len(selected) == len(tests):
+            return gtest_filter
+        return runner.compact_filter(':'.join(selected))
+
+
+    def __run_ut_tests(self, runner, gtest_filter, tests):
+        path_to_results = f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_RESULTS_DIR}'
+        timings = TestTimings(f'{path_to_results}/{TestTimings.FILE_NAME}')
+        history = TestHistory(f'{path_to_results}/{TestHistory.FILE_NAME}')
+        report = TestReport()
+        if history.has_suspects():
+            if tests is None:
+                tests = runner.list_tests(gtest_filter)
+            suspects = history.get_suspects(tests)
+            if len(suspects) > 0:
+                Message.out(f'[INFO] Running {len(suspects)} recently failed or flaky tests first', Message.INF)
+                report = runner.run_filters([], [suspects])
+                tests = [t for t in tests if t not in set(suspects)]
+                gtest_filter = self.__exclude_tests(gtest_filter, suspects)
+        if len(report.get_failed()) > 0 and self._get_args().fail_fast is True:
+            Message.out(f'[INFO] Other unit tests are not run after a failure', Message.INF)
+        elif tests is None or len(tests) > 0:
+            report.merge( self.__run_ut_shuffled(runner, timings, gtest_filter, tests) )
+        timings.update(report)
+        timings.save()
+        history.update(report)
+        history.save()
+        return report
+
+
+    def __run_ut_shuffled(self, runner, timings, gtest_filter, tests):
+        jobs = self._get_args().test_jobs
+        if jobs is None or jobs < 1:
+            jobs = 1
+        if jobs > 1 and timings.is_empty() is not True:
+            if tests is None:
+                tests = runner.list_tests(gtest_filter)
+            groups = timings.partition(tests, jobs)
+            for i, (group, duration) in enumerate(groups):
+                Message.out(f'[INFO] Worker {i}: {len(group)} tests, estimated {round(duration, 3)} seconds', Message.INF)
+            return runner.run_filters(['--gtest_shuffle'], [group for group, duration in groups])
+        args = ['--gtest_shuffle']
+        if gtest_filter is not None:
+            args.append(f'--gtest_filter={gtest_filter}')
+        if jobs > 1:
+            Message.out(f'[INFO] No unit test timings recorded, running {jobs} index shards', Message.INF)
+        return runner.run_shards(args, jobs)
+
+
+    @staticmethod
+    def __exclude_tests(gtest_filter, tests):
+        positive, _, negative = (gtest_filter if gtest_filter is not None else '*').partition('-')
+        negative = ':'.join([n for n in [negative] + list(tests) if len(n) > 0])
+        return f'{positive if len(positive) > 0 else "*"}-{negative}'
+
+
+    def __do_bench(self):
+        if self._get_args().bench is None:
+            return
+        if self._get_bench_executable() is None:
+            raise Exception(f'EOOS {self._get_args().eoos} program cannot be benchmarked')
+        executable = os.path.normpath(f'{self._get_path_to_build_dir()}/{self._get_bench_executable()}')
+        if os.path.isfile(executable) is not True:
+            raise Exception(f'Benchmark executable "{executable}" is not found')
+        Message.out(f'[BUILD] Running benchmarks...', Message.INF)
+        if self._get_args().tree is not None:
+            Message.out(f'[BENCH] Benchmarks are measured while other build combinations run', Message.WRN)
+        repetitions = self._get_args().bench_repetitions
+        if repetitions is None:
+            repetitions = self._BENCH_REPETITIONS
+        threshold = self._get_args().bench_threshold
+        if threshold is None:
+            threshold = self._BENCH_THRESHOLD
+        path_to_output = f'{self._get_path_to_tree_output(self._BENCH_DIR_NAME)}/{self._get_args().eoos}-{self._get_args().config}'
+        benchmark = Benchmark(executable, os.path.dirname(executable), path_to_output, self._get_path_to_source_dir(), self.__tracer)
+        benchmark.execute(self._get_args().bench, repetitions, threshold, self._get_args().bench_baseline)
+
+
+    def __record_run(self, start, is_passed):
+        if self._get_args().no_history is True:
+            return
+        phases = {}
+        for span in self.__tracer.get_spans(Tracer.PHASE):
+            phases[span['name']] = phases.get(span['name'], 0.0) + span['wall']
+        run = dict(self.__statistics)
+        run.update({
+            'time': start,
+            'target': self._get_args().eoos,
+            'config': self._get_args().config,
+            'jobs': 'auto' if self._get_args().jobs_auto is True else self._get_args().jobs,
+            'host': platform.node(),
+            'commit_id': System.get_commit(self._get_path_to_source_dir()),
+            'passed': 1 if is_passed else 0,
+            'duration': time.time() - start,
+        })
+        if self.__compiler_cache is not None and self.__compiler_cache.get_statistics() is not None:
+            run['cache_hits'], run['cache_misses'] = self.__compiler_cache.get_statistics()
+        threshold = self._get_args().history_threshold
+        if threshold is None:
+            threshold = self._HISTORY_THRESHOLD
+        try:
+            history = RunHistory( self._get_path_to_output(self._HISTORY_FILE_NAME) )
+            identifier = history.add(run, phases)
+            if is_passed is not True:
+                return
+            for name, duration, median in history.get_regressions(identifier, threshold):
+                Message.out(f'[HISTORY] Phase "{name}" has taken {duration:.3f} seconds against median {median:.3f} seconds ' \
+                    f'of the recent runs, more than {threshold}% slower', Message.WRN)
+        except sqlite3.Error as e:
+            # The history must not fail the build
+            Message.out(f'[HISTORY] Run cannot be recorded: {e}', Message.WRN)
+
+
+    def __do_sca(self):
+        if self._get_args().sca is None:
             return
-        if os.path.isdir(self._PATH_TO_BUILD_DIR):
+        Message.out(f'[BUILD] Running static analysis...', Message.INF)
+        jobs = self._get_args().jobs if self._get_args().jobs is not None else System.get_cpu_count()
+        if self._get_args().run is not None:
+            # Unit tests are executed at the same time, so their workers take their share of the jobs
+            test_jobs = self._get_args().test_jobs if self._get_args().test_jobs is not None else 1
+            jobs = max(1, jobs - max(1, test_jobs))
+        analysis = StaticAnalysis(self._get_path_to_build_dir(), self._get_path_to_source_dir(), \
+            f'{self._get_path_to_build_dir()}/{self._PATH_TO_SCA_DIR}', self._SCA_SOURCES, jobs)
+        analysis.execute(self._get_args().sca)
+
+
+    def __do_pgo(self):
+        if self._get_args().pgo is not True:
+            return
+        if self._is_pgo_supported() is not True:
+            raise Exception(f'EOOS {self._get_args().eoos} program cannot be built with profile-guided optimization')
+        if self._get_args().config == 'Debug':
+            raise Exception(f'Profile-guided optimization needs a release configuration')
+        Message.out(f'[PGO] Building instrumented variant...', Message.INF)
+        instrumented = self.__create_pgo_program(self.__PGO_INSTRUMENTED)
+        # Profiles of earlier runs would be merged with the new ones
+        self.__remove_files(instrumented._get_path_to_build_dir(), ['*.gcda'])
+        # Each variant has its own tracer, so its phases are not counted as phases of this program
+        try:
+            with self.__tracer.span(f'pgo {self.__PGO_INSTRUMENTED}', Tracer.NESTED):
+                instrumented._create_stage_graph().execute( instrumented.get_tracer() )
+            Message.out(f'[PGO] Running training workload...', Message.INF)
+            instrumented.__run_pgo_workload()
+        finally:
+            self.__tracer.add(instrumented.get_tracer(), f'pgo {self.__PGO_INSTRUMENTED}')
+        profiles = self.__find_files(instrumented._get_path_to_build_dir(), ['*.gcda'])
+        if len(profiles) == 0:
+            raise Exception(f'Training workload has not written any profile')
+        Message.out(f'[PGO] {len(profiles)} profiles have been collected', Message.INF)
+        Message.out(f'[PGO] Building optimized variant...', Message.INF)
+        optimized = self.__create_pgo_program(self.__PGO_OPTIMIZED)
+        # Make does not know that objects depend on the profiles, so all of them are rebuilt
+        self.__remove_files(optimized._get_path_to_build_dir(), ['*.o', '*.obj', '*.gcda'])
+        for name in profiles:
+            path = os.path.join(optimized._get_path_to_build_dir(), name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(os.path.join(instrumented._get_path_to_build_dir(), name), path)
+        try:
+            with self.__tracer.span(f'pgo {self.__PGO_OPTIMIZED}', Tracer.NESTED):
+                optimized._create_stage_graph().execute( optimized.get_tracer() )
+            self.__compare_pgo(optimized)
+        finally:
+            self.__tracer.add(optimized.get_tracer(), f'pgo {self.__PGO_OPTIMIZED}')
+
+
+    def __create_pgo_program(self, variant):
+        args = argparse.Namespace( **vars(self._get_args()) )
+        args.pgo_variant = variant
+        args.pgo = False
+        args.clean = False
+        args.run = None
+        args.affected = None
+        args.coverage = False
+        args.install = False
+        args.bench = None
+        args.sca = None
+        args.no_history = True
+        args.artifact_cache = False
+        args.define = list(args.define) if args.define is not None else []
+        if variant == self.__PGO_OPTIMIZED:
+            args.define.append('CMAKE_INTERPROCEDURAL_OPTIMIZATION=ON')
+        return type(self)(args)
+
+
+    def __get_pgo_environment(self, variant):
+        flags = self.__PGO_FLAGS[variant]
+        # The flags are appended to the ones set by toolchain files when a build tree is configured
+        environment = dict(os.environ)
+        for name in ['CFLAGS', 'CXXFLAGS', 'LDFLAGS']:
+            environment[name] = ' '.join([environment.get(name, '')] + flags).strip()
+        return environment
+
+
+    def __run_pgo_workload(self):
+        # Benchmarks are the workload if they are requested, otherwise unit tests
+        start = time.time()
+        if self._get_args().bench is not None and self._get_bench_executable() is not None:
+            executable = os.path.normpath(f'{self._get_path_to_build_dir()}/{self._get_bench_executable()}')
+            args = [executable, '--benchmark_repetitions=1']
+            if len(self._get_args().bench) > 0:
+                args.append(f'--benchmark_filter={"|".join(self._get_args().bench)}')
+            self._run_subprocess(args, os.path.dirname(executable))
+            return time.time() - start
+        path_to = f'{self._get_path_to_build_dir()}/{self._get_run_ut_executable_path_to()}'
+        path_to_results = f'{self._get_path_to_build_dir()}/{self._PATH_TO_UT_RESULTS_DIR}'
+        runner = self._create_test_runner(os.path.join(path_to, self._get_run_executable()), path_to, path_to_results, None)
+        args = []
+        if self._get_run_ut_filter() is not None:
+            args.append(f'--gtest_filter={self._get_run_ut_filter()}')
+        report = runner.run_shards(args, 1)
+        if report.is_passed() is not True:
+            Message.out(f'[PGO] Unit tests of the training workload have failed', Message.WRN)
+        return time.time() - start
+
+
+    def __compare_pgo(self, optimized):
+        if self._get_args().coverage is True:
+            Message.out(f'[PGO] Release build is instrumented for coverage, so it is not comparable', Message.WRN)
+        names = [os.path.join(self._get_run_ut_executable_path_to(), self._get_run_executable())]
+        if self._get_bench_executable() is not None:
+            names.append(self._get_bench_executable())
+        for name in names:
+            release = os.path.normpath(f'{self._get_path_to_build_dir()}/{name}')
+            variant = os.path.normpath(f'{optimized._get_path_to_build_dir()}/{name}')
+            if os.path.isfile(release) is not True or os.path.isfile(variant) is not True:
+                continue
+            if ElfFile.is_elf(release) is not True or ElfFile.is_elf(variant) is not True:
+                continue
+            size, base = self.__get_loaded_size(variant), self.__get_loaded_size(release)
+            Message.out(f'[PGO] {os.path.basename(name)}: {size} bytes against {base} bytes of the release build ' \
+                f'({self.__get_change(size, base):+.2f}%)', Message.OK)
+        Message.out(f'[PGO] Running workload on the release build...', Message.INF)
+        base = self.__run_pgo_workload()
+        Message.out(f'[PGO] Running workload on the optimized build...', Message.INF)
+        duration = optimized.__run_pgo_workload()
+        Message.out(f'[PGO] Workload: {round(duration, 3)} seconds against {round(base, 3)} seconds of the release build ' \
+            f'({self.__get_change(duration, base):+.2f}%)', Message.OK)
+        Message.out(f'[PGO] Optimized build tree is "{optimized._get_path_to_build_dir()}"', Message.INF)
+
+
+    @staticmethod
+    def __get_loaded_size(path):
+        # Sizes of sections loaded to memory, so debug information and symbols are not counted
+        sections = ElfFile(path).get_sections()
+        return sum([s['size'] for s in sections if s['flags'] & ElfFile.SHF_ALLOC and s['type'] != ElfFile.SHT_NOBITS])
+
+
+    @staticmethod
+    def __get_change(value, base):
+        return 100.0 * (value - base) / base if base > 0 else 0.0
+
+
+    @staticmethod
+    def __find_files(path, patterns):
+        names = []
+        for root, dirs, files in os.walk(path):
+            # Hidden directories are not parts of the tree, like the outputs of the builder
+            dirs[:] = [d for d in dirs if d.startswith('.') is not True]
+            for file in files:
+                if any([fnmatch.fnmatch(file, p) for p in patterns]):
+                    names.append(os.path.relpath(os.path.join(root, file), path))
+        return names
+
+
+    @staticmethod
+    def __remove_files(path, patterns):
+        for name in Program.__find_files(path, patterns):
+            os.remove(os.path.join(path, name))
+
+
+    def __do_build(self):
+        if self.__artifact_cache is None or self._get_args().build is None:
+            self.__do_build_tree()
+            return
+        if self._get_args().install is True or self._get_args().coverage is True:
+            # Installation and coverage need the object files of a complete build tree
+            Message.out(f'[CACHE] Artifact cache is not used with installation or coverage', Message.INF)
+            self.__do_build_tree()
+            return
+        key = self.__get_artifact_key()
+        is_restored = self.__artifact_cache.restore(key, self._get_path_to_build_dir())
+        self.__statistics['artifact_cache'] = 'hit' if is_restored else 'miss'
+        if is_restored:
+            # Objects of the tree do not match the restored artifacts, so the next build must link them again
+            open(f'{self._get_path_to_build_dir()}/{self._ARTIFACTS_RESTORED_FILE}', 'w').close()
+            Message.out(f'[CACHE] Build artifacts "{key[:16]}" have been restored, build step is skipped', Message.OK)
+            return
+        self.__do_build_tree()
+        names = self.__get_artifact_names()
+        self.__artifact_cache.store(key, self._get_path_to_build_dir(), names)
+        Message.out(f'[CACHE] {len(names)} build artifacts have been stored as "{key[:16]}"', Message.INF)
+
+
+    def __do_build_tree(self):
+        path = f'{self._get_path_to_build_dir()}/{self._ARTIFACTS_RESTORED_FILE}'
+        if os.path.isfile(path):
+            # Restored artifacts are removed, so Make links them again from the objects of the tree
+            Message.out(f'[CACHE] Build tree has restored artifacts, they are built again', Message.INF)
+            for name in self.__get_artifact_names():
+                os.remove( os.path.join(self._get_path_to_build_dir(), name) )
+            os.remove(path)
+        self._do_build()
+
+
+    def __get_file_digests(self):
+        # Digests are shared by fingerprints of the configure step and the artifacts, so unchanged files are not read
+        return FileDigests(f'{self._get_path_to_build_dir()}/{self._FILE_DIGESTS_FILE}')
+
+
+    def __get_artifact_key(self):
+        args = self._get_args()
+        digests = self.__get_file_digests()
+        fingerprint = Fingerprint(digests)
+        fingerprint.add_string(sys.platform)
+        for value in [args.eoos, args.config, args.build, args.bench is not None]:
+            fingerprint.add_string(str(value))
+        if args.define is not None:
+            for d in args.define:
+                fingerprint.add_string(d)
+        if self._get_toolchain_file() is not None:
+            fingerprint.add_file( self._get_toolchain_file() )
+        for name in self.__CONFIGURE_ENVIRONMENT:
+            fingerprint.add_string(f'{name}={os.environ.get(name, "")}')
+        fingerprint.add_file(f'{self._get_path_to_source_dir()}/CMakeLists.txt')
+        for name in self.__ARTIFACT_SOURCE_DIRS:
+            fingerprint.add_string(name)
+            fingerprint.add_tree(f'{self._get_path_to_source_dir()}/{name}', ['*'])
+        digests.save()
+        return fingerprint.get()
+
+
+    def __get_artifact_names(self):
+        executables = [os.path.normpath( os.path.join(self._get_run_ut_executable_path_to(), self._get_run_executable()) )]
+        if self._get_bench_executable() is not None:
+            executables.append( os.path.normpath(self._get_bench_executable()) )
+        names = []
+        for root, dirs, files in os.walk(self._get_path_to_build_dir()):
+            dirs[:] = [d for d in dirs if d != 'CMakeFiles' and d != self._PATH_TO_UT_RESULTS_DIR and d.startswith('.') is not True]
+            for file in files:
+                name = os.path.relpath(os.path.join(root, file), self._get_path_to_build_dir())
+                if name in executables \
+                    or name.startswith(f'CMakeInstallDir{os.sep}') \
+                    or (name.startswith(f'codebase{os.sep}') and any([fnmatch.fnmatch(file, p) for p in self.__ARTIFACT_PATTERNS])):
+                    names.append(name)
+        return sorted(names)
+
+
+    def __get_configure_fingerprint(self, args):
+        digests = self.__get_file_digests()
+        fingerprint = Fingerprint(digests)
+        for arg in args:
+            fingerprint.add_string(arg)
+            if arg.startswith('-DCMAKE_TOOLCHAIN_FILE='):
+                fingerprint.add_file( arg.split('=', 1)[1] )
+        environment = self.__environment if self.__environment is not None else os.environ
+        for name in self.__CONFIGURE_ENVIRONMENT:
+            fingerprint.add_string(f'{name}={environment.get(name, "")}')
+        fingerprint.add_tree(self._get_path_to_source_dir(), ['CMakeLists.txt', '*.cmake'], \
+            [os.path.abspath(self._PATH_TO_BUILD_DIR)])
+        digests.save()
+        return fingerprint.get()
+
+
+    def __do_clean(self):
+        trash = Trash( self._get_path_to_output(self._TRASH_DIR_NAME) )
+        if self._get_args().clean is True and os.path.isdir(self._get_path_to_build_dir()):
             Message.out(f'[BUILD] Deleting "build" directory...', Message.INF)
-            shutil.rmtree(self._PATH_TO_BUILD_DIR)
+            if os.path.isdir( os.path.join(self._get_path_to_build_dir(), self._OUTPUT_DIR_NAME) ):
+                # Outputs of the builder are kept, so the tree is moved by its entries
+                for name in os.listdir(self._get_path_to_build_dir()):
+                    if name != self._OUTPUT_DIR_NAME:
+                        trash.move( os.path.join(self._get_path_to_build_dir(), name) )
+            else:
+                trash.move(self._get_path_to_build_dir())
+        # Trees of this and interrupted earlier runs are deleted while the build goes on
+        if trash.reap():
+            Message.out(f'[BUILD] Deleting old build trees in background...', Message.INF)
 
 
     def __do_create(self):
-        if not os.path.exists(self._PATH_TO_BUILD_DIR):
+        if not os.path.exists(self._get_path_to_build_dir()):
             Message.out(f'[BUILD] Creating "build" directory...', Message.INF)
-            os.makedirs(self._PATH_TO_BUILD_DIR)
-            os.makedirs(self._PATH_TO_BUILD_DIR + '/CMakeInstallDir')
-            os.makedirs(self._PATH_TO_BUILD_DIR + '/sca')
+            os.makedirs(self._get_path_to_build_dir())
+            os.makedirs(self._get_path_to_build_dir() + '/CMakeInstallDir')
+            os.makedirs(f'{self._get_path_to_build_dir()}/{self._PATH_TO_SCA_DIR}')
 
 
     def __check_run_path(self):
@@ -158,4 +845,38 @@ class Program(IProgram):
 
 
     _PATH_TO_BUILD_DIR = './../../build'
-    _PATH_TO_SCRIPT_DIR = './../scripts/python'
+    _PATH_TO_SOURCE_DIR = './../..'
+    _PATH_TO_UT_RESULTS_DIR = 'ut'
+    _PATH_TO_UT_COUNTERS_DIR = 'ut/gcov'
+    _PATH_TO_COVERAGE_DIR = 'coverage'
+    _COVERAGE_SOURCES = ['codebase/interface', 'codebase/library', 'codebase/system']
+    _PATH_TO_SCA_DIR = 'sca'
+    _SCA_SOURCES = ['codebase/interface', 'codebase/library', 'codebase/system']
+    _CONFIGURE_FINGERPRINT_FILE = 'EoosConfigure.fingerprint'
+    _FILE_DIGESTS_FILE = 'EoosFile.digests'
+    _ARTIFACTS_RESTORED_FILE = 'EoosArtifacts.restored'
+    _COMPILER_CACHE_STATS_FILE = 'EoosCompilerCache.stats'
+    _PROFILE_DIR_NAME = 'profile'
+    _MEMORY_PER_JOB = 1024 * 1024 * 1024
+    _ARTIFACT_CACHE_SIZE = '5G'
+    _BENCH_DIR_NAME = 'bench'
+    _BENCH_REPETITIONS = 10
+    _BENCH_THRESHOLD = 5.0
+    _PGO_DIR_NAME = 'pgo'
+    _TRASH_DIR_NAME = 'trash'
+    _OUTPUT_DIR_NAME = '.eoos-scripts'
+    _HISTORY_FILE_NAME = 'history.sqlite'
+    _LOG_FILE_NAME = 'build.log'
+    _HISTORY_THRESHOLD = 25.0
+
+    __DEFAULT_TREE = 'default'
+    __CONFIGURE_ENVIRONMENT = ['CC', 'CXX', 'CFLAGS', 'CXXFLAGS', 'LDFLAGS', 'PATH']
+    __ARTIFACT_SOURCE_DIRS = ['codebase', 'cmake']
+    __PGO_INSTRUMENTED = 'instrumented'
+    __PGO_OPTIMIZED = 'optimized'
+    __PGO_FLAGS = {
+        __PGO_INSTRUMENTED: ['-fprofile-generate', '-fprofile-update=prefer-atomic'],
+        __PGO_OPTIMIZED: ['-fprofile-use', '-fprofile-partial-training', '-Wno-missing-profile', '-Wno-error=coverage-mismatch'],
+    }
+    __ARTIFACT_PATTERNS = ['*.a', '*.so', '*.so.*', '*.lib', '*.dll', '*.dylib', '*.elf', '*.hex', '*.bin']
+    __SHARED_LIBRARY_PATTERNS = ['*.so', '*.so.*', '*.dll', '*.dylib']
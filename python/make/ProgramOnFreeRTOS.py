@@ -3,7 +3,11 @@
 # @author    Sergey Baigudin, sergey@baigudin.software
 # @copyright 2024-2025, Sergey Baigudin, Baigudin Software
 
+import os
+
 from make.Program import Program
+from make.SizeAnalysis import SizeAnalysis
+from make.QemuTestRunner import QemuTestRunner
 from common.System import System
 from common.Message import Message
 
@@ -16,6 +20,12 @@ class ProgramOnFreeRTOS(Program):
         super().__init__(args)
 
 
+    def _create_stage_graph(self):
+        graph = super()._create_stage_graph()
+        graph.add('size', self.__do_size, ['build'])
+        return graph
+
+
     def _do_build(self):
         if System.is_linux():
             self.__do_build_on_linux()
@@ -31,8 +41,7 @@ class ProgramOnFreeRTOS(Program):
 
 
     def _do_run(self):
-        if self._get_args().run is not None:
-            raise Exception(f'EOOS FreeRTOS program cannot be run as the feature is in development')
+        self._do_run_ut()
 
 
     def _do_coverage(self):
@@ -40,24 +49,80 @@ class ProgramOnFreeRTOS(Program):
             raise Exception(f'EOOS FreeRTOS program cannot be covered as the feature is in development')
 
 
-    def _get_run_ut_executable_path_to(self):
-        return f'./codebase/tests'
+    def _get_toolchain_file(self):
+        if System.is_win32():
+            return f'{self._get_path_to_source_dir()}/cmake/Toolchain.windows.cortex-m3.gcc.cmake'
+        return f'{self._get_path_to_source_dir()}/cmake/Toolchain.linux.cortex-m3.gcc.cmake'
 
 
-    def _get_run_ut_executable_path_back(self):
-        return './../..'
+    def _create_test_runner(self, executable, path_to_run_dir, path_to_output_dir, path_to_counters_dir):
+        timeout = self._get_args().test_timeout
+        if timeout is None:
+            timeout = self.__QEMU_TIMEOUT
+        # The board can be given by the arguments, or by the toolchain or definitions in the CMake cache
+        cache = self.__read_cmake_cache()
+        machine = self._get_args().qemu_machine
+        if machine is None:
+            machine = cache.get('EOOS_QEMU_MACHINE', self.__QEMU_MACHINE)
+        cpu = self._get_args().qemu_cpu
+        if cpu is None:
+            cpu = cache.get('EOOS_QEMU_CPU', self.__QEMU_CPU)
+        Message.out(f'[INFO] Unit tests are run on QEMU machine {machine} with CPU {cpu}', Message.INF)
+        return QemuTestRunner(executable, path_to_run_dir, path_to_output_dir, machine, cpu, \
+            self.get_tracer(), self._get_args().fail_fast, timeout)
+
+
+    def _is_pgo_supported(self):
+        return True
+
+
+    def _get_run_ut_executable_path_to(self):
+        return f'./codebase/tests'
 
 
     def _get_run_executable(self):
         return f'./EoosTests.elf'
 
 
+    def __read_cmake_cache(self):
+        entries = {}
+        path = f'{self._get_path_to_build_dir()}/CMakeCache.txt'
+        if os.path.isfile(path) is not True:
+            return entries
+        with open(path, 'r', errors='replace') as file:
+            for line in file:
+                name, separator, value = line.rstrip('\r\n').partition('=')
+                if len(separator) == 0 or line.startswith(('#', '//')):
+                    continue
+                entries[name.split(':')[0]] = value
+        return entries
+
+
+    def __do_size(self):
+        if self._get_args().build is None:
+            return
+        path = os.path.normpath(f'{self._get_path_to_build_dir()}/{self._get_run_ut_executable_path_to()}/{self._get_run_executable()}')
+        if os.path.isfile(path) is not True:
+            raise Exception(f'ELF file "{path}" is not found')
+        Message.out(f'[BUILD] Analysing memory footprint...', Message.INF)
+        path_to_map = None
+        for name in [f'{os.path.splitext(path)[0]}.map', f'{path}.map']:
+            if os.path.isfile(name):
+                path_to_map = name
+        threshold = self._get_args().size_threshold
+        if threshold is None:
+            threshold = self.__SIZE_THRESHOLD
+        analysis = SizeAnalysis(path, self._get_path_to_tree_output(self.__SIZE_DIR_NAME), path_to_map, \
+            self._get_path_to_build_dir())
+        analysis.execute(threshold, self._get_args().size_baseline)
+
+
     def __do_build_on_linux(self):
         if self._get_args().build is None:
             return
 
         args = ['cmake', \
-                f'-DCMAKE_TOOLCHAIN_FILE=./../cmake/Toolchain.linux.cortex-m3.gcc.cmake', \
+                f'-DCMAKE_TOOLCHAIN_FILE={self._get_toolchain_file()}', \
                 f'-DCMAKE_BUILD_TYPE={self._get_args().config}' \
         ]
         if self._get_args().build == 'ALL':
@@ -67,20 +132,24 @@ class ProgramOnFreeRTOS(Program):
         else:
             raise Exception(f'Cannot process --build {self._get_args().build} argument')
 
+        args.append('-DCMAKE_EXPORT_COMPILE_COMMANDS=ON')
+        args.extend( self._get_compiler_launcher_args() )
         if self._get_args().define is not None:
             for d in self._get_args().define:
                 args.append(f'-D{d}')
-        args.append('..')
-        self._run_subprocess_from_build_dir(args)
+        args.append(self._get_path_to_source_dir())
+        self._run_configure(args)
 
         args.clear()
         args = ['make', 'all']
         if self._get_args().verbose is True:
             args.append('VERBOSE=1')
-        if self._get_args().jobs is not None:
-            args.extend(['-j', str(self._get_args().jobs)])
         Message.out(f'[BUILD] Building Make project...', Message.INF)
-        self._run_subprocess_from_build_dir(args)
+        self._start_build()
+        try:
+            self._run_make(args)
+        finally:
+            self._stop_build()
 
 
     def __do_build_on_win32(self):
@@ -89,7 +158,7 @@ class ProgramOnFreeRTOS(Program):
 
         args = ['cmake', \
                 '-GMinGW Makefiles', \
-                f'-DCMAKE_TOOLCHAIN_FILE=./../cmake/Toolchain.windows.cortex-m3.gcc.cmake', \
+                f'-DCMAKE_TOOLCHAIN_FILE={self._get_toolchain_file()}', \
         ]
         if self._get_args().build == 'ALL':
             Message.out(f'[BUILD] Generating CMake project for all targets...', Message.INF)
@@ -97,11 +166,13 @@ class ProgramOnFreeRTOS(Program):
             raise Exception(f'The EOOS parameter of --build argument is not processed for the moment')
         else:
             raise Exception(f'Cannot process --build {self._get_args().build} argument')
+        args.append('-DCMAKE_EXPORT_COMPILE_COMMANDS=ON')
+        args.extend( self._get_compiler_launcher_args() )
         if self._get_args().define is not None:
             for d in self._get_args().define:
                 args.append(f'-D{d}')
-        args.append('..')
-        self._run_subprocess_from_build_dir(args)
+        args.append(self._get_path_to_source_dir())
+        self._run_configure(args)
 
         args.clear()
         Message.out(f'[BUILD] Building CMake project...', Message.INF)
@@ -110,4 +181,15 @@ class ProgramOnFreeRTOS(Program):
             args.append('--verbose')
         if self._get_args().jobs is not None:
             args.extend(['-j', str(self._get_args().jobs)])
-        self._run_subprocess_from_build_dir(args)
+        self._start_build()
+        try:
+            self._run_subprocess(args)
+        finally:
+            self._stop_build()
+
+
+    __SIZE_DIR_NAME = 'size'
+    __SIZE_THRESHOLD = 5.0
+    __QEMU_MACHINE = 'lm3s6965evb'
+    __QEMU_CPU = 'cortex-m3'
+    __QEMU_TIMEOUT = 300.0
@@ -28,52 +28,60 @@ class ProgramOnPosix(Program):
             args.append('-DEOOS_CMAKE_ENABLE_TESTS=ON')
             if self._get_args().coverage is True:
                 args.append('-DEOOS_CMAKE_ENABLE_GCC_COVERAGE=ON')
+            if self._get_args().bench is not None:
+                args.append('-DEOOS_CMAKE_ENABLE_BENCHMARKS=ON')
         elif self._get_args().build == 'EOOS':
             Message.out(f'[BUILD] Generating CMake project for the EOOS target...', Message.INF)
         else:
             raise Exception(f'Cannot process --build {self._get_args().build} argument')
+        args.append('-DCMAKE_EXPORT_COMPILE_COMMANDS=ON')
+        args.extend( self._get_compiler_launcher_args() )
         if self._get_args().define is not None:
             for d in self._get_args().define:
                 args.append(f'-D{d}')
-        args.append('..')
-        self._run_subprocess_from_build_dir(args)
+        args.append(self._get_path_to_source_dir())
+        self._run_configure(args)
 
         args.clear()
         args = ['make', 'all']
         if self._get_args().verbose is True:
             args.append('VERBOSE=1')
-        if self._get_args().jobs is not None:
-            args.extend(['-j', str(self._get_args().jobs)])
         Message.out(f'[BUILD] Building Make project...', Message.INF)
-        self._run_subprocess_from_build_dir(args)
+        self._start_build()
+        try:
+            self._run_make(args)
+        finally:
+            self._stop_build()
 
 
     def _do_install(self):
         if self._get_args().install is True:
             Message.out(f'[BUILD] installing the library...', Message.INF)
             args = ['sudo', 'make', 'install']
-            self._run_subprocess_from_build_dir(args)
+            self._run_subprocess(args)
 
 
     def _do_run(self):
-        self._do_run_ut()
+        self._do_run_ut(True)
 
 
     def _do_coverage(self):
         if self._get_args().coverage is not True:
             return
-        Message.out(f'[BUILD] Generating code coverage report...', Message.INF)
-        args = ['make', 'coverage']
-        self._run_subprocess_from_build_dir(args)
+        self._do_coverage_report()
 
 
-    def _get_run_ut_executable_path_to(self):
-        return './codebase/tests'
+    def _is_pgo_supported(self):
+        return True
 
 
-    def _get_run_ut_executable_path_back(self):
-        return './../..'
+    def _get_run_ut_executable_path_to(self):
+        return './codebase/tests'
 
 
     def _get_run_executable(self):
         return f'./EoosTests'
+
+
+    def _get_bench_executable(self):
+        return f'./codebase/benchmarks/EoosBenchmarks'
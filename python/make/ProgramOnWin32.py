@@ -15,6 +15,10 @@ class ProgramOnWin32(Program):
     def __init__(self, args):
         if System.is_win32() is not True:
             raise Exception(f'Unsuppoted host OS')
+        if args.compiler_cache is not None:
+            raise Exception(f'EOOS WIN32 program cannot use compiler cache as the feature is in development')
+        if args.profile_compile is True:
+            raise Exception(f'EOOS WIN32 program cannot profile compilation as the feature is in development')
         super().__init__(args)
 
 
@@ -33,8 +37,8 @@ class ProgramOnWin32(Program):
         if self._get_args().define is not None:
             for d in self._get_args().define:
                 args.append(f'-D{d}')
-        args.append('..')
-        self._run_subprocess_from_build_dir(args)
+        args.append(self._get_path_to_source_dir())
+        self._run_configure(args)
 
         args.clear()
         Message.out(f'[BUILD] Building CMake project...', Message.INF)
@@ -43,14 +47,14 @@ class ProgramOnWin32(Program):
             args.append('--verbose')
         if self._get_args().jobs is not None:
             args.extend(['-j', str(self._get_args().jobs)])
-        self._run_subprocess_from_build_dir(args)
+        self._run_subprocess(args)
 
 
     def _do_install(self):
         if self._get_args().install is True:
             Message.out(f'[BUILD] installing the library...', Message.INF)
             args = ['cmake', '--install', '.', '--config', self._get_args().config]
-            self._run_subprocess_from_build_dir(args)
+            self._run_subprocess(args)
 
 
     def _do_run(self):
@@ -61,25 +65,19 @@ class ProgramOnWin32(Program):
         if self._get_args().coverage is not True:
             return
         Message.out(f'[BUILD] Generating code coverage report...', Message.INF)
-        path = f'./build/{self._get_run_ut_executable_path_to()}/{self._get_run_executable()}'
+        path = f'{self._get_path_to_build_dir()}/{self._get_run_ut_executable_path_to()}/{self._get_run_executable()}'
         args = ['OpenCppCoverage.exe'
             , '--sources', 'codebase\interface'
             , '--sources', 'codebase\library'
             , '--sources', 'codebase\system'
-            , '--export_type', 'html:build\coverage'
+            , '--export_type', f'html:{self._get_path_to_build_dir()}\coverage'
             , '--', path]
-        path_to = f'{self._PATH_TO_BUILD_DIR}/..'
-        path_back = f'./build/{self._PATH_TO_SCRIPT_DIR}'
-        self._run_subprocess_from_build_dir(args, path_to, path_back)
+        self._run_subprocess(args, self._get_path_to_source_dir())
 
 
     def _get_run_ut_executable_path_to(self):
         return f'./codebase/tests/{self._get_args().config}'
 
 
-    def _get_run_ut_executable_path_back(self):
-        return './../../..'
-
-
     def _get_run_executable(self):
         return 'EoosTests.exe'
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# @file      QemuTestRunner.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import shutil
+import fnmatch
+
+from common.Message import Message
+from make.TestRunner import TestRunner
+
+class QemuTestRunner(TestRunner):
+    """
+    Runner of Google Test executable of an embedded target on QEMU emulators.
+
+    Each worker is an emulator instance booting the executable as its kernel.
+    Google Test arguments are passed over the semihosting command line, and
+    both semihosting and UART output is multiplexed to the console of the
+    emulator, from which the results are parsed. As a target cannot read the
+    environment of the host, shards get their own test filters instead of the
+    Google Test sharding variables, and filters are compacted to whole suites
+    to fit the short command line buffer of the target C library. Tests are
+    listed by one boot of the target, and other listings are filtered from it.
+    """
+
+    def __init__(self, executable, path_to_run_dir, path_to_output_dir, machine, cpu, tracer=None, fail_fast=False, \
+        timeout=None, emulator='qemu-system-arm'):
+        """
+        Args:
+            executable (str): path to the unit test ELF executable.
+            path_to_run_dir (str): working directory of the emulator processes.
+            path_to_output_dir (str): directory for results of the workers.
+            machine (str): QEMU machine, for example lm3s6965evb.
+            cpu (str): QEMU CPU, for example cortex-m3.
+            tracer (Tracer): tracer of the emulator processes, or None.
+            fail_fast (bool): stop all emulators as soon as one of them reports a failed test.
+            timeout (float): time limit of each emulator in seconds, or None.
+            emulator (str): name or path of the QEMU system emulator.
+        """
+        super().__init__(executable, path_to_run_dir, path_to_output_dir, tracer, fail_fast, None, timeout)
+        self.__executable = executable
+        self.__machine = machine
+        self.__cpu = cpu
+        self.__emulator = shutil.which(emulator)
+        if self.__emulator is None:
+            raise Exception(f'QEMU emulator "{emulator}" is not found')
+        self.__tests = None
+
+
+    def run_shards(self, args, jobs):
+        """
+        Runs the executable in the given number of shards of whole suites.
+
+        Args:
+            args (list): Google Test arguments passed to each shard.
+            jobs (int): number of emulators executed at the same time.
+
+        Returns:
+            TestReport: merged results of all shards.
+        """
+        gtest_filter = None
+        other = []
+        for arg in args:
+            if arg.startswith(self.__FILTER):
+                gtest_filter = arg[len(self.__FILTER):]
+            else:
+                other.append(arg)
+        if jobs <= 1 and gtest_filter is None:
+            return super().run_shards(args, 1)
+        suites = {}
+        for test in self.list_tests(gtest_filter):
+            suites.setdefault(test.split('.')[0], []).append(test)
+        groups = [[] for i in range(max(jobs, 1))]
+        # Larger suites are distributed first to balance the number of tests in the shards
+        for suite in sorted(suites.values(), key=len, reverse=True):
+            min(groups, key=len).extend(suite)
+        return self.run_filters(other, [g for g in groups if len(g) > 0])
+
+
+    def run_filters(self, args, filters):
+        """
+        Runs the executable in parallel emulators each executing its own list of tests.
+
+        Args:
+            args (list): Google Test arguments passed to each emulator.
+            filters (list): lists of full test names of each emulator.
+
+        Returns:
+            TestReport: merged results of all emulators.
+        """
+        return super().run_filters(args, [self.compact_filter(':'.join(tests)).split(':') for tests in filters])
+
+
+    def list_tests(self, gtest_filter=None):
+        """
+        Returns full names of tests matching the given Google Test filter.
+        """
+        if self.__tests is None:
+            self.__tests = super().list_tests()
+        if gtest_filter is None:
+            return list(self.__tests)
+        positive, _, negative = gtest_filter.partition('-')
+        positive = [p for p in positive.split(':') if len(p) > 0]
+        negative = [p for p in negative.split(':') if len(p) > 0]
+        if len(positive) == 0:
+            positive = ['*']
+        return [t for t in self.__tests if any([fnmatch.fnmatchcase(t, p) for p in positive]) \
+            and not any([fnmatch.fnmatchcase(t, p) for p in negative])]
+
+
+    def _get_command(self, args):
+        arguments = [os.path.basename(self.__executable)] + list(args)
+        if len(' '.join(arguments)) > self.__COMMAND_LINE_LIMIT:
+            Message.out(f'[INFO] Command line of the target exceeds {self.__COMMAND_LINE_LIMIT} characters ' \
+                f'and may be truncated', Message.WRN)
+        # Commas are doubled to not be taken as separators of QEMU options
+        semihosting = ','.join(['enable=on', 'target=native', 'chardev=console'] + \
+            [f'arg={a.replace(",", ",,")}' for a in arguments])
+        return [self.__emulator, \
+            '-machine', self.__machine, \
+            '-cpu', self.__cpu, \
+            '-display', 'none', \
+            '-monitor', 'none', \
+            '-chardev', 'stdio,id=console,mux=on', \
+            '-serial', 'chardev:console', \
+            '-semihosting-config', semihosting, \
+            '-kernel', os.path.abspath(self.__executable), \
+        ]
+
+
+    def _has_xml_output(self):
+        return False
+
+
+    __FILTER = '--gtest_filter='
+    __COMMAND_LINE_LIMIT = 255
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# @file      RunHistory.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import time
+import sqlite3
+
+from contextlib import contextmanager
+from common.Message import Message
+
+class RunHistory:
+    """
+    History of builder runs in a local SQLite database.
+
+    Each run of a program is recorded with its target, configuration, host,
+    commit, durations of its phases, unit test counts and cache statistics.
+    A phase regresses if it takes longer than the median of the same phase
+    in the preceding runs of the same target and configuration by more than
+    a threshold.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the database file.
+        """
+        self.__path = path
+
+
+    def add(self, run, phases):
+        """
+        Records a run.
+
+        Args:
+            run (dict): values of the run, which keys are names of columns of the runs table.
+            phases (dict): durations of phases of the run in seconds by their names.
+
+        Returns:
+            int: identifier of the run.
+        """
+        with self.__connect() as connection:
+            names = [n for n in self.__COLUMNS if n in run]
+            cursor = connection.execute(f'INSERT INTO runs ({", ".join(names)}) VALUES ({", ".join(["?"] * len(names))})', \
+                [run[n] for n in names])
+            identifier = cursor.lastrowid
+            connection.executemany('INSERT INTO phases (run, name, duration) VALUES (?, ?, ?)', \
+                [(identifier, name, duration) for name, duration in phases.items()])
+        return identifier
+
+
+    def get_regressions(self, identifier, threshold):
+        """
+        Returns phases of a run which regressed against the preceding runs.
+
+        Args:
+            identifier (int): identifier of the run.
+            threshold (float): allowed growth of a phase duration in percent.
+
+        Returns:
+            list: tuples of phase name, its duration and the median duration of the preceding runs.
+        """
+        with self.__connect() as connection:
+            run = connection.execute('SELECT target, config, time FROM runs WHERE id = ?', (identifier,)).fetchone()
+            if run is None:
+                return []
+            regressions = []
+            for name, duration in connection.execute('SELECT name, duration FROM phases WHERE run = ?', (identifier,)).fetchall():
+                previous = [row[0] for row in connection.execute('SELECT phases.duration FROM phases ' \
+                    'JOIN runs ON runs.id = phases.run WHERE runs.target = ? AND runs.config = ? AND runs.time < ? ' \
+                    'AND runs.passed = 1 AND phases.name = ? ORDER BY runs.time DESC LIMIT ?', \
+                    (run[0], run[1], run[2], name, self.__WINDOW)).fetchall()]
+                if len(previous) < self.__MIN_RUNS:
+                    continue
+                median = self.__get_percentile(previous, 50)
+                # Short phases are dominated by noise
+                if duration - median >= self.__MIN_GROWTH and duration > median * (1.0 + threshold / 100.0):
+                    regressions.append( (name, duration, median) )
+            return regressions
+
+
+    def print_report(self, limit, threshold):
+        """
+        Prints trends, percentiles, the slowest runs and regressions of recent runs.
+
+        Args:
+            limit (int): number of recent runs of each target and configuration.
+            threshold (float): allowed growth of a phase duration in percent.
+        """
+        with self.__connect() as connection:
+            groups = connection.execute('SELECT DISTINCT target, config FROM runs ORDER BY target, config').fetchall()
+            if len(groups) == 0:
+                Message.out(f'[HISTORY] No runs have been recorded in "{self.__path}"', Message.INF)
+                return
+            recent = []
+            for target, config in groups:
+                runs = connection.execute('SELECT id, time, host, commit_id, jobs, passed, duration, tests_passed, ' \
+                    'tests_failed, tests_skipped, cache_hits, cache_misses FROM runs WHERE target = ? AND config = ? ' \
+                    'ORDER BY time DESC LIMIT ?', (target, config, limit)).fetchall()
+                recent.extend( [(target, config) + tuple(r) for r in runs] )
+                self.__print_group(connection, target, config, runs)
+        Message.out(f'[HISTORY] Slowest recent runs:', Message.INF)
+        for r in sorted(recent, key=lambda r: r[8], reverse=True)[:self.__SLOWEST]:
+            Message.out(f'[HISTORY]   {r[8]:>10.3f} s  {self.__format_time(r[3])}  {r[0]} {r[1]}  ' \
+                f'commit {self.__format_value(r[5])}  host {self.__format_value(r[4])}  jobs {self.__format_value(r[6])}', Message.NOR)
+        regressions = 0
+        for r in sorted(recent, key=lambda r: r[3]):
+            for name, duration, median in self.get_regressions(r[2], threshold):
+                regressions += 1
+                Message.out(f'[HISTORY] Run {r[2]} of {r[0]} {r[1]} at {self.__format_time(r[3])}, commit {self.__format_value(r[5])}: ' \
+                    f'phase "{name}" {duration:.3f} s against median {median:.3f} s ' \
+                    f'({100.0 * (duration - median) / median:+.1f}%)', Message.WRN)
+        if regressions == 0:
+            Message.out(f'[HISTORY] No phases regressed by more than {threshold}% in the recent runs', Message.OK)
+
+
+    def __print_group(self, connection, target, config, runs):
+        durations = [r[6] for r in runs if r[5] == 1]
+        failed = len([r for r in runs if r[5] != 1])
+        Message.out(f'[HISTORY] {target} {config}: {len(runs)} recent runs, {failed} failed', Message.INF)
+        if len(durations) > 0:
+            Message.out(f'[HISTORY]   {"Total":<20} {self.__format_statistics(durations)}', Message.NOR)
+        identifiers = [r[0] for r in runs if r[5] == 1]
+        if len(identifiers) == 0:
+            return
+        rows = connection.execute(f'SELECT phases.name, phases.duration FROM phases JOIN runs ON runs.id = phases.run ' \
+            f'WHERE phases.run IN ({", ".join(["?"] * len(identifiers))}) ORDER BY runs.time DESC', identifiers).fetchall()
+        phases = {}
+        for name, duration in rows:
+            phases.setdefault(name, []).append(duration)
+        for name, values in phases.items():
+            Message.out(f'[HISTORY]   {name:<20} {self.__format_statistics(values)}', Message.NOR)
+        last = runs[0]
+        if last[7] is not None:
+            Message.out(f'[HISTORY]   Last run: {last[7]} tests passed, {last[8]} failed, {last[9]} skipped', Message.NOR)
+        if last[10] is not None:
+            Message.out(f'[HISTORY]   Last run: compiler cache {last[10]} hits, {last[11]} misses', Message.NOR)
+
+
+    def __format_statistics(self, values):
+        # Values are in order from the most recent, so the trend compares recent runs with the earlier ones
+        p50, p90, p99 = [self.__get_percentile(values, p) for p in [50, 90, 99]]
+        text = f'p50 {p50:>9.3f} s  p90 {p90:>9.3f} s  p99 {p99:>9.3f} s'
+        if len(values) >= self.__TREND_RUNS * 2:
+            latest = self.__get_percentile(values[:self.__TREND_RUNS], 50)
+            earlier = self.__get_percentile(values[self.__TREND_RUNS:], 50)
+            if earlier > 0:
+                text += f'  trend {100.0 * (latest - earlier) / earlier:+.1f}%'
+        return text
+
+
+    @contextmanager
+    def __connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.__path)), exist_ok=True)
+        connection = sqlite3.connect(self.__path, timeout=self.__TIMEOUT)
+        try:
+            with connection:
+                self.__create_tables(connection)
+                yield connection
+        finally:
+            connection.close()
+
+
+    @staticmethod
+    def __create_tables(connection):
+        connection.execute('CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, time REAL, ' \
+            'target TEXT, config TEXT, jobs TEXT, host TEXT, commit_id TEXT, passed INTEGER, duration REAL, ' \
+            'tests_passed INTEGER, tests_failed INTEGER, tests_skipped INTEGER, tests_replayed INTEGER, ' \
+            'cache_hits INTEGER, cache_misses INTEGER, artifact_cache TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS phases (run INTEGER REFERENCES runs(id), name TEXT, duration REAL)')
+        connection.execute('CREATE INDEX IF NOT EXISTS runs_target ON runs (target, config, time)')
+        connection.execute('CREATE INDEX IF NOT EXISTS phases_run ON phases (run)')
+
+
+    @staticmethod
+    def __get_percentile(values, percent):
+        values = sorted(values)
+        position = (len(values) - 1) * percent / 100.0
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+    @staticmethod
+    def __format_value(value):
+        return str(value) if value is not None else '-'
+
+
+    @staticmethod
+    def __format_time(value):
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(value))
+
+
+    __TIMEOUT = 30.0
+    __WINDOW = 10
+    __MIN_RUNS = 3
+    __MIN_GROWTH = 0.5
+    __TREND_RUNS = 5
+    __SLOWEST = 5
+    __COLUMNS = ['time', 'target', 'config', 'jobs', 'host', 'commit_id', 'passed', 'duration', 'tests_passed', \
+        'tests_failed', 'tests_skipped', 'tests_replayed', 'cache_hits', 'cache_misses', 'artifact_cache']
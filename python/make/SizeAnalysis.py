@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# @file      SizeAnalysis.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import re
+import json
+import shutil
+import subprocess
+
+from common.Message import Message
+from make.ElfFile import ElfFile
+
+class SizeAnalysis:
+    """
+    Flash and RAM footprint of an ELF executable.
+
+    Totals of text, data and bss sections, the largest symbols and the
+    footprint of each object file are reported. Object files are taken from
+    the linker map file if it is given. Otherwise global symbols are taken
+    from the object files of the build tree which define them, where a weak
+    symbol defined by several objects goes to the first of them, and local
+    symbols from file symbols of the ELF symbol table, which precede local
+    symbols of each object file. The footprint is compared with a baseline,
+    and growth over a threshold fails the analysis.
+    """
+
+    TEXT = 'text'
+    DATA = 'data'
+    BSS = 'bss'
+
+    def __init__(self, path_to_elf, path_to_output_dir, path_to_map=None, path_to_objects_dir=None):
+        """
+        Args:
+            path_to_elf (str): path to the ELF executable.
+            path_to_output_dir (str): directory of the reports and the baseline.
+            path_to_map (str): path to the linker map file, or None.
+            path_to_objects_dir (str): directory tree of the object files of the executable, or None.
+        """
+        self.__path_to_elf = path_to_elf
+        self.__path_to_output_dir = path_to_output_dir
+        self.__path_to_map = path_to_map
+        self.__path_to_objects_dir = path_to_objects_dir
+
+
+    def execute(self, threshold=None, is_baseline=False):
+        """
+        Analyses the executable and compares it with the baseline.
+
+        Args:
+            threshold (float): allowed growth of flash or RAM in percent, or None to not fail.
+            is_baseline (bool): store the footprint as the new baseline.
+
+        Returns:
+            dict: the footprint report.
+        """
+        elf = ElfFile(self.__path_to_elf)
+        categories = [self.__get_category(s) for s in elf.get_sections()]
+        totals = {self.TEXT: 0, self.DATA: 0, self.BSS: 0}
+        for section, category in zip(elf.get_sections(), categories):
+            if category is not None:
+                totals[category] += section['size']
+        totals['flash'] = totals[self.TEXT] + totals[self.DATA]
+        totals['ram'] = totals[self.DATA] + totals[self.BSS]
+        symbols = self.__get_symbols(elf, categories)
+        attribution = self.__MAP
+        if self.__path_to_map is not None and os.path.isfile(self.__path_to_map):
+            objects = self.__get_objects_from_map(elf, categories)
+        else:
+            definitions = self.__get_definitions()
+            attribution = self.__OBJECTS if definitions is not None else self.__SYMBOLS
+            objects = self.__get_objects_from_symbols(elf, categories, definitions)
+        report = {
+            'file': os.path.basename(self.__path_to_elf),
+            'attribution': attribution,
+            'totals': totals,
+            'symbols': sorted(symbols, key=lambda s: s['size'], reverse=True)[:self.__TOP],
+            'objects': dict(sorted(objects.items(), key=lambda i: sum(i[1].values()), reverse=True)),
+        }
+        self.__demangle(report['symbols'])
+        self.__print(report)
+        os.makedirs(self.__path_to_output_dir, exist_ok=True)
+        with open(os.path.join(self.__path_to_output_dir, self.__LATEST_FILE_NAME), 'w') as file:
+            json.dump(report, file, indent=1)
+        self.__compare(report, threshold, is_baseline)
+        return report
+
+
+    def __compare(self, report, threshold, is_baseline):
+        path = os.path.join(self.__path_to_output_dir, self.__BASELINE_FILE_NAME)
+        if is_baseline is True or os.path.isfile(path) is not True:
+            shutil.copyfile(os.path.join(self.__path_to_output_dir, self.__LATEST_FILE_NAME), path)
+            Message.out(f'[SIZE] Footprint has been stored as the baseline', Message.INF)
+            return
+        with open(path, 'r') as file:
+            baseline = json.load(file)
+        exceeded = []
+        for name in ['flash', 'ram']:
+            base = baseline['totals'][name]
+            size = report['totals'][name]
+            growth = 100.0 * (size - base) / base if base > 0 else 0.0
+            status = Message.OK
+            if threshold is not None and growth > threshold:
+                status = Message.ERR
+                exceeded.append(name)
+            Message.out(f'[SIZE] {name.upper()} {size - base:+d} bytes ({growth:+.2f}%) against the baseline', status)
+        for name, sizes in report['objects'].items():
+            difference = sum(sizes.values()) - sum(baseline['objects'].get(name, {}).values())
+            if difference != 0 and len(exceeded) > 0:
+                Message.out(f'[SIZE]   {difference:+8d} {name}', Message.NOR)
+        if len(exceeded) > 0:
+            raise Exception(f'{" and ".join([e.upper() for e in exceeded])} growth exceeds {threshold}% of the baseline')
+
+
+    def __get_symbols(self, elf, categories):
+        symbols = []
+        for symbol in elf.get_symbols():
+            category = self.__get_symbol_category(symbol, categories)
+            if category is not None:
+                symbols.append({'name': symbol['name'], 'section': category, 'size': symbol['size']})
+        return symbols
+
+
+    def __get_objects_from_symbols(self, elf, categories, definitions):
+        sources, owners = definitions if definitions is not None else ({}, {})
+        objects = {}
+        current = self.__GLOBAL_SYMBOLS
+        for symbol in elf.get_symbols():
+            if symbol['type'] == ElfFile.STT_FILE:
+                current = sources.get(symbol['name']) or symbol['name']
+                continue
+            category = self.__get_symbol_category(symbol, categories)
+            if category is None:
+                continue
+            if symbol['binding'] == self.__STB_LOCAL:
+                name = current
+            else:
+                name = owners.get(symbol['name'], self.__GLOBAL_SYMBOLS)
+            sizes = objects.setdefault(name, {self.TEXT: 0, self.DATA: 0, self.BSS: 0})
+            sizes[category] += symbol['size']
+        return objects
+
+
+    def __get_definitions(self):
+        # Returns objects of source files and objects defining global symbols, or None if there are no object files
+        if self.__path_to_objects_dir is None or os.path.isdir(self.__path_to_objects_dir) is not True:
+            return None
+        sources = {}
+        owners = {}
+        paths = []
+        for root, dirs, files in os.walk(self.__path_to_objects_dir):
+            # Hidden directories are not parts of the tree, like the outputs of the builder
+            dirs[:] = [d for d in dirs if d.startswith('.') is not True]
+            paths.extend([os.path.join(root, f) for f in files if os.path.splitext(f)[1] in self.__OBJECT_EXTENSIONS])
+        for path in sorted(paths):
+            if ElfFile.is_elf(path) is not True:
+                continue
+            name = os.path.relpath(path, self.__path_to_objects_dir).replace(os.sep, '/')
+            for symbol in ElfFile(path).get_symbols():
+                if symbol['type'] == ElfFile.STT_FILE:
+                    # Sources of the same name in several objects cannot be told apart
+                    sources[symbol['name']] = name if symbol['name'] not in sources else None
+                elif symbol['binding'] != self.__STB_LOCAL and symbol['section'] != self.__SHN_UNDEF:
+                    owners.setdefault(symbol['name'], name)
+        if len(owners) == 0:
+            return None
+        return (sources, owners)
+
+
+    def __get_objects_from_map(self, elf, categories):
+        sections = {s['name']: c for s, c in zip(elf.get_sections(), categories)}
+        objects = {}
+        category = None
+        pending = None
+        is_memory_map = False
+        with open(self.__path_to_map, 'r', errors='replace') as file:
+            for line in file:
+                line = line.rstrip('\r\n')
+                if is_memory_map is not True:
+                    is_memory_map = line.startswith('Linker script and memory map')
+                    continue
+                match = self.__MAP_OUTPUT_SECTION.match(line)
+                if match is not None:
+                    category = sections.get(match.group(1))
+                    pending = None
+                    continue
+                match = self.__MAP_INPUT_SECTION.match(line)
+                if match is not None:
+                    if match.group(2) is None:
+                        # Long section names are followed by the address, size and file on the next line
+                        pending = match.group(1)
+                        continue
+                    size, name = int(match.group(3), 16), match.group(4)
+                elif pending is not None:
+                    match = self.__MAP_CONTINUATION.match(line)
+                    pending = None
+                    if match is None:
+                        continue
+                    size, name = int(match.group(2), 16), match.group(3)
+                else:
+                    continue
+                if category is None or size == 0:
+                    continue
+                sizes = objects.setdefault(name.strip(), {self.TEXT: 0, self.DATA: 0, self.BSS: 0})
+                sizes[category] += size
+        return objects
+
+
+    def __get_symbol_category(self, symbol, categories):
+        if symbol['type'] not in [ElfFile.STT_FUNC, ElfFile.STT_OBJECT] or symbol['size'] == 0:
+            return None
+        if symbol['section'] == 0 or symbol['section'] >= len(categories):
+            return None
+        return categories[symbol['section']]
+
+
+    def __get_category(self, section):
+        if section['flags'] & ElfFile.SHF_ALLOC == 0:
+            return None
+        if section['type'] == ElfFile.SHT_NOBITS:
+            return self.BSS
+        if section['flags'] & ElfFile.SHF_WRITE:
+            return self.DATA
+        return self.TEXT
+
+
+    def __demangle(self, symbols):
+        names = [s['name'] for s in symbols if s['name'].startswith('_Z')]
+        if len(names) == 0:
+            return
+        for tool in ['arm-none-eabi-c++filt', 'c++filt']:
+            path = shutil.which(tool)
+            if path is None:
+                continue
+            ret = subprocess.run([path], input='\n'.join(names), stdout=subprocess.PIPE, \
+                stderr=subprocess.DEVNULL, universal_newlines=True)
+            demangled = ret.stdout.splitlines()
+            if ret.returncode == 0 and len(demangled) == len(names):
+                mapping = dict(zip(names, demangled))
+                for symbol in symbols:
+                    symbol['name'] = mapping.get(symbol['name'], symbol['name'])
+            return
+
+
+    def __print(self, report):
+        totals = report['totals']
+        Message.out(f'[SIZE] {report["file"]}: text {totals[self.TEXT]}, data {totals[self.DATA]}, bss {totals[self.BSS]} bytes', Message.OK)
+        Message.out(f'[SIZE] {report["file"]}: FLASH {totals["flash"]}, RAM {totals["ram"]} bytes', Message.OK)
+        Message.out(f'[SIZE] Largest symbols:', Message.INF)
+        for symbol in report['symbols'][:self.__PRINTED]:
+            Message.out(f'[SIZE]   {symbol["size"]:8d} {symbol["section"]:<4} {symbol["name"]}', Message.NOR)
+        Message.out(f'[SIZE] Largest object files:', Message.INF)
+        if report['attribution'] == self.__SYMBOLS:
+            Message.out(f'[SIZE] Neither a map file nor object files are found, so global symbols cannot be ' \
+                f'attributed to object files and are counted as "{self.__GLOBAL_SYMBOLS}"', Message.WRN)
+        for name, sizes in list(report['objects'].items())[:self.__PRINTED]:
+            Message.out(f'[SIZE]   {sum(sizes.values()):8d} text {sizes[self.TEXT]}, data {sizes[self.DATA]}, ' \
+                f'bss {sizes[self.BSS]} {name}', Message.NOR)
+
+
+    __TOP = 100
+    __PRINTED = 10
+    __STB_LOCAL = 0
+    __SHN_UNDEF = 0
+    __MAP = 'map'
+    __OBJECTS = 'objects'
+    __SYMBOLS = 'symbols'
+    __OBJECT_EXTENSIONS = ['.o', '.obj']
+    __GLOBAL_SYMBOLS = '<global symbols>'
+    __LATEST_FILE_NAME = 'latest.json'
+    __BASELINE_FILE_NAME = 'baseline.json'
+    __MAP_OUTPUT_SECTION = re.compile(r'^(\.\S+)(?:\s+0x[0-9a-fA-F]+\s+0x[0-9a-fA-F]+.*)?$')
+    __MAP_INPUT_SECTION = re.compile(r'^ (\.\S+|COMMON)(?:\s+0x([0-9a-fA-F]+)\s+0x([0-9a-fA-F]+)\s+(\S.*))?$')
+    __MAP_CONTINUATION = re.compile(r'^\s+0x([0-9a-fA-F]+)\s+0x([0-9a-fA-F]+)\s+(\S.*)$')
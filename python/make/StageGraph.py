@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# @file      StageGraph.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from common.Message import Message
+from common.Tracer import Tracer
+
+class StageGraph:
+    """
+    Dependency graph of program stages.
+
+    A stage is started as soon as all stages it depends on have been
+    completed, so independent stages are executed at the same time.
+    If a stage fails, no new stages are started, the executing ones are
+    waited for and the first failure is raised.
+    """
+
+    def __init__(self):
+        self.__stages = {}
+
+
+    def add(self, name, function, dependencies=None):
+        """
+        Adds a stage, or replaces the stage with the same name.
+
+        Args:
+            name (str): name of the stage.
+            function (callable): function executing the stage.
+            dependencies (list): names of stages which have to be completed before the stage.
+        """
+        self.__stages[name] = {
+            'function': function,
+            'dependencies': list(dependencies) if dependencies is not None else [],
+        }
+
+
+    def remove(self, name):
+        """
+        Removes a stage and its name from dependencies of other stages.
+        """
+        self.__stages.pop(name, None)
+        for stage in self.__stages.values():
+            if name in stage['dependencies']:
+                stage['dependencies'].remove(name)
+
+
+    def get_dependencies(self, name):
+        """
+        Returns names of stages the given stage depends on.
+        """
+        return list(self.__stages[name]['dependencies'])
+
+
+    def set_dependencies(self, name, dependencies):
+        """
+        Sets names of stages the given stage depends on.
+        """
+        self.__stages[name]['dependencies'] = list(dependencies)
+
+
+    def execute(self, tracer):
+        """
+        Executes all stages.
+
+        Args:
+            tracer (Tracer): tracer of the stages.
+
+        Returns:
+            list: tuples of name, start and end time of the executed stages.
+        """
+        self.__check()
+        pending = dict(self.__stages)
+        completed = set()
+        times = []
+        error = None
+        with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+            running = {}
+            while True:
+                if error is None:
+                    for name in [n for n, s in pending.items() if set(s['dependencies']).issubset(completed)]:
+                        function = pending.pop(name)['function']
+                        running[pool.submit(self.__execute_stage, tracer, name, function)] = name
+                if len(running) == 0:
+                    break
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        times.append( (name,) + future.result() )
+                        completed.add(name)
+                    except Exception as e:
+                        if error is None:
+                            error = e
+        if error is not None:
+            raise error
+        return times
+
+
+    @staticmethod
+    def print_overlaps(times):
+        """
+        Prints stages which have been executed at the same time.
+        """
+        for i, (name, start, end) in enumerate(times):
+            for other, other_start, other_end in times[i + 1:]:
+                overlap = min(end, other_end) - max(start, other_start)
+                if overlap > StageGraph.__OVERLAP_THRESHOLD:
+                    Message.out(f'[STAGE] "{name}" overlapped with "{other}" for {round(overlap, 3)} seconds', Message.INF)
+
+
+    def __check(self):
+        for name, stage in self.__stages.items():
+            for dependency in stage['dependencies']:
+                if dependency not in self.__stages:
+                    raise Exception(f'Stage "{name}" depends on unknown stage "{dependency}"')
+        visited = set()
+        for name in self.__stages:
+            self.__check_cycle(name, [], visited)
+
+
+    def __check_cycle(self, name, path, visited):
+        if name in path:
+            raise Exception(f'Stages have cyclic dependency {" -> ".join(path + [name])}')
+        if name in visited:
+            return
+        for dependency in self.__stages[name]['dependencies']:
+            self.__check_cycle(dependency, path + [name], visited)
+        visited.add(name)
+
+
+    @staticmethod
+    def __execute_stage(tracer, name, function):
+        start = time.time()
+        with tracer.span(name, Tracer.PHASE):
+            function()
+        return (start, time.time())
+
+
+    __OVERLAP_THRESHOLD = 0.01
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# @file      StaticAnalysis.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import re
+import json
+import hashlib
+import shutil
+import subprocess
+
+from concurrent.futures import ProcessPoolExecutor
+from common.Message import Message
+from common.System import System
+from make.AffectedTests import AffectedTests
+
+class StaticAnalysis:
+    """
+    Static analysis of translation units of a build tree by clang-tidy and cppcheck.
+
+    Translation units are taken from the compile commands database, and each
+    checker analyses each unit in a process pool. Findings of a unit are
+    cached by a hash of the checker version and configuration, the compiler
+    arguments of the unit, and contents of the unit source and headers from
+    its compiler dependency file, so only changed units are analysed again.
+    Findings of all units are merged, and findings in shared headers are
+    reported once.
+    """
+
+    CLANG_TIDY = 'clang-tidy'
+    CPPCHECK = 'cppcheck'
+    CHECKERS = [CLANG_TIDY, CPPCHECK]
+
+    def __init__(self, path_to_build_dir, path_to_source_dir, path_to_output_dir, sources, jobs=None):
+        """
+        Args:
+            path_to_build_dir (str): build tree with compile_commands.json.
+            path_to_source_dir (str): root of the source tree.
+            path_to_output_dir (str): directory of the findings and the cache.
+            sources (list): directories relative to the source tree which units are analysed.
+            jobs (int): number of checker processes executed at the same time, or None for all CPUs.
+        """
+        self.__path_to_build_dir = path_to_build_dir
+        self.__path_to_source_dir = path_to_source_dir
+        self.__path_to_output_dir = path_to_output_dir
+        self.__sources = [os.path.join(path_to_source_dir, os.path.normpath(s)) + os.sep for s in sources]
+        self.__jobs = jobs
+
+
+    def execute(self, checkers=None):
+        """
+        Analyses the translation units.
+
+        Args:
+            checkers (list): names of the checkers, or None or empty list for all found ones.
+
+        Returns:
+            list: merged findings.
+        """
+        tools = self.__find_tools(checkers)
+        units = AffectedTests.load_units(self.__path_to_build_dir)
+        if units is None:
+            raise Exception(f'No compile commands found in "{self.__path_to_build_dir}"')
+        units = [u for u in units if any([u['file'].startswith(s) for s in self.__sources])]
+        os.makedirs(self.__path_to_output_dir, exist_ok=True)
+        cache = self.__load_cache()
+        results = {}
+        pending = []
+        for checker, (path, version) in tools.items():
+            for unit in units:
+                name = f'{checker}:{unit["file"]}'
+                digest = self.__get_digest(checker, version, unit)
+                entry = cache.get(name)
+                if entry is not None and entry['digest'] == digest:
+                    results[name] = entry['findings']
+                    continue
+                pending.append( (name, digest, (checker, path, unit, self.__path_to_build_dir)) )
+        Message.out(f'[SCA] {len(units)} translation units, {len(tools)} checkers, ' \
+            f'{len(results)} results are cached', Message.INF)
+        if len(pending) > 0:
+            jobs = self.__jobs if self.__jobs is not None else os.cpu_count()
+            # Units are analysed in a stage thread while other stages are executed
+            with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(pending))), mp_context=System.get_pool_context()) as pool:
+                for (name, digest, args), findings in zip(pending, pool.map(StaticAnalysis._run_checker, [p[2] for p in pending])):
+                    results[name] = findings
+                    cache[name] = {'digest': digest, 'findings': findings}
+        self.__save_cache( {name: cache[name] for name in results} )
+        findings = self.__merge(results)
+        self.__save(findings)
+        self.__print(findings)
+        return findings
+
+
+    @staticmethod
+    def _run_checker(args):
+        """
+        Runs a checker for a translation unit in a worker process.
+
+        Args:
+            args (tuple): name and path of the checker, the translation unit and the build tree.
+
+        Returns:
+            list: findings of the unit.
+        """
+        checker, path, unit, path_to_build_dir = args
+        if checker == StaticAnalysis.CLANG_TIDY:
+            command = [path, '-p', path_to_build_dir, '--quiet', unit['file']]
+        else:
+            command = [path, f'--project={os.path.join(path_to_build_dir, StaticAnalysis.__COMPILE_COMMANDS_FILE)}', \
+                f'--file-filter={unit["file"]}', f'--template={StaticAnalysis.__CPPCHECK_TEMPLATE}'] + StaticAnalysis.__CPPCHECK_ARGS
+        ret = subprocess.run(command, cwd=unit['directory'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, \
+            universal_newlines=True, errors='replace')
+        findings = []
+        for line in ret.stdout.splitlines():
+            match = StaticAnalysis.__FINDING.match(line)
+            if match is None or match.group(4) in StaticAnalysis.__IGNORED_SEVERITIES:
+                continue
+            findings.append({
+                'checker': checker,
+                'file': os.path.normpath(os.path.join(unit['directory'], match.group(1))),
+                'line': int(match.group(2)),
+                'column': int(match.group(3)),
+                'severity': match.group(4),
+                'message': match.group(5),
+                'id': match.group(6) if match.group(6) is not None else '',
+            })
+        if ret.returncode != 0 and len(findings) == 0:
+            findings.append({'checker': checker, 'file': unit['file'], 'line': 0, 'column': 0, 'severity': 'error', \
+                'message': f'{checker} returned code [{ret.returncode}]', 'id': ''})
+        return findings
+
+
+    def __find_tools(self, checkers):
+        tools = {}
+        for checker in (checkers if checkers is not None and len(checkers) > 0 else self.CHECKERS):
+            path = shutil.which(checker)
+            if path is None:
+                if checkers is not None and len(checkers) > 0:
+                    raise Exception(f'Static analyser "{checker}" is not found')
+                continue
+            ret = subprocess.run([path, '--version'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+            tools[checker] = (path, ret.stdout.strip())
+        if len(tools) == 0:
+            raise Exception(f'No static analysers found, {" or ".join(self.CHECKERS)} has to be installed')
+        return tools
+
+
+    def __get_digest(self, checker, version, unit):
+        digest = hashlib.sha256()
+        for value in [checker, version, unit['directory']] + unit['arguments']:
+            digest.update(value.encode('utf-8', errors='replace') + b'\0')
+        files = [unit['file']]
+        dependencies = AffectedTests.get_dependencies(unit)
+        if dependencies is not None:
+            files.extend( sorted(dependencies - set(files)) )
+        if checker == self.CLANG_TIDY:
+            files.extend( self.__get_clang_tidy_configs(unit['file']) )
+        for file in files:
+            digest.update(file.encode('utf-8', errors='replace') + b'\0')
+            if os.path.isfile(file):
+                with open(file, 'rb') as f:
+                    digest.update( hashlib.sha256(f.read()).digest() )
+        return digest.hexdigest()
+
+
+    def __get_clang_tidy_configs(self, path):
+        # Each directory up to the source tree root may have its own configuration
+        configs = []
+        directory = os.path.dirname(path)
+        while True:
+            config = os.path.join(directory, '.clang-tidy')
+            if os.path.isfile(config):
+                configs.append(config)
+            if directory == self.__path_to_source_dir or os.path.dirname(directory) == directory:
+                break
+            directory = os.path.dirname(directory)
+        return configs
+
+
+    def __merge(self, results):
+        findings = {}
+        for name in sorted(results.keys()):
+            for finding in results[name]:
+                key = (finding['checker'], finding['file'], finding['line'], finding['column'], finding['id'], finding['message'])
+                findings.setdefault(key, finding)
+        return sorted(findings.values(), key=lambda f: (f['file'], f['line'], f['column'], f['checker']))
+
+
+    def __save(self, findings):
+        with open(os.path.join(self.__path_to_output_dir, self.__FINDINGS_FILE_NAME), 'w') as file:
+            json.dump(findings, file, indent=1)
+        with open(os.path.join(self.__path_to_output_dir, self.__REPORT_FILE_NAME), 'w') as file:
+            for f in findings:
+                file.write(f'{f["file"]}:{f["line"]}:{f["column"]}: {f["severity"]}: {f["message"]} [{f["checker"]}:{f["id"]}]\n')
+
+
+    def __print(self, findings):
+        for f in findings[:self.__PRINTED]:
+            Message.out(f'[SCA]   {os.path.relpath(f["file"], self.__path_to_source_dir)}:{f["line"]}:{f["column"]}: ' \
+                f'{f["severity"]}: {f["message"]} [{f["id"]}]', Message.NOR)
+        if len(findings) > self.__PRINTED:
+            Message.out(f'[SCA]   ... and {len(findings) - self.__PRINTED} more', Message.NOR)
+        severities = {}
+        for f in findings:
+            severities[f['severity']] = severities.get(f['severity'], 0) + 1
+        details = ', '.join([f'{count} {name}' for name, count in sorted(severities.items())])
+        status = Message.OK if len(findings) == 0 else Message.ERR
+        Message.out(f'[SCA] {len(findings)} findings{f" ({details})" if len(details) > 0 else ""}, ' \
+            f'written to "{self.__path_to_output_dir}"', status)
+
+
+    def __load_cache(self):
+        path = os.path.join(self.__path_to_output_dir, self.__CACHE_FILE_NAME)
+        if os.path.isfile(path) is not True:
+            return {}
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+
+    def __save_cache(self, cache):
+        with open(os.path.join(self.__path_to_output_dir, self.__CACHE_FILE_NAME), 'w') as file:
+            json.dump(cache, file)
+
+
+    __PRINTED = 20
+    __COMPILE_COMMANDS_FILE = 'compile_commands.json'
+    __CACHE_FILE_NAME = 'sca.cache.json'
+    __FINDINGS_FILE_NAME = 'findings.json'
+    __REPORT_FILE_NAME = 'findings.txt'
+    __IGNORED_SEVERITIES = ['note', 'information']
+    __CPPCHECK_TEMPLATE = '{file}:{line}:{column}: {severity}: {message} [{id}]'
+    __CPPCHECK_ARGS = ['--enable=warning,style,performance,portability', '--inline-suppr', '--quiet']
+    __FINDING = re.compile(r'^(.+?):(\d+):(\d+): (\w+): (.*?)(?: \[([\w\-.,]+)\])?$')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# @file      TestCache.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+
+from common.Fingerprint import Fingerprint
+from make.TestReport import TestReport
+
+class TestCache:
+    """
+    Cached results of unit tests of one test executable.
+
+    The cache is valid while the contents of the executable and the shared
+    libraries it may load, and the test environment are unchanged. Passed and skipped results are replayed,
+    failed tests are executed again.
+    """
+
+    def __init__(self, path, executable, libraries=None):
+        """
+        Args:
+            path (str): path to the cache file in the build directory.
+            executable (str): path to the unit test executable.
+            libraries (list): paths to shared libraries built for the executable, or None.
+        """
+        self.__path = path
+        self.__key = self.__get_key(executable, libraries if libraries is not None else [])
+        self.__filters = {}
+        self.__tests = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as file:
+                    data = json.load(file)
+                if data.get('key') == self.__key:
+                    self.__filters = data['filters']
+                    self.__tests = data['tests']
+            except (OSError, ValueError, KeyError):
+                self.__filters = {}
+                self.__tests = {}
+
+
+    def get_tests(self, gtest_filter):
+        """
+        Returns full names of tests matching a Google Test filter, or None if unknown.
+        """
+        return self.__filters.get(str(gtest_filter))
+
+
+    def get_report(self, tests):
+        """
+        Returns report of the given tests which results can be replayed.
+        """
+        report = TestReport()
+        for name in tests:
+            test = self.__tests.get(name)
+            if test is not None and test['status'] != TestReport.FAILED:
+                report.add(test['suite'], test['name'], test['status'], test['time'], test['message'])
+        return report
+
+
+    def update(self, gtest_filter, tests, report):
+        """
+        Updates the cache with a Google Test filter, its tests and their executed results.
+        """
+        self.__filters[str(gtest_filter)] = list(tests)
+        for test in report.get_tests():
+            self.__tests[f'{test["suite"]}.{test["name"]}'] = test
+
+
+    def save(self):
+        """
+        Saves the cache to the cache file.
+        """
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        with open(self.__path, 'w') as file:
+            json.dump({'key': self.__key, 'filters': self.__filters, 'tests': self.__tests}, file, indent=1, sort_keys=True)
+
+
+    def __get_key(self, executable, libraries):
+        fingerprint = Fingerprint()
+        fingerprint.add_file(executable)
+        # A rebuilt shared library changes the results without changing the executable
+        for path in sorted(libraries):
+            fingerprint.add_string(os.path.basename(path))
+            fingerprint.add_file(path)
+        for name in sorted(os.environ):
+            if name.startswith('GTEST_') or name in self.__ENVIRONMENT:
+                fingerprint.add_string(f'{name}={os.environ[name]}')
+        return fingerprint.get()
+
+
+    FILE_NAME = 'EoosTests.cache.json'
+
+    __ENVIRONMENT = ['LD_LIBRARY_PATH', 'LD_PRELOAD', 'PATH', 'TZ', 'LANG', 'LC_ALL']
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# @file      TestHistory.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+
+from make.TestReport import TestReport
+
+class TestHistory:
+    """
+    Recent outcomes of unit tests used to run failing and flaky tests first.
+
+    A test is failing if it failed in its last run, and it is flaky if it
+    both passed and failed within the recorded runs.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the history file in the build directory.
+        """
+        self.__path = path
+        self.__outcomes = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as file:
+                    self.__outcomes = json.load(file)
+            except (OSError, ValueError):
+                self.__outcomes = {}
+
+
+    def update(self, report):
+        """
+        Updates the history with outcomes of the tests executed in a report.
+        """
+        for test in report.get_tests():
+            if test['status'] == TestReport.SKIPPED:
+                continue
+            name = f'{test["suite"]}.{test["name"]}'
+            outcome = self.__FAILED if test['status'] == TestReport.FAILED else self.__PASSED
+            self.__outcomes[name] = (self.__outcomes.get(name, '') + outcome)[-self.__DEPTH:]
+
+
+    def save(self):
+        """
+        Saves the history to the history file.
+        """
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        with open(self.__path, 'w') as file:
+            json.dump(self.__outcomes, file, indent=1, sort_keys=True)
+
+
+    def has_suspects(self):
+        """
+        Tests if any test is failing or flaky.
+        """
+        return any([self.__is_failing(o) or self.__is_flaky(o) for o in self.__outcomes.values()])
+
+
+    def get_suspects(self, tests):
+        """
+        Returns failing tests followed by flaky tests of the given ones.
+
+        Args:
+            tests (list): full names of tests to be executed.
+        """
+        failing = [t for t in tests if self.__is_failing(self.__outcomes.get(t, ''))]
+        flaky = [t for t in tests if t not in failing and self.__is_flaky(self.__outcomes.get(t, ''))]
+        return failing + flaky
+
+
+    def __is_failing(self, outcomes):
+        return outcomes.endswith(self.__FAILED)
+
+
+    def __is_flaky(self, outcomes):
+        return self.__FAILED in outcomes and self.__PASSED in outcomes
+
+
+    FILE_NAME = 'EoosTests.history.json'
+
+    __DEPTH = 10
+    __PASSED = 'P'
+    __FAILED = 'F'
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# @file      TestReport.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import re
+import xml.etree.ElementTree as ElementTree
+
+class TestReport:
+    """
+    Unit test report merged from Google Test results.
+    """
+
+    PASSED = 'passed'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+    def __init__(self):
+        self.__tests = {}
+        self.__errors = []
+
+
+    def add(self, suite, name, status, time=0.0, message=None):
+        """
+        Adds a test result to the report.
+
+        Args:
+            suite (str): test suite name.
+            name (str): test name.
+            status (str): one of PASSED, FAILED or SKIPPED.
+            time (float): test duration in seconds.
+            message (str): failure message.
+        """
+        self.__tests[f'{suite}.{name}'] = {
+            'suite': suite,
+            'name': name,
+            'status': status,
+            'time': time,
+            'message': message,
+        }
+
+
+    def add_error(self, error):
+        """
+        Adds an error which is not related to a test, for example a crashed test process.
+        """
+        self.__errors.append(error)
+
+
+    def load_xml(self, path):
+        """
+        Loads results from a Google Test XML output file.
+        """
+        root = ElementTree.parse(path).getroot()
+        for testcase in root.iter('testcase'):
+            status = TestReport.PASSED
+            message = None
+            failures = testcase.findall('failure')
+            if len(failures) > 0:
+                status = TestReport.FAILED
+                message = '\n'.join([f.get('message', '') for f in failures])
+            elif testcase.get('status') == 'notrun' or testcase.get('result') == 'skipped' or testcase.find('skipped') is not None:
+                status = TestReport.SKIPPED
+            self.add(testcase.get('classname'), testcase.get('name'), status, float(testcase.get('time', '0') or 0), message)
+
+
+    def load_console(self, lines):
+        """
+        Loads results of completed tests from Google Test console output.
+
+        The function is used if no XML output is available, for example of
+        a stopped or crashed test process.
+        """
+        for line in lines:
+            match = TestReport.__CONSOLE_RESULT.match(line)
+            if match is None:
+                continue
+            status = TestReport.__CONSOLE_STATUSES[match.group(1)]
+            suite, _, name = match.group(2).partition('.')
+            self.add(suite, name, status, int(match.group(3)) / 1000.0, 'See console output' if status == TestReport.FAILED else None)
+
+
+    def merge(self, report):
+        """
+        Merges another report into this one.
+        """
+        for test in report.get_tests():
+            self.add(test['suite'], test['name'], test['status'], test['time'], test['message'])
+        for error in report.get_errors():
+            self.add_error(error)
+
+
+    def save_xml(self, path):
+        """
+        Saves the report in the Google Test XML output format.
+        """
+        root = ElementTree.Element('testsuites', {
+            'tests': str(len(self.__tests)),
+            'failures': str(len(self.get_failed())),
+            'disabled': '0',
+            'errors': str(len(self.__errors)),
+            'time': f'{self.get_time():.3f}',
+            'name': 'AllTests',
+        })
+        suites = {}
+        for test in self.get_tests():
+            suites.setdefault(test['suite'], []).append(test)
+        for suite, tests in suites.items():
+            element = ElementTree.SubElement(root, 'testsuite', {
+                'name': suite,
+                'tests': str(len(tests)),
+                'failures': str(len([t for t in tests if t['status'] == TestReport.FAILED])),
+                'disabled': '0',
+                'errors': '0',
+                'time': f'{sum([t["time"] for t in tests]):.3f}',
+            })
+            for test in tests:
+                testcase = ElementTree.SubElement(element, 'testcase', {
+                    'name': test['name'],
+                    'status': 'notrun' if test['status'] == TestReport.SKIPPED else 'run',
+                    'result': 'skipped' if test['status'] == TestReport.SKIPPED else 'completed',
+                    'time': f'{test["time"]:.3f}',
+                    'classname': suite,
+                })
+                if test['status'] == TestReport.FAILED:
+                    failure = ElementTree.SubElement(testcase, 'failure', {'message': test['message'] or '', 'type': ''})
+                    failure.text = test['message'] or ''
+        ElementTree.ElementTree(root).write(path, encoding='UTF-8', xml_declaration=True)
+
+
+    def get_tests(self):
+        """
+        Returns all test results.
+        """
+        return list(self.__tests.values())
+
+
+    def get_failed(self):
+        """
+        Returns full names of failed tests.
+        """
+        return [n for n, t in self.__tests.items() if t['status'] == TestReport.FAILED]
+
+
+    def get_errors(self):
+        """
+        Returns errors which are not related to tests.
+        """
+        return list(self.__errors)
+
+
+    def get_count(self, status=None):
+        """
+        Returns number of tests with the given status, or all tests.
+        """
+        if status is None:
+            return len(self.__tests)
+        return len([t for t in self.__tests.values() if t['status'] == status])
+
+
+    def get_time(self):
+        """
+        Returns total duration of all tests in seconds.
+        """
+        return sum([t['time'] for t in self.__tests.values()])
+
+
+    def is_passed(self):
+        """
+        Tests if all tests passed and no errors occurred.
+        """
+        return len(self.get_failed()) == 0 and len(self.__errors) == 0
+
+
+    __CONSOLE_RESULT = re.compile(r'^\[\s*(OK|FAILED|SKIPPED)\s*\] (\S+\.\S+)(?:,.*)? \((\d+) ms\)\s*$')
+    __CONSOLE_STATUSES = {'OK': PASSED, 'FAILED': FAILED, 'SKIPPED': SKIPPED}
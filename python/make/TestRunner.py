@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# @file      TestRunner.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import re
+
+from common.Message import Message
+from common.ProcessRunner import Process, ProcessRunner
+from make.TestReport import TestReport
+
+class TestRunner:
+    """
+    Runner of Google Test executable in several parallel workers.
+    """
+
+    def __init__(self, executable, path_to_run_dir, path_to_output_dir, tracer=None, fail_fast=False, path_to_counters_dir=None, \
+        timeout=None):
+        """
+        Args:
+            executable (str): path to the unit test executable.
+            path_to_run_dir (str): working directory of the unit test processes.
+            path_to_output_dir (str): directory for XML results of the workers.
+            tracer (Tracer): tracer of the worker processes, or None.
+            fail_fast (bool): stop all workers as soon as one of them reports a failed test.
+            path_to_counters_dir (str): directory for coverage counters of each worker, or None.
+            timeout (float): time limit of each worker in seconds, or None.
+        """
+        self.__executable = executable
+        self.__path_to_run_dir = path_to_run_dir
+        self.__path_to_output_dir = path_to_output_dir
+        self.__runner = ProcessRunner(tracer)
+        self.__fail_fast = fail_fast
+        self.__path_to_counters_dir = path_to_counters_dir
+        self.__timeout = timeout
+        self.__suites = None
+
+
+    def run_shards(self, args, jobs):
+        """
+        Runs the executable in the given number of Google Test shards.
+
+        Args:
+            args (list): Google Test arguments passed to each shard.
+            jobs (int): number of shards executed at the same time.
+
+        Returns:
+            TestReport: merged results of all shards.
+        """
+        workers = []
+        for index in range(jobs):
+            env = dict(os.environ)
+            if jobs > 1:
+                env['GTEST_TOTAL_SHARDS'] = str(jobs)
+                env['GTEST_SHARD_INDEX'] = str(index)
+            workers.append( (list(args), env) )
+        return self._run_workers(workers)
+
+
+    def run_filters(self, args, filters):
+        """
+        Runs the executable in parallel workers each executing its own list of tests.
+
+        Args:
+            args (list): Google Test arguments passed to each worker.
+            filters (list): lists of full test names of each worker.
+
+        Returns:
+            TestReport: merged results of all workers.
+        """
+        workers = []
+        for tests in filters:
+            workers.append( (list(args) + [f'--gtest_filter={":".join(tests)}'], dict(os.environ)) )
+        return self._run_workers(workers)
+
+
+    def list_tests(self, gtest_filter=None):
+        """
+        Returns full names of tests matching the given Google Test filter.
+        """
+        args = ['--gtest_list_tests']
+        if gtest_filter is not None:
+            args.append(f'--gtest_filter={gtest_filter}')
+        args = self.__get_filter_args(args, 'list')
+        # A target without XML output may not exit after it has listed its tests, so it is stopped when its output stops
+        idle_timeout = self.__LIST_IDLE_TIMEOUT if self._has_xml_output() is not True else None
+        process = Process(self._get_command(args), self.__path_to_run_dir, timeout=self.__timeout, \
+            name=f'{os.path.basename(self.__executable)} list', capture=True, output=False, idle_timeout=idle_timeout)
+        ret = self.__runner.run(process)
+        if ret != 0 and process.timed_out is not True and process.stopped is not True:
+            raise Exception(f'Unit tests listing aborted with return code [{ret}]')
+        tests = []
+        suite = None
+        for line in process.lines:
+            name = line.split('#')[0].strip()
+            if len(name) == 0:
+                continue
+            if line.startswith(' '):
+                if suite is not None:
+                    tests.append(f'{suite}{name}')
+            else:
+                # Other lines of the output, for example of a target startup, are not suites
+                suite = name if name.endswith('.') else None
+        if process.timed_out is True:
+            # An embedded target may not exit after it has listed its tests
+            if len(tests) == 0:
+                raise Exception(f'Unit tests listing timed out after {self.__timeout} seconds')
+            Message.out(f'[INFO] Unit tests listing has been stopped after {self.__timeout} seconds', Message.INF)
+        return tests
+
+
+    def compact_filter(self, gtest_filter):
+        """
+        Returns Google Test filter where full names of all tests of a suite are replaced by one pattern of the suite.
+
+        Only full test names of the positive part of the filter are compacted, other patterns are kept as they are.
+        """
+        if gtest_filter is None:
+            return None
+        positive, separator, negative = gtest_filter.partition('-')
+        patterns = []
+        given = {}
+        for pattern in positive.split(':'):
+            if '*' in pattern or '?' in pattern or '.' not in pattern:
+                patterns.append(pattern)
+            else:
+                given.setdefault(pattern.split('.')[0], []).append(pattern)
+        if len(given) == 0:
+            return gtest_filter
+        suites = self.__get_suites()
+        for suite, names in given.items():
+            if set(names) == suites.get(suite):
+                patterns.append(f'{suite}.*')
+            else:
+                patterns.extend(names)
+        return ':'.join([p for p in patterns if len(p) > 0]) + separator + negative
+
+
+    def _get_command(self, args):
+        """
+        Returns command executing the unit test executable with the given Google Test arguments.
+        """
+        return [self.__executable] + list(args)
+
+
+    def _has_xml_output(self):
+        """
+        Tests if the executable writes XML results to the host file system.
+
+        Results of executables without XML output are taken from their console output.
+        """
+        return True
+
+
+    def _run_workers(self, workers):
+        """
+        Runs workers at the same time and merges their results.
+
+        Args:
+            workers (list): tuples of Google Test arguments and environment of each worker.
+
+        Returns:
+            TestReport: merged results of all workers.
+        """
+        os.makedirs(self.__path_to_output_dir, exist_ok=True)
+        processes = []
+        paths = []
+        for index, (args, env) in enumerate(workers):
+            path = os.path.join(self.__path_to_output_dir, f'worker-{index}.xml')
+            if os.path.exists(path):
+                os.remove(path)
+            if self._has_xml_output() is True:
+                args = args + [f'--gtest_output=xml:{path}']
+            args = self.__get_filter_args(args, f'worker-{index}')
+            command = self._get_command(args)
+            if self.__path_to_counters_dir is not None:
+                # Each worker writes its own coverage counters instead of merging them into shared files
+                env = dict(env)
+                env['GCOV_PREFIX'] = os.path.join(self.__path_to_counters_dir, f'worker-{index}')
+                env['GCOV_PREFIX_STRIP'] = '0'
+            name = f'{os.path.basename(self.__executable)} worker {index}'
+            processes.append( Process(command, self.__path_to_run_dir, env, self.__timeout, self.__on_line, name, capture=True) )
+            paths.append(path)
+        rets = self.__runner.run_many(processes)
+        report = TestReport()
+        for index, (ret, path, process) in enumerate(zip(rets, paths, processes)):
+            worker_report = TestReport()
+            if os.path.isfile(path):
+                worker_report.load_xml(path)
+                if ret != 0 and len(worker_report.get_failed()) == 0:
+                    report.add_error(f'Worker {index} returned code [{ret}]')
+            else:
+                # Results of the tests completed before the worker was stopped or crashed
+                worker_report.load_console(process.lines)
+                is_finished = any([self.__FINISHED.match(line) is not None for line in process.lines])
+                if process.cancelled is True:
+                    Message.out(f'[INFO] Worker {index} has been stopped after a failure', Message.INF)
+                elif process.stopped is True:
+                    # The target has been stopped after it reported its results
+                    pass
+                elif process.timed_out is True and is_finished is not True:
+                    report.add_error(f'Worker {index} timed out after {self.__timeout} seconds')
+                elif process.timed_out is True:
+                    # An embedded target may not exit after its tests have completed
+                    Message.out(f'[INFO] Worker {index} has been stopped after its tests completed', Message.INF)
+                elif self._has_xml_output() is True or is_finished is not True:
+                    report.add_error(f'Worker {index} returned code [{ret}] without results')
+                elif ret != 0 and len(worker_report.get_failed()) == 0:
+                    report.add_error(f'Worker {index} returned code [{ret}]')
+            report.merge(worker_report)
+        report.save_xml( os.path.join(self.__path_to_output_dir, self.REPORT_FILE_NAME) )
+        return report
+
+
+    def __get_filter_args(self, args, name):
+        # An argument is limited to 128 KiB on Linux and a whole command line to 32 KiB on Windows
+        result = []
+        for arg in args:
+            if arg.startswith(self.__FILTER) and len(arg) > self.__FILTER_LIMIT:
+                arg = self.__FILTER + self.compact_filter(arg[len(self.__FILTER):])
+                # Executables without XML output run on targets which cannot read files of the host either
+                if len(arg) > self.__FILTER_LIMIT and self._has_xml_output() is True:
+                    os.makedirs(self.__path_to_output_dir, exist_ok=True)
+                    path = os.path.join(self.__path_to_output_dir, f'{name}.flags')
+                    with open(path, 'w') as file:
+                        file.write(f'{arg}\n')
+                    arg = f'--gtest_flagfile={os.path.abspath(path)}'
+            result.append(arg)
+        return result
+
+
+    def __get_suites(self):
+        if self.__suites is None:
+            self.__suites = {}
+            for test in self.list_tests():
+                self.__suites.setdefault(test.split('.')[0], set()).add(test)
+        return self.__suites
+
+
+    def __on_line(self, process, line, is_stderr):
+        if self.__fail_fast is True and is_stderr is not True and self.__FAILED_TEST.match(line) is not None:
+            self.__runner.cancel()
+        # A target without XML output may not exit after its tests have completed, so it is stopped at their summary
+        if self._has_xml_output() is not True and is_stderr is not True and self.__FINISHED.match(line) is not None:
+            self.__runner.stop(process)
+
+
+    @staticmethod
+    def print_report(report):
+        """
+        Prints summary of the given report.
+        """
+        for name in report.get_failed():
+            Message.out(f'[FAILED] {name}', Message.ERR)
+        for error in report.get_errors():
+            Message.out(f'[ERROR] {error}', Message.ERR)
+        status = Message.OK if report.is_passed() else Message.ERR
+        Message.out(f'[BUILD] Unit tests: {report.get_count(TestReport.PASSED)} passed, ' \
+            f'{report.get_count(TestReport.FAILED)} failed, ' \
+            f'{report.get_count(TestReport.SKIPPED)} skipped', status)
+
+
+    REPORT_FILE_NAME = 'EoosTests.xml'
+
+    __FILTER = '--gtest_filter='
+    __FILTER_LIMIT = 8 * 1024
+    __LIST_IDLE_TIMEOUT = 5.0
+    __FINISHED = re.compile(r'^\[==========\] \d+ tests?(?: from \d+ test (?:suites?|cases?))? ran\.')
+    __FAILED_TEST = re.compile(r'^\[  FAILED  \] \S+\.\S+.* \(\d+ ms\)\s*$')
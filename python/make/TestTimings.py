@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# @file      TestTimings.py
+# @author    Sergey Baigudin, sergey@baigudin.software
+# @copyright 2026, Sergey Baigudin, Baigudin Software
+
+import os
+import json
+import heapq
+
+from make.TestReport import TestReport
+
+class TestTimings:
+    """
+    Recorded durations of unit tests used to balance parallel workers.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): path to the timings file in the build directory.
+        """
+        self.__path = path
+        self.__timings = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as file:
+                    self.__timings = json.load(file)
+            except (OSError, ValueError):
+                self.__timings = {}
+
+
+    def is_empty(self):
+        """
+        Tests if no timings have been recorded.
+        """
+        return len(self.__timings) == 0
+
+
+    def update(self, report):
+        """
+        Updates timings with durations of the tests executed in a report.
+        """
+        for test in report.get_tests():
+            if test['status'] != TestReport.SKIPPED:
+                self.__timings[f'{test["suite"]}.{test["name"]}'] = test['time']
+
+
+    def save(self):
+        """
+        Saves timings to the timings file.
+        """
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        with open(self.__path, 'w') as file:
+            json.dump(self.__timings, file, indent=1, sort_keys=True)
+
+
+    def get(self, name):
+        """
+        Returns recorded duration of a test, or an estimate for a test without timing.
+
+        The estimate is the median of all recorded durations, as new tests
+        are usually similar to existing ones of the project.
+        """
+        if name in self.__timings:
+            return self.__timings[name]
+        return self.__get_estimate()
+
+
+    def partition(self, tests, jobs):
+        """
+        Packs tests into balanced groups using longest-processing-time first.
+
+        Args:
+            tests (list): full names of tests to be executed.
+            jobs (int): number of groups.
+
+        Returns:
+            list: tuples of a group test names and its estimated duration.
+        """
+        groups = [ (0.0, index, []) for index in range(jobs) ]
+        heapq.heapify(groups)
+        for name in sorted(tests, key=lambda n: self.get(n), reverse=True):
+            duration, index, names = heapq.heappop(groups)
+            names.append(name)
+            heapq.heappush(groups, (duration + self.get(name), index, names))
+        groups = sorted(groups, key=lambda g: g[1])
+        return [ (names, duration) for duration, index, names in groups if len(names) > 0 ]
+
+
+    def __get_estimate(self):
+        if len(self.__timings) == 0:
+            return self.__DEFAULT_ESTIMATE
+        values = sorted(self.__timings.values())
+        return values[len(values) // 2]
+
+
+    FILE_NAME = 'EoosTests.timings.json'
+
+    __DEFAULT_ESTIMATE = 0.1